@@ -0,0 +1,120 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+from selenium import webdriver
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bvger_auto import PAGE_STRAINER, expand_page, extract_page_content, extract_page_content_js, firefox_options
+from corpus import Corpus
+
+SNAPSHOTS_FOLDER = os.path.join("download", "snapshots", "de")
+LIMIT = 100
+REPEAT = 3
+
+# Loads a saved page without running its scripts
+LOAD_SCRIPT = "document.documentElement.innerHTML = arguments[0];"
+
+
+def load_pages(source: str, limit=LIMIT) -> list:
+    """
+    Reads saved pages, from a snapshots folder (see `bvger_auto.py reparse`) or a folder of `.html` files.
+
+    :param source: Folder.
+    :param limit: Maximum number of pages.
+    :return: (name, html).
+    """
+    if os.path.exists(os.path.join(source, "index.jsonl")):
+        with Corpus(source) as snapshots:
+            return [(key, snapshots.read(key)) for key in list(snapshots.keys())[:limit]]
+    pages = []
+    for file in sorted(os.listdir(source))[:limit]:
+        if file.endswith(".html"):
+            with open(os.path.join(source, file), "r", encoding="utf-8") as f:
+                pages.append((file, f.read()))
+    return pages
+
+
+def soup_path(browser) -> dict:
+    # Extraction before `extract_page_content_js`
+    expand_page(browser)
+    return extract_page_content(BeautifulSoup(browser.page_source, 'html.parser', parse_only=PAGE_STRAINER))
+
+
+def js_path(browser) -> dict:
+    return extract_page_content_js(browser)
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench(pages: list, repeat=REPEAT):
+    """
+    Times both extraction paths on each page, and checks that they return the same content.
+
+    :param pages: (name, html).
+    :param repeat: Number of runs of each path on each page.
+    :return: Durations in seconds by path, and names of the pages whose content differs.
+    """
+    paths = {"soup": soup_path, "js": js_path}
+    durations = {name: [] for name in paths}
+    mismatches = []
+    browser = webdriver.Firefox(options=firefox_options)
+    try:
+        browser.get("about:blank")
+        for name, html in pages:
+            contents = {}
+            for path_name, path in paths.items():
+                for _ in range(repeat):
+                    browser.execute_script(LOAD_SCRIPT, html)
+                    start = time.perf_counter()
+                    contents[path_name] = path(browser)
+                    durations[path_name].append(time.perf_counter() - start)
+            if contents["soup"] != contents["js"]:
+                mismatches.append(name)
+    finally:
+        browser.quit()
+    return durations, mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Extraction Benchmark",
+        description="Compare the extraction of a page in the browser (`js`) with the page source parsed by BeautifulSoup (`soup`)",
+    )
+    parser.add_argument("source",
+                        help=f"Snapshots folder, or folder of `.html` files (e.g., `{SNAPSHOTS_FOLDER}`)",
+                        nargs="?",
+                        default=SNAPSHOTS_FOLDER)
+    parser.add_argument("-n", "--limit",
+                        help=f"Maximum number of pages (default {LIMIT})",
+                        type=int,
+                        default=LIMIT)
+    parser.add_argument("-r", "--repeat",
+                        help=f"Number of runs of each path on each page (default {REPEAT})",
+                        type=int,
+                        default=REPEAT)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.source):
+        sys.stderr.write(f"Incorrect folder (`{args.source}`) not found\n")
+        exit(-1)
+    pages = load_pages(args.source, limit=args.limit)
+    if not pages:
+        sys.stderr.write(f"Incorrect folder (`{args.source}`) has no pages\n")
+        exit(-1)
+
+    durations, mismatches = bench(pages, repeat=args.repeat)
+    print(f"Pages: {len(pages)} x {args.repeat}")
+    for name, values in durations.items():
+        print(f"{name:>5}: mean {statistics.mean(values) * 1000:.1f} ms, "
+              f"p50 {percentile(values, 0.5) * 1000:.1f} ms, p95 {percentile(values, 0.95) * 1000:.1f} ms")
+    print(f"Speedup: {statistics.mean(durations['soup']) / statistics.mean(durations['js']):.2f}x")
+    if mismatches:
+        print(f"Different content: {len(mismatches)} ({', '.join(mismatches[:10])})")
@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bvger_auto
+from bvger_auto import BACKENDS, BrowserPool, page_target, search_target
+from fake_site import COUNT, LATENCY, MISS_RATE, SEED, WORDS, Site, serve_site
+from http_backend import HttpBackend
+from journal import Journal
+from output import ResultWriter
+
+SCENARIOS = ["page", "collect", "merge", "pattern_counter"]
+COURTS = ["D", "E"]
+YEAR = 2024
+PAGE_LIMIT = 50
+WORKERS = 4
+LANG = "de"
+
+
+class Timings:
+    """
+    Durations of the targets of a scenario, in seconds.
+    """
+
+    def __init__(self):
+        self.durations = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.durations.append(time.perf_counter() - start)
+
+    def wrap(self, function):
+        def timed(*args, **kwargs):
+            with self.measure():
+                return function(*args, **kwargs)
+        return timed
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(name: str, scenario, memory=True) -> dict:
+    """
+    Runs a scenario, and returns its throughput, the percentiles of its targets and the peak of its Python heap.
+
+    :param name: Name of the scenario.
+    :param scenario: Function returning the number of titles and the `Timings` of the targets (or None).
+    :param memory: Trace the allocations, for the peak of the Python heap. Only the Python allocations of this process
+    are traced: not the browsers, nor the worker processes, nor the memory of native libraries.
+    :return: Statistics.
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        titles, timings = scenario()
+        duration = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+    stats = {"scenario": name, "titles": titles, "seconds": duration, "titles_per_second": titles / duration,
+             "python_heap_peak_mb": peak / 1024 / 1024 if peak is not None else None}
+    if timings and timings.durations:
+        for q in (0.5, 0.95, 0.99):
+            stats[f"p{int(q * 100)}_ms"] = percentile(timings.durations, q) * 1000
+    return stats
+
+
+def format_stats(stats: dict) -> str:
+    line = f"{stats['scenario']:>15}: {stats['titles']} titles in {stats['seconds']:.2f} s, " \
+           f"{stats['titles_per_second']:.1f} titles/s"
+    if "p50_ms" in stats:
+        line += f", p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms"
+    if stats["python_heap_peak_mb"] is not None:
+        line += f", Python heap peak {stats['python_heap_peak_mb']:.1f} MB (this process only)"
+    return line
+
+
+def bench_page(site: Site, folder: str, backend: str, limit=PAGE_LIMIT):
+    # One title after the other, as `bvger_auto.py page` does
+    titles = sorted(site.ids)[:limit]
+    timings = Timings()
+    http = HttpBackend(bvger_auto.BASE_URL) if backend == "http" else None
+    try:
+        with BrowserPool() as pool:
+            for title in titles:
+                with timings.measure():
+                    page = search_target(title, lang=LANG, pool=pool, http=http)
+                    page_target(page, lang=LANG, full_text=True, download=True, download_folder=folder, pool=pool,
+                                http=http)
+    finally:
+        if http:
+            http.close()
+    return len(titles), timings
+
+
+def bench_collect(targets: list, folder: str, backend: str, workers=WORKERS):
+    # Writes the results in `<folder>/all`, and the texts in `<folder>/txt`, for the following scenarios
+    timings = Timings()
+    collect_target = bvger_auto.collect_target
+    bvger_auto.collect_target = timings.wrap(collect_target)
+    writer = ResultWriter(os.path.join(folder, "all"), "bvger_results", fmt="jsonl")
+    try:
+        with Journal.in_folder(folder) as journal:
+            found = bvger_auto.collect(
+                targets,
+                workers=workers,
+                max_rps=0,
+                journal=journal,
+                backend=backend,
+                writer=writer,
+                lang=LANG,
+                full_text=True,
+                download=True,
+                download_folder=folder,
+            )
+    finally:
+        bvger_auto.collect_target = collect_target
+        writer.close()
+    return found, timings
+
+
+def bench_merge(folder: str):
+    # `merge.py` works on `download/all` of the current folder
+    import merge
+
+    cwd = os.getcwd()
+    os.chdir(Path(folder).parent)
+    try:
+        df = merge.merge(full=True, verbose=False)
+        merge.export(df)
+    finally:
+        os.chdir(cwd)
+    return len(df), None
+
+
+def has_tokenizer() -> bool:
+    # `pattern_counter` tokenizes with nltk, whose data is downloaded separately
+    try:
+        import nltk
+        nltk.data.find("tokenizers/punkt_tab")
+    except (ImportError, LookupError):
+        return False
+    return True
+
+
+def write_patterns(folder: str):
+    # Patterns on the words of the stand-in, in `<folder>/patterns` as `pattern_counter` expects
+    Path(folder, "patterns").mkdir(exist_ok=True)
+    words = sorted({word.lower() for word in WORDS})
+    patterns = {
+        "patterns_de": words + [f"{word[:4]}*" for word in words],
+        "patterns_fr": words + [f"{word[:4]}*" for word in words],
+        "patterns_it": words,
+        "patterns_more": ["*tion", "ré*é", "\"recours\""],
+    }
+    for name, lines in patterns.items():
+        with open(os.path.join(folder, "patterns", name), "w") as f:
+            f.write("\n".join(lines))
+            f.write("\n")
+
+
+def bench_pattern_counter(folder: str, jobs=1):
+    # Reads `patterns/` of the current folder when imported, written next to `folder`
+    parent = Path(folder).parent
+    write_patterns(parent)
+    cwd = os.getcwd()
+    os.chdir(parent)
+    try:
+        import pattern_counter
+        from term_store import TermStore
+
+        txt_folder = os.path.join(folder, "txt")
+        documents = [(os.path.join(txt_folder, file), "fr") for file in sorted(os.listdir(txt_folder))]
+        with TermStore(os.path.join(folder, "terms")) as store:
+            pattern_counter.process_documents(documents, jobs=jobs, store=store)
+    finally:
+        os.chdir(cwd)
+    return len(documents), None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Throughput Benchmark",
+        description="Measure the throughput, latency and memory of the collection and of its processing, on a local stand-in of the site (`fake_site.py`)",
+    )
+    parser.add_argument("scenarios",
+                        help=f"Scenarios to run among `{', '.join(SCENARIOS)}`, `collect` writes the results read by `merge` and `pattern_counter` (default all)",
+                        nargs="*")
+    parser.add_argument("-n", "--count",
+                        help=f"Highest number of each court (default {COUNT})",
+                        type=int,
+                        default=COUNT)
+    parser.add_argument("--latency",
+                        help=f"Delay of each response of the site, in seconds (default {LATENCY})",
+                        type=float,
+                        default=LATENCY)
+    parser.add_argument("--miss-rate",
+                        help=f"Fraction of the numbers without decision (default {MISS_RATE})",
+                        type=float,
+                        default=MISS_RATE)
+    parser.add_argument("--seed",
+                        help=f"Seed of the decisions (default {SEED})",
+                        type=int,
+                        default=SEED)
+    parser.add_argument("-w", "--workers",
+                        help=f"Number of parallel workers of `collect` (default {WORKERS})",
+                        type=int,
+                        default=WORKERS)
+    parser.add_argument("-j", "--jobs",
+                        help="Number of worker processes of `pattern_counter` (default 1)",
+                        type=int,
+                        default=1)
+    parser.add_argument("--backend",
+                        help="Backend of `page` and `collect`, `selenium` needs Firefox (default `http`)",
+                        choices=sorted(BACKENDS),
+                        default="http")
+    parser.add_argument("--no-memory",
+                        help="Do not trace the Python allocations of this process (not the browsers nor the worker processes), which slows down the scenarios",
+                        action="store_true")
+    parser.add_argument("-o", "--output",
+                        help="Append the statistics to a JSON lines file, to compare runs",
+                        default=None)
+    args = parser.parse_args()
+
+    if args.count < 1 or args.workers < 1 or args.jobs < 1:
+        sys.stderr.write(f"Incorrect input (`{args.count}`, `{args.workers}`, `{args.jobs}`)\n")
+        exit(-1)
+    scenarios = args.scenarios or SCENARIOS
+    for name in scenarios:
+        if name not in SCENARIOS:
+            sys.stderr.write(f"Incorrect scenario in input (`{name}`) not in `{', '.join(SCENARIOS)}`\n")
+            exit(-1)
+    for name in ("merge", "pattern_counter"):
+        if name in scenarios and "collect" not in scenarios:
+            sys.stderr.write(f"Incorrect scenarios (`{name}` needs `collect`)\n")
+            exit(-1)
+    if "pattern_counter" in scenarios and not has_tokenizer():
+        print("Skipping `pattern_counter`: the nltk data is missing (`python -m nltk.downloader punkt_tab`)")
+        scenarios = [name for name in scenarios if name != "pattern_counter"]
+
+    site = Site.generate(courts=COURTS, years=[YEAR], count=args.count, miss_rate=args.miss_rate, seed=args.seed)
+    server = serve_site(site, port=0, latency=args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    bvger_auto.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+    targets = [f"{court}-{number}/{YEAR}" for court in COURTS for number in range(1, args.count + 1)]
+    print(f"Site: {len(site.pages)} decisions, {len(targets)} titles, latency {args.latency} s")
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_folder:
+        folder = os.path.join(temp_folder, "download")
+        for sub_folder in ("download", "page"):
+            for name in ("pdf", "txt"):
+                Path(temp_folder, sub_folder, name).mkdir(parents=True, exist_ok=True)
+        Path(folder, "all").mkdir()
+        runs = {
+            "page": lambda: bench_page(site, os.path.join(temp_folder, "page"), args.backend),
+            "collect": lambda: bench_collect(targets, folder, args.backend, workers=args.workers),
+            "merge": lambda: bench_merge(folder),
+            "pattern_counter": lambda: bench_pattern_counter(folder, jobs=args.jobs),
+        }
+        for name in (scenario for scenario in SCENARIOS if scenario in scenarios):
+            stats = run(name, runs[name], memory=not args.no_memory)
+            print(format_stats(stats))
+            results.append(stats)
+    server.shutdown()
+
+    if args.output:
+        with open(args.output, "a") as f:
+            for stats in results:
+                f.write(json.dumps(dict(stats, count=args.count, latency=args.latency, miss_rate=args.miss_rate,
+                                        workers=args.workers, backend=args.backend)))
+                f.write("\n")
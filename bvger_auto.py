@@ -2,6 +2,11 @@ import datetime
 import sys
 import argparse
 import re
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
 
 import pandas as pd
@@ -12,14 +17,26 @@ from typing import Optional
 from urllib.parse import urlparse, urljoin, parse_qs
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from selenium import webdriver
 from selenium.webdriver import ActionChains
 from selenium.webdriver import ChromeOptions, FirefoxOptions
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from http_backend import HttpBackend
+from pdf_downloader import PdfDownloader, PDF_WORKERS
+from output import ResultWriter, FORMATS, FORMAT
+from corpus import Corpus, CORPUS_FOLDER
+from explore import Explorer, EXPLORE_STRIDE, EXPLORE_MISSES
+from fields import field_label, side_menu_fields
+from tracing import Tracer
+from journal import Journal, NegativeCache, SyncState, iso_date, NEGATIVE_CACHE_FILE, SYNC_FILE, RECENT_YEARS, STATE_ERROR, STATE_TIMEOUT, STATE_NOT_FOUND, STATE_FOUND, STATE_SCRAPED, STATE_DOWNLOADED
+from work_queue import WorkQueue, split_shards, shard_targets, default_owner, QUEUE_FILE, RESULTS_FOLDER, SHARD_SIZE, LEASE, CLAIM_POLL
+import merge
+
 BASE_URL = "https://bvger.weblaw.ch"
 BASE_DOWNLOAD_FOLDER = "download"
 
@@ -40,17 +57,366 @@ MAX_YEARS = range(2007, datetime.datetime.now().year + 1)
 MAX_NUMBERS = range(1, 10000)
 
 PATTERN = re.compile(r"^([A-F])\-([1-9]|[1-9]\d{1,3})\/(200[7-9]|201\d|202[0-4])$")
+TITLE_PATTERN = re.compile(r"\b([A-F])-(\d{1,4})/(\d{4})\b")
 
 LANGS = {"de", "fr", "it"}
 
+# Only the parts of a page read by `extract_page_content` are parsed
+PAGE_STRAINER = SoupStrainer(id=["customContentSegment", "sideMenuCacheViewAccordionComputer"])
+
+# Extraction of a page: `js` in the browser, or `soup` from its source (one click per dropdown, then BeautifulSoup).
+# `js` has not been checked on the real site yet, compare both with `benchmarks/bench_extraction.py` first
+EXTRACTIONS = {"js", "soup"}
+EXTRACTION = "soup"
+
+# Same as `expand_page`, all the clicks at once
+EXPAND_SCRIPT = """
+for (const dropdown of Array.from(document.getElementsByClassName("accordionTitleCacheView"))) {
+    const label = dropdown.getElementsByClassName("accordionLabelSideContentCacheView")[0];
+    if (!dropdown.classList.contains("active") && label) {
+        label.click();
+    }
+}
+for (const button of Array.from(document.getElementsByClassName("infiniteScrollerMoreOrLessButton"))) {
+    button.click();
+}
+"""
+
+# Until every dropdown is open, the amount of content of the page, else null (see `wait_expanded`)
+EXPANDED_SCRIPT = """
+const dropdowns = Array.from(document.getElementsByClassName("accordionTitleCacheView"));
+if (!dropdowns.every(dropdown => dropdown.classList.contains("active"))) {
+    return null;
+}
+return document.getElementsByClassName("label-wrapper").length + document.getElementsByTagName("p").length;
+"""
+EXPAND_WAIT = 5
+
+# Same as `extract_page_content`, `arguments[0]` to also return the source of the page
+EXTRACT_SCRIPT = """
+const content = document.getElementById("customContentSegment");
+const pdf = content.querySelector("a#idForTutorial[href]");
+const metadata = document.getElementById("sideMenuCacheViewAccordionComputer");
+const result = {
+    title: content.querySelector('[class="ui header"]').textContent.split(" ")[1].trim(),
+    paragraphs: Array.from(content.getElementsByTagName("p"), p => p.textContent),
+    pdf: pdf.getAttribute("href"),
+    metadata: Array.from(metadata.getElementsByClassName("generalGridRowCacheView"), row => [
+        row.getElementsByClassName("title")[0].textContent.trim(),
+        Array.from(row.getElementsByClassName("label-wrapper"), label => label.textContent.trim()),
+    ]),
+};
+if (arguments[0]) {
+    result.html = document.documentElement.outerHTML;
+}
+return result;
+"""
+
 chrome_options = ChromeOptions()
 chrome_options.add_argument("--headless=new")
 firefox_options = FirefoxOptions()
 firefox_options.add_argument("-headless")
 
+# Browser pool
+POOL_SIZE = 1
+POOL_MAX_USES = 100
+
+# Collection
+WORKERS = 1
+MAX_RPS = 2.0
+
+# Waits on the site, following its latency (see `AdaptiveWait`)
+WAIT_MIN = 1
+WAIT_MAX = 10
+WAIT_FACTOR = 3
+WAIT_ALPHA = 0.2
+WAIT_POLL = 0.1
+
+# Dashboard states of a search
+SEARCH_RESULTS = "results"
+SEARCH_NO_RESULTS = "no_results"
+# Message shown by the dashboard once a search ended without results. Not checked against the live dashboard (no
+# capture of an empty result yet): if it never shows up, a search without results waits for the timeout, and is then
+# journaled as a timeout (see `SearchTimeout`) instead of missing
+NO_RESULTS_SELECTOR = "#noResultsMessage, .noResultsMessage"
+
+# Listing of a whole court and year on the dashboard
+LISTING_QUERY = "{court}-*/{year}"
+# Not checked against the live dashboard: if it ignores these parameters, every sync lists all the decisions of the
+# years (still correct, as unchanged decisions are skipped, only slower)
+LISTING_DATE_PARAMS = "&dateFrom={date_from}&dateTo={date_to}"
+# Dates shown by a result of the dashboard, to tell a page updated under the same ID (see `extract_scroller_dates`)
+SCROLLER_DATE_PATTERN = re.compile(r"\b\d{1,2}\.\d{1,2}\.\d{4}\b")
+LISTING_SCROLL_WAIT = 3
+LISTING_MAX_SCROLLS = 10000
+
+# Backends
+BACKENDS = {"http", "selenium"}
+BACKEND = "selenium"
+
+# Snapshots of the rendered pages, parsed again by `reparse`
+SNAPSHOT_FOLDER = "snapshots"
+SNAPSHOTS = {}
+REPARSE_JOBS = os.cpu_count() or 1
+REPARSE_CHUNKSIZE = 16
+
+# Incremental sync, days listed again before the last sync for the decisions published while it ran
+SYNC_OVERLAP = 1
+SYNC_FORMATS = {"jsonl", "parquet"}
+SYNC_FORMAT = "jsonl"
+
+
+class BrowserPool:
+    """
+    Keeps a few warm Firefox drivers alive, so that a lookup does not have to start its own browser.
+
+    A driver is reset (cookies, storage, blank page) when it goes back into the pool, and is recycled after `max_uses`
+    lookups or as soon as it crashes.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_uses=POOL_MAX_USES, options=None):
+        """
+        :param size: Maximum number of drivers alive at the same time.
+        :param max_uses: Number of lookups after which a driver is quit and replaced.
+        :param options: Optional, options for Firefox (default headless).
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.options = options if options is not None else firefox_options
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self):
+        """
+        Returns a driver from the pool, starting a new one if no warm driver is available.
+        Blocks if `size` drivers are already in use.
+
+        :return: Selenium driver.
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        self._slots.acquire()
+        try:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with TRACER.stage("browser_start"):
+                    driver = webdriver.Firefox(options=self.options)
+                with self._lock:
+                    self._uses[driver] = 0
+        except Exception:
+            self._slots.release()
+            raise
+        return driver
+
+    def release(self, driver, broken=False):
+        """
+        Gives a driver back to the pool.
+
+        :param driver: Driver obtained with `acquire`.
+        :param broken: The driver crashed and must not be used again.
+        """
+        try:
+            with self._lock:
+                uses = self._uses.get(driver, 0) + 1
+                self._uses[driver] = uses
+            if broken or self._closed or uses >= self.max_uses:
+                self._discard(driver)
+                return
+            try:
+                self._reset(driver)
+            except Exception:
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        """
+        Context manager around `acquire` and `release`, the driver is recycled if an exception escapes.
+        """
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        """
+        Quits all the idle drivers, drivers still in use are quit when released.
+        """
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _reset(driver):
+        # Forget everything about the previous navigation
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all the workers, so that the whole run stays below `rate` requests per second.
+    """
+
+    def __init__(self, rate=MAX_RPS, burst=1):
+        """
+        :param rate: Requests per second, None or 0 to disable the limit.
+        :param burst: Number of requests that can be made at once after an idle period.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a request can be made.
+        """
+        if not self.rate:
+            return
+        with TRACER.stage("rate_limit"):
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                time.sleep(wait)
+
+
+class AdaptiveWait:
+    """
+    Timeout of the waits on the site, following its latency: a moving average of the time until a page is ready, with a
+    margin, within bounds. Shared by all the workers.
+    """
+
+    def __init__(self, minimum=WAIT_MIN, maximum=WAIT_MAX, factor=WAIT_FACTOR, alpha=WAIT_ALPHA):
+        """
+        :param minimum: Shortest timeout, in seconds.
+        :param maximum: Longest timeout, in seconds.
+        :param factor: Timeout, as a multiple of the average latency.
+        :param alpha: Weight of the last latency in the average.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.alpha = alpha
+        self.latency = None
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> float:
+        with self._lock:
+            if self.latency is None:
+                return self.minimum
+            return min(self.maximum, max(self.minimum, self.factor * self.latency))
+
+    def observe(self, seconds: float):
+        """
+        Records the time until a page was ready.
+
+        :param seconds: Latency.
+        """
+        with self._lock:
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency = self.alpha * seconds + (1 - self.alpha) * self.latency
+
+    def until(self, browser, condition):
+        """
+        Waits for a condition, and records how long it took. A timeout is not recorded: it says nothing of the latency
+        (e.g., a search without results whose message did not show up), and would only make the next waits longer.
+
+        :param browser: Selenium driver.
+        :param condition: Same as for `WebDriverWait.until`.
+        :return: Value of the condition. Raises `TimeoutException` if not met in time.
+        """
+        start = time.monotonic()
+        value = WebDriverWait(browser, self.timeout, poll_frequency=WAIT_POLL).until(condition)
+        self.observe(time.monotonic() - start)
+        return value
+
+
+WAITS = AdaptiveWait()
+
+# Stages of the targets, recorded with `--trace`
+TRACER = Tracer()
+
+
+def search_state(browser):
+    """
+    Returns the state of a search on the dashboard, for `AdaptiveWait.until`.
+
+    :param browser: Selenium driver, on the dashboard.
+    :return: `SEARCH_RESULTS`, `SEARCH_NO_RESULTS`, or False while the search is not done.
+    """
+    if browser.find_elements(By.ID, "scrollerItem"):
+        return SEARCH_RESULTS
+    if browser.find_elements(By.CSS_SELECTOR, NO_RESULTS_SELECTOR):
+        return SEARCH_NO_RESULTS
+    return False
+
+
+@contextmanager
+def browser_session(driver=None, pool=None):
+    """
+    Yields a driver to work with: the given one, one from the pool, or a new one that is quit afterward.
+
+    :param driver: Optional, driver to use as is (it is not quit).
+    :param pool: Optional, `BrowserPool` to take a driver from.
+    """
+    if driver is not None:
+        yield driver
+    elif pool is not None:
+        with pool.session() as pooled_driver:
+            yield pooled_driver
+    else:
+        new_driver = webdriver.Firefox(options=firefox_options)
+        try:
+            yield new_driver
+        finally:
+            new_driver.quit()
+
 
 def get_bvger_page(target: str, lang="de", full_text=False, download=False, download_folder=BASE_DOWNLOAD_FOLDER,
-                   verbose=False):
+                   verbose=False, driver=None, pool=None, limiter=None, downloader=None,
+                   corpus=None, snapshots=None):
     """
     Returns a specific page parameters.
 
@@ -60,142 +426,344 @@ def get_bvger_page(target: str, lang="de", full_text=False, download=False, down
     :param download: Download the PDF. If `full_text` is True, the text is saved as a file as well.
     :param download_folder: Download folder.
     :param verbose: Debug.
+    :param driver: Optional, Selenium driver to use instead of starting a new browser.
+    :param pool: Optional, `BrowserPool` to take a driver from.
+    :param limiter: Optional, `RateLimiter` to wait on before loading the page.
+    :param downloader: Optional, `PdfDownloader` to queue the PDF in, instead of downloading it before returning.
+    :param corpus: Optional, `Corpus` to save the text in, instead of a file.
+    :param snapshots: Optional, `Corpus` to save the rendered page in, by cache ID (see `reparse`).
     :return:
     """
+    endpoint = urljoin(BASE_URL, "/cache?guiLanguage={lang}&id={target}")
+
+    # Ensure that we only work with the target ID
+    if BASE_URL in target:
+        target = extract_bvger_cache_id(target)
+
     try:
-        driver = webdriver.Firefox(options=firefox_options)
-        endpoint = urljoin(BASE_URL, "/cache?guiLanguage={lang}&id={target}")
+        with browser_session(driver=driver, pool=pool) as browser:
+            # Seek for the correct page
+            target_endpoint = endpoint.format(lang=lang, target=target)
+            if verbose:
+                print(f"> Testing {target_endpoint}")
+            if limiter:
+                limiter.acquire()
+            with TRACER.stage("get"):
+                browser.get(target_endpoint)
 
-        # Ensure that we only work with the target ID
-        if BASE_URL in target:
-            target = extract_bvger_cache_id(target)
+            try:
+                # Wait for multiple elements to be present
+                with TRACER.stage("wait"):
+                    WAITS.until(browser, EC.presence_of_all_elements_located((By.ID, "customContentSegment")))
 
-        # Seek for the correct page
-        target_endpoint = endpoint.format(lang=lang, target=target)
-        if verbose:
-            print(f"> Testing {target_endpoint}")
-        driver.get(target_endpoint)
+                content = None
+                soup = None
+                if EXTRACTION == "js":
+                    # Expand and extract in the browser, without parsing the page again
+                    content = extract_page_content_js(browser, with_html=snapshots is not None)
+                    page_source = content.pop("html", None)
+                else:
+                    with TRACER.stage("expand"):
+                        expand_page(browser)
+                    with TRACER.stage("parse"):
+                        page_source = browser.page_source
+                        soup = BeautifulSoup(page_source, 'html.parser', parse_only=PAGE_STRAINER)
+                if snapshots is not None:
+                    with TRACER.stage("snapshot"):
+                        snapshots.add(target, page_source)
+            except Exception as e:
+                if verbose:
+                    print("> Elements not found within the time frame")
+                    print(f"({str(e)})")
+                content = None
+                soup = None
     except Exception as e:
         print(f"Error with Selenium: {e}")
         return None
 
-    try:
-        # Wait for multiple elements to be present
-        WebDriverWait(driver, 1).until(
-            EC.presence_of_all_elements_located((By.ID, "customContentSegment"))
-        )
+    if content or soup:
+        try:
+            result = build_page_result(
+                target,
+                target_endpoint,
+                lang,
+                content or extract_page_content(soup),
+                full_text=full_text,
+                download=download,
+                download_folder=download_folder,
+                downloader=downloader,
+                corpus=corpus,
+            )
+            if verbose:
+                pprint(result)
+            return result
+        except Exception as e:
+            print(f"Error with {target}: {str(e)}")
+            return None
 
-        # Open all dropdowns
-        dropdowns = driver.find_elements(By.CLASS_NAME, "accordionTitleCacheView")
-        for dropdown in dropdowns:
-            if "active" not in dropdown.get_attribute("class"):
-                actual_dropdown = dropdown.find_element(By.CLASS_NAME, "accordionLabelSideContentCacheView")
-                driver.execute_script("arguments[0].scrollIntoView();", actual_dropdown)
-                ActionChains(driver).click(actual_dropdown).perform()
-
-        # Click on "see more" buttons
-        buttons = driver.find_elements(By.CLASS_NAME, "infiniteScrollerMoreOrLessButton")
-        for button in buttons:
-            driver.execute_script("arguments[0].scrollIntoView();", button)
-            ActionChains(driver).click(button).perform()
-
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-    except Exception as e:
-        if verbose:
-            print("> Elements not found within the time frame")
-            print(f"({str(e)})")
-        soup = None
-    finally:
-        driver.quit()
+    return None
 
-    if soup:
-        try:
-            result = {
-                "id": target,
-                "link_page": target_endpoint,
-                "query_lang": lang,
-            }
-
-            # Main content
-            content = soup.find(id="customContentSegment")
-            title = content.find(class_="ui header").text.split(" ")[1].strip()
-            result["title"] = title
-            result["full_text"] = None
-            result["file_text"] = None
-            if full_text:
-                text = "\n".join(t.text for t in content.find_all("p"))
-                if download:
-                    filename = f"{title.replace('/', '-')}.txt"
+
+def get_bvger_page_http(target: str, http, lang="de", full_text=False, download=False,
+                        download_folder=BASE_DOWNLOAD_FOLDER, verbose=False, limiter=None,
+                        downloader=None, corpus=None) -> Optional[dict]:
+    """
+    Same as `get_bvger_page`, but through the JSON API of the site instead of a browser.
+
+    :param target: Link or ID of the BVGer.
+    :param http: `HttpBackend` to use.
+    :param lang: Optional, lang for the research interface.
+    :param full_text: See `get_bvger_page`.
+    :param download: See `get_bvger_page`.
+    :param download_folder: Download folder.
+    :param verbose: Debug.
+    :param limiter: Optional, `RateLimiter` to wait on before the request.
+    :param downloader: Optional, `PdfDownloader` to queue the PDF in.
+    :param corpus: Optional, `Corpus` to save the text in.
+    :return: Page parameters, or None if the page does not exist.
+    """
+    if BASE_URL in target:
+        target = extract_bvger_cache_id(target)
+    target_endpoint = urljoin(BASE_URL, f"/cache?guiLanguage={lang}&id={target}")
+
+    if limiter:
+        limiter.acquire()
+    with TRACER.stage("http_document"):
+        content = http.document(target, lang=lang)
+    if content is None:
+        return None
+    result = build_page_result(
+        target,
+        target_endpoint,
+        lang,
+        content,
+        full_text=full_text,
+        download=download,
+        download_folder=download_folder,
+        session=http.session,
+        downloader=downloader,
+        corpus=corpus,
+    )
+    if verbose:
+        pprint(result)
+    return result
+
+
+def expand_page(browser):
+    """
+    Opens all the dropdowns and clicks on the "see more" buttons of a page, one element at a time.
+
+    :param browser: Selenium driver, on a page.
+    """
+    # Open all dropdowns
+    dropdowns = browser.find_elements(By.CLASS_NAME, "accordionTitleCacheView")
+    for dropdown in dropdowns:
+        if "active" not in dropdown.get_attribute("class"):
+            actual_dropdown = dropdown.find_element(By.CLASS_NAME, "accordionLabelSideContentCacheView")
+            browser.execute_script("arguments[0].scrollIntoView();", actual_dropdown)
+            ActionChains(browser).click(actual_dropdown).perform()
+
+    # Click on "see more" buttons
+    buttons = browser.find_elements(By.CLASS_NAME, "infiniteScrollerMoreOrLessButton")
+    for button in buttons:
+        browser.execute_script("arguments[0].scrollIntoView();", button)
+        ActionChains(browser).click(button).perform()
+
+
+def extract_page_content_js(browser, with_html=False) -> dict:
+    """
+    Same as `expand_page` then `extract_page_content`, in two scripts run by the browser.
+
+    :param browser: Selenium driver, on a page.
+    :param with_html: Also return the source of the page, as `html` (only for the snapshots, it is the largest part).
+    :return: Title, paragraphs, link to the PDF and side menu of the page.
+    """
+    with TRACER.stage("expand"):
+        browser.execute_script(EXPAND_SCRIPT)
+        wait_expanded(browser)
+    with TRACER.stage("extract"):
+        content = browser.execute_script(EXTRACT_SCRIPT, with_html)
+    content["metadata"] = [(key, values) for key, values in content["metadata"]]
+    return content
+
+
+def wait_expanded(browser, timeout=EXPAND_WAIT):
+    """
+    Waits for the content of the dropdowns opened by `EXPAND_SCRIPT`, which may be loaded after the click: until every
+    dropdown is open and the content did not change between two polls.
+
+    :param browser: Selenium driver, on a page.
+    :param timeout: Timeout, in seconds, after which `TimeoutException` is raised instead of extracting a partial page.
+    """
+    last = [None]
+
+    def expanded(driver):
+        count = driver.execute_script(EXPANDED_SCRIPT)
+        done = count is not None and count == last[0]
+        last[0] = count
+        return done
+
+    WebDriverWait(browser, timeout, poll_frequency=WAIT_POLL).until(expanded)
+
+
+def extract_page_content(soup) -> dict:
+    """
+    Extracts the content of a rendered page.
+
+    :param soup: BeautifulSoup of the page, with all the dropdowns opened.
+    :return: Title, paragraphs, link to the PDF and side menu of the page.
+    """
+    # Main content
+    content = soup.find(id="customContentSegment")
+    title = content.find(class_="ui header").text.split(" ")[1].strip()
+    paragraphs = [t.text for t in content.find_all("p")]
+    pdf = content.find("a", {"id": "idForTutorial"}, href=True)["href"]
+
+    # Side menu
+    metadata = soup.find(id="sideMenuCacheViewAccordionComputer")
+    fields = []
+    for opt in metadata.find_all(class_="generalGridRowCacheView"):
+        key = opt.find(class_="title").text.strip()
+        values = [label.text.strip() for label in opt.find_all(class_="label-wrapper")]
+        fields.append((key, values))
+
+    return {
+        "title": title,
+        "paragraphs": paragraphs,
+        "pdf": pdf,
+        "metadata": fields,
+    }
+
+
+def build_page_result(target: str, target_endpoint: str, lang: str, content: dict, full_text=False, download=False,
+                      download_folder=BASE_DOWNLOAD_FOLDER, session=None, downloader=None,
+                      corpus=None) -> dict:
+    """
+    Builds the page parameters from the content of a page, and saves the text and PDF if asked.
+
+    :param target: ID of the BVGer.
+    :param target_endpoint: Link to the page.
+    :param lang: Lang for the research interface.
+    :param content: Content of the page, as returned by `extract_page_content`.
+    :param full_text: See `get_bvger_page`.
+    :param download: See `get_bvger_page`.
+    :param download_folder: Download folder.
+    :param session: Optional, `requests.Session` to download the PDF with.
+    :param downloader: Optional, `PdfDownloader` to queue the PDF in, instead of downloading it before returning (the
+        `file_pdf` of the result is then left to be set once the download succeeded, see `collect`).
+    :param corpus: Optional, `Corpus` to save the text in (keyed by title), instead of a file.
+    :return: Page parameters.
+    """
+    result = {
+        "id": target,
+        "link_page": target_endpoint,
+        "query_lang": lang,
+    }
+
+    # Main content
+    title = content["title"]
+    result["title"] = title
+    result["full_text"] = None
+    result["file_text"] = None
+    if full_text:
+        text = "\n".join(content["paragraphs"])
+        if download:
+            filename = f"{title.replace('/', '-')}.txt"
+            with TRACER.stage("text"):
+                if corpus is not None:
+                    corpus.add(title, text)
+                else:
                     with open(os.path.join(download_folder, "txt", filename), "w") as f:
                         f.write(text)
-                    result["file_text"] = filename
-                else:
-                    result["full_text"] = text
-            pdf = urljoin(BASE_URL, content.find("a", {"id": "idForTutorial"}, href=True)["href"])
-            result["link_pdf"] = pdf
-            result["file_pdf"] = None
-            if download:
-                filename = f"{title.replace('/', '-')}.pdf"
-                response = requests.get(pdf)
+            result["file_text"] = filename
+        else:
+            result["full_text"] = text
+    pdf = urljoin(BASE_URL, content["pdf"])
+    result["link_pdf"] = pdf
+    result["file_pdf"] = None
+    if download:
+        filename = f"{title.replace('/', '-')}.pdf"
+        if downloader:
+            downloader.submit(pdf, filename, tag=title)
+        else:
+            with TRACER.stage("pdf"):
+                response = (session or requests).get(pdf)
+                response.raise_for_status()
                 with open(os.path.join(download_folder, "pdf", filename), "wb") as f:
                     f.write(response.content)
+            result["file_pdf"] = filename
 
-                result["file_pdf"] = filename
+    # Side menu, by stable key whatever the lang of the research interface (see `fields.py`)
+    result.update(side_menu_fields(content["metadata"]))
 
-            # Side menu
-            metadata = soup.find(id="sideMenuCacheViewAccordionComputer")
-            opts = metadata.find_all(class_="generalGridRowCacheView")
+    return result
 
-            for opt in opts:
-                key = opt.find(class_="title").text.strip()
-                value = ";".join([label.text.strip() for label in opt.find_all(class_="label-wrapper")])
-                result[key] = value
 
-            if verbose:
-                pprint(result)
-            return result
-        except Exception as e:
-            print(f"Error with {target}: {str(e)}")
-            return None
-
-    return None
+class SearchTimeout(TimeoutException):
+    """
+    A search that showed neither results nor their absence in time (e.g., slow site), raised by `get_bvger_search` with
+    `raise_errors`: the title is neither found nor missing, and is searched again by the next run.
+    """
 
 
-def get_bvger_search(target: str, lang="de", verbose=False) -> Optional[str]:
+def get_bvger_search(target: str, lang="de", verbose=False, driver=None, pool=None, limiter=None,
+                     raise_errors=False, negative_cache=None) -> Optional[str]:
     """
     Tries to find a specific page, and returns a link to the page and the pdf.
 
     :param target: ID of the BVGer, e.g., `A-1337/2002`.
     :param lang: Optional, lang for the research interface.
     :param verbose: Debug.
+    :param driver: Optional, Selenium driver to use instead of starting a new browser.
+    :param pool: Optional, `BrowserPool` to take a driver from.
+    :param limiter: Optional, `RateLimiter` to wait on before loading the page.
+    :param raise_errors: Raise Selenium errors instead of returning None, to tell them apart from a missing page, and
+    `SearchTimeout` if the search shows neither results nor their absence in time. Without it, such a search is taken
+    as missing, but not recorded as such in the `negative_cache`.
+    :param negative_cache: Optional, `NegativeCache` where the title is recorded if the search shows it is missing.
     :return: Link to the page if found, else None.
     """
+    endpoint = urljoin(BASE_URL, "/dashboard?guiLanguage={lang}&q=\"{target}\"")
+
     try:
-        driver = webdriver.Firefox(options=firefox_options)
-        endpoint = urljoin(BASE_URL, "/dashboard?guiLanguage={lang}&q=\"{target}\"")
+        with browser_session(driver=driver, pool=pool) as browser:
+            # Seek for the correct page
+            target_endpoint = endpoint.format(lang=lang, target=target)
+            if verbose:
+                print(f"> Testing {target_endpoint}")
+            if limiter:
+                limiter.acquire()
+            with TRACER.stage("search_get"):
+                browser.get(target_endpoint)
 
-        # Seek for the correct page
-        target_endpoint = endpoint.format(lang=lang, target=target)
-        if verbose:
-            print(f"> Testing {target_endpoint}")
-        driver.get(target_endpoint)
+            try:
+                # Wait for the results, or for the dashboard to show that there are none
+                with TRACER.stage("search_wait") as event:
+                    state = WAITS.until(browser, search_state)
+                    event["outcome"] = state
+            except TimeoutException as e:
+                if verbose:
+                    print("> Elements not found within the time frame")
+                    print(f"({str(e)})")
+                if raise_errors:
+                    raise SearchTimeout(f"Neither results nor their absence for `{target}`") from e
+                state = None
+            soup = None
+            if state == SEARCH_RESULTS:
+                with TRACER.stage("search_parse"):
+                    soup = BeautifulSoup(browser.page_source, 'html.parser')
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Error with Selenium: {e}")
         return None
 
-    try:
-        # Wait for multiple elements to be present
-        WebDriverWait(driver, 1).until(
-            EC.presence_of_all_elements_located((By.ID, 'scrollerItem'))
-        )
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-    except Exception as e:
+    if state == SEARCH_NO_RESULTS:
         if verbose:
-            print("> Elements not found within the time frame")
-            print(f"({str(e)})")
-        soup = None
-    finally:
-        driver.quit()
+            print("> No results")
+        if negative_cache is not None:
+            negative_cache.add(target)
+        return None
 
     if soup:
         try:
@@ -209,15 +777,11 @@ def get_bvger_search(target: str, lang="de", verbose=False) -> Optional[str]:
             if not target in title:
                 if verbose:
                     print("> Target not corresponding!")
+                if negative_cache is not None:
+                    negative_cache.add(target)
                 return None
 
-            links = scroller_item.find_all("a")
-            page = None
-            for link in links:
-                link_relative = link["href"]
-                if "cache" in link_relative:
-                    param = extract_bvger_cache_id(urljoin(BASE_URL, link_relative))
-                    page = urljoin(BASE_URL, f"cache?id={param}")
+            page = extract_scroller_page(scroller_item)
 
             if verbose:
                 print(f"> Found page: {page}")
@@ -229,6 +793,125 @@ def get_bvger_search(target: str, lang="de", verbose=False) -> Optional[str]:
     return None
 
 
+def get_bvger_listing(court: str, year: int, lang="de", date_from=None, date_to=None, verbose=False, driver=None,
+                      pool=None, limiter=None, raise_errors=False, dates=None) -> dict:
+    """
+    Lists all the pages of a court and year in one dashboard query, scrolling until every result is loaded.
+
+    :param court: Court letter, e.g., `E`.
+    :param year: Year, e.g., `2025`.
+    :param lang: Optional, lang for the research interface.
+    :param date_from: Optional, only list the decisions from this date (`YYYY-MM-DD`, see `LISTING_DATE_PARAMS`).
+    :param date_to: Optional, only list the decisions until this date (`YYYY-MM-DD`).
+    :param verbose: Debug.
+    :param driver: Optional, Selenium driver to use instead of starting a new browser.
+    :param pool: Optional, `BrowserPool` to take a driver from.
+    :param limiter: Optional, `RateLimiter` to wait on before loading the page.
+    :param raise_errors: Raise Selenium errors, and a dashboard that shows neither results nor their absence in time,
+    instead of returning no pages, to tell them apart from a court and year without decisions.
+    :param dates: Optional, dict in which the dates shown by each result are set by title (see
+    `extract_scroller_dates`).
+    :return: Link to the page, by title (e.g., `{"E-15/2025": "https://bvger.weblaw.ch/cache?id=..."}`).
+    """
+    endpoint = urljoin(BASE_URL, "/dashboard?guiLanguage={lang}&q={query}")
+    query = LISTING_QUERY.format(court=court, year=year)
+    target_endpoint = endpoint.format(lang=lang, query=query)
+    if date_from or date_to:
+        target_endpoint += LISTING_DATE_PARAMS.format(date_from=date_from or "", date_to=date_to or "")
+
+    try:
+        with TRACER.target(query), browser_session(driver=driver, pool=pool) as browser:
+            if verbose:
+                print(f"> Listing {target_endpoint}")
+            if limiter:
+                limiter.acquire()
+            with TRACER.stage("listing_get"):
+                browser.get(target_endpoint)
+
+            try:
+                with TRACER.stage("listing_wait"):
+                    state = WAITS.until(browser, search_state)
+            except TimeoutException:
+                if raise_errors:
+                    raise
+                state = None
+            if state != SEARCH_RESULTS:
+                if verbose:
+                    print("> No results")
+                return {}
+
+            # Scroll until no more results are loaded
+            count = len(browser.find_elements(By.ID, "scrollerItem"))
+            for _ in range(LISTING_MAX_SCROLLS):
+                browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                try:
+                    with TRACER.stage("listing_scroll"):
+                        WebDriverWait(browser, LISTING_SCROLL_WAIT).until(
+                            lambda d: len(d.find_elements(By.ID, "scrollerItem")) > count
+                        )
+                except Exception:
+                    break
+                count = len(browser.find_elements(By.ID, "scrollerItem"))
+                if verbose:
+                    print(f"> {count} results loaded")
+
+            with TRACER.stage("listing_parse"):
+                soup = BeautifulSoup(browser.page_source, 'html.parser')
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"Error with Selenium: {e}")
+        return {}
+
+    pages = {}
+    for scroller_item in soup.find_all(id="scrollerItem"):
+        try:
+            match = TITLE_PATTERN.search(scroller_item.find(class_="header").text)
+            if not match or match.group(1) != court or int(match.group(3)) != int(year):
+                continue
+            page = extract_scroller_page(scroller_item)
+            if page:
+                title = f"{court}-{int(match.group(2))}/{int(match.group(3))}"
+                pages[title] = page
+                if dates is not None:
+                    dates[title] = extract_scroller_dates(scroller_item)
+        except Exception as e:
+            if verbose:
+                print(f"> Incorrect result ({str(e)})")
+
+    if verbose:
+        print(f"> Found {len(pages)} pages for {court} {year}")
+    return pages
+
+
+def extract_scroller_page(scroller_item) -> Optional[str]:
+    """
+    Given a dashboard result, returns the link to its page.
+
+    :param scroller_item: `scrollerItem` element of the dashboard.
+    :return: Link to the page or None.
+    """
+    page = None
+    for link in scroller_item.find_all("a"):
+        link_relative = link["href"]
+        if "cache" in link_relative:
+            param = extract_bvger_cache_id(urljoin(BASE_URL, link_relative))
+            page = urljoin(BASE_URL, f"cache?id={param}")
+    return page
+
+
+def extract_scroller_dates(scroller_item) -> Optional[str]:
+    """
+    Given a dashboard result, returns the dates it shows (e.g., of the decision and of its publication), whatever they
+    are, so that a page updated under the same ID can be told apart by `sync`.
+
+    :param scroller_item: `scrollerItem` element of the dashboard.
+    :return: Dates as `YYYY-MM-DD`, separated by `;`, or None if it shows none.
+    """
+    dates = [iso_date(date) for date in SCROLLER_DATE_PATTERN.findall(scroller_item.get_text(" "))]
+    return ";".join(date for date in dates if date) or None
+
+
 def extract_bvger_cache_id(link: str) -> Optional[str]:
     """
     Given a BVGer page, returns its ID.
@@ -244,6 +927,509 @@ def extract_bvger_cache_id(link: str) -> Optional[str]:
     return param
 
 
+def search_target(target: str, lang="de", verbose=False, pool=None, limiter=None, http=None,
+                  negative_cache=None) -> Optional[str]:
+    """
+    Tries to find a specific page, through the HTTP backend if given, with Selenium as a fallback.
+
+    :param target: Title of the BVGer, e.g., `A-1337/2002`.
+    :param lang: Optional, lang for the research interface.
+    :param verbose: Debug.
+    :param pool: Optional, `BrowserPool` to take the driver from.
+    :param limiter: Optional, `RateLimiter` to wait on before each request.
+    :param http: Optional, `HttpBackend` to try first.
+    :param negative_cache: Optional, `NegativeCache` where the title is recorded if it is missing.
+    :return: Link to the page if found, else None. Raises if both backends fail, `SearchTimeout` if the search did not
+    end in time.
+    """
+    if http:
+        try:
+            if limiter:
+                limiter.acquire()
+            with TRACER.stage("http_search"):
+                cache_id = http.search(target, lang=lang)
+            if not cache_id:
+                if negative_cache is not None:
+                    negative_cache.add(target)
+                return None
+            return urljoin(BASE_URL, f"cache?id={cache_id}")
+        except Exception as e:
+            if verbose:
+                print(f"> HTTP backend failed for {target}, falling back to Selenium ({str(e)})")
+
+    return get_bvger_search(
+        target,
+        lang=lang,
+        verbose=verbose,
+        pool=pool,
+        limiter=limiter,
+        raise_errors=True,
+        negative_cache=negative_cache,
+    )
+
+
+def page_target(page: str, lang="de", full_text=False, download=False, download_folder=BASE_DOWNLOAD_FOLDER,
+                verbose=False, pool=None, limiter=None, http=None, downloader=None,
+                corpus=None, snapshots=None) -> Optional[dict]:
+    """
+    Returns a specific page parameters, through the HTTP backend if given, with Selenium as a fallback.
+
+    :param page: Link or ID of the BVGer.
+    :param lang: Optional, lang for the research interface.
+    :param full_text: See `get_bvger_page`.
+    :param download: See `get_bvger_page`.
+    :param download_folder: Download folder.
+    :param verbose: Debug.
+    :param pool: Optional, `BrowserPool` to take the driver from.
+    :param limiter: Optional, `RateLimiter` to wait on before each request.
+    :param http: Optional, `HttpBackend` to try first.
+    :param downloader: Optional, `PdfDownloader` to queue the PDF in.
+    :param corpus: Optional, `Corpus` to save the text in.
+    :param snapshots: Optional, `Corpus` to save the rendered pages in.
+    :return: Page parameters, or None.
+    """
+    if http:
+        try:
+            temp = get_bvger_page_http(
+                page,
+                http,
+                lang=lang,
+                full_text=full_text,
+                download=download,
+                download_folder=download_folder,
+                verbose=verbose,
+                limiter=limiter,
+                downloader=downloader,
+                corpus=corpus,
+            )
+            if temp:
+                return temp
+        except Exception as e:
+            if verbose:
+                print(f"> HTTP backend failed for {page}, falling back to Selenium ({str(e)})")
+
+    return get_bvger_page(
+        page,
+        lang=lang,
+        full_text=full_text,
+        download=download,
+        download_folder=download_folder,
+        verbose=verbose,
+        pool=pool,
+        limiter=limiter,
+        downloader=downloader,
+        corpus=corpus,
+        snapshots=snapshots,
+    )
+
+
+def collect_target(target: str, lang="de", full_text=False, download=False, download_folder=BASE_DOWNLOAD_FOLDER,
+                   verbose=False, pool=None, limiter=None, journal=None, page=None, http=None,
+                   downloader=None, corpus=None, snapshots=None, negative_cache=None) -> Optional[dict]:
+    """
+    Searches for a specific title, and returns its page parameters if it exists.
+
+    :param target: Title of the BVGer, e.g., `A-1337/2002`.
+    :param lang: Optional, lang for the research interface.
+    :param full_text: See `get_bvger_page`.
+    :param download: See `get_bvger_page`.
+    :param download_folder: Download folder.
+    :param verbose: Debug.
+    :param pool: Optional, `BrowserPool` to take the drivers from.
+    :param limiter: Optional, `RateLimiter` shared with the other workers.
+    :param journal: Optional, `Journal` where the state of the title is recorded.
+    :param page: Optional, link to the page if already known (e.g., from `get_bvger_listing`), skips the search.
+    :param http: Optional, `HttpBackend` to try before Selenium.
+    :param downloader: Optional, `PdfDownloader` to queue the PDF in (the journal is then updated once downloaded).
+    :param corpus: Optional, `Corpus` to save the text in.
+    :param snapshots: Optional, `Corpus` to save the rendered pages in.
+    :param negative_cache: Optional, `NegativeCache` of the titles known to be missing, which are not searched again.
+    :return: Page parameters if found, else None.
+    """
+    # A previous run may already have found the page
+    known = journal.get(target) if journal else None
+    if page:
+        if journal:
+            journal.record(target, STATE_FOUND, page=page)
+    elif known and known[0] in (STATE_FOUND, STATE_SCRAPED) and known[1]:
+        page = known[1]
+    elif negative_cache is not None and negative_cache.is_missing(target):
+        if journal:
+            journal.record(target, STATE_NOT_FOUND)
+        return None
+    else:
+        try:
+            page = search_target(
+                target,
+                lang=lang,
+                verbose=verbose,
+                pool=pool,
+                limiter=limiter,
+                http=http,
+                negative_cache=negative_cache,
+            )
+        except SearchTimeout:
+            # Neither found nor missing, searched again by the next run (see `Journal.settled`)
+            if journal:
+                journal.record(target, STATE_TIMEOUT)
+            return None
+        except Exception:
+            if journal:
+                journal.record(target, STATE_ERROR)
+            raise
+        if not page:
+            if journal:
+                journal.record(target, STATE_NOT_FOUND)
+            return None
+        if journal:
+            journal.record(target, STATE_FOUND, page=page)
+        if negative_cache is not None:
+            negative_cache.remove(target)
+
+    temp = page_target(
+        page,
+        lang=lang,
+        full_text=full_text,
+        download=download,
+        download_folder=download_folder,
+        verbose=verbose,
+        pool=pool,
+        limiter=limiter,
+        http=http,
+        downloader=downloader,
+        corpus=corpus,
+        snapshots=snapshots,
+    )
+    if temp and journal:
+        journal.record(target, STATE_DOWNLOADED if download and not downloader else STATE_SCRAPED, result=temp)
+    return temp
+
+
+def collect(targets: list, workers=WORKERS, max_rps=MAX_RPS, browser_recycle=POOL_MAX_USES, journal=None, resume=False,
+            pages=None, backend=BACKEND, pdf_workers=PDF_WORKERS, writer=None, negative_cache=None, explorer=None,
+            **kwargs) -> int:
+    """
+    Collects multiple titles, spread across parallel workers each with its own browser.
+
+    :param targets: Titles of the BVGer, e.g., `["A-1337/2002", "A-1338/2002"]`.
+    :param workers: Number of parallel workers.
+    :param max_rps: Maximum number of requests per second, for all the workers together (None or 0 for no limit).
+    :param browser_recycle: Number of lookups after which a browser is restarted.
+    :param journal: Optional, `Journal` where the state of each title is recorded.
+    :param resume: Skip the titles already settled in the journal, and write their results again.
+    :param pages: Optional, links to the pages already known, by title.
+    :param backend: `selenium`, or `http` to go through the JSON API first (with Selenium as a fallback).
+    :param pdf_workers: Number of parallel PDF downloads, in the background of the scraping.
+    :param writer: Optional, `ResultWriter` where the page parameters are written as they are found.
+    :param negative_cache: Optional, `NegativeCache` of the titles known to be missing, which are not searched again.
+    :param explorer: Optional, `Explorer` choosing the titles to search among the targets, instead of all of them.
+    :param kwargs: Arguments for `collect_target` (lang, full_text, download, download_folder, verbose, corpus,
+        snapshots).
+    :return: Number of found titles.
+    """
+    found = 0
+    if journal and resume:
+        settled = journal.settled(download=kwargs.get("download", False)) & set(targets)
+        for temp in journal.results(titles=settled):
+            if writer:
+                writer.write(temp)
+            found += 1
+        if explorer:
+            for title in settled:
+                explorer.seed(title, journal.get(title)[0] != STATE_NOT_FOUND)
+        targets = [target for target in targets if target not in settled]
+    results_lock = threading.Lock()
+    targets_iter = iter(targets)
+    targets_lock = threading.Lock()
+    limiter = RateLimiter(max_rps)
+    http = HttpBackend(BASE_URL, pool_size=workers) if backend == "http" else None
+
+    # Results waiting for their PDF, and outcomes of the downloads waiting for their result, by title. A PDF may be
+    # downloaded twice for one title (e.g., submitted by the HTTP backend, then by the Selenium fallback)
+    pdf_results = {}
+    pdf_outcomes = {}
+    pdf_lock = threading.Lock()
+
+    def write_result(temp, filename=None, error=None):
+        # The PDF is only referenced once downloaded
+        if downloader:
+            temp["file_pdf"] = filename if error is None else None
+            if journal and error is None:
+                journal.record(temp["title"], STATE_DOWNLOADED, result=temp)
+        if writer:
+            writer.write(temp)
+
+    def on_downloaded(title, filename, error):
+        with pdf_lock:
+            temp = pdf_results.pop(title, None)
+            if temp is None:
+                # A successful download is not replaced by a failed one
+                if error is None or title not in pdf_outcomes:
+                    pdf_outcomes[title] = (filename, error)
+                return
+        write_result(temp, filename, error)
+
+    downloader = None
+    if kwargs.get("download"):
+        downloader = PdfDownloader(
+            os.path.join(kwargs.get("download_folder", BASE_DOWNLOAD_FOLDER), "pdf"),
+            workers=pdf_workers,
+            session=http.session if http else None,
+            on_done=on_downloaded,
+            tracer=TRACER,
+            verbose=kwargs.get("verbose", False),
+        )
+
+    with BrowserPool(size=workers, max_uses=browser_recycle) as pool, \
+            tqdm(total=None if explorer else len(targets), desc="Target", ncols=80) as progress:
+        def worker():
+            nonlocal found
+            while True:
+                if explorer:
+                    target = explorer.next()
+                else:
+                    with targets_lock:
+                        target = next(targets_iter, None)
+                if target is None:
+                    return
+                with TRACER.target(target), TRACER.stage("target") as event:
+                    try:
+                        temp = collect_target(target, pool=pool, limiter=limiter, journal=journal,
+                                              page=pages.get(target) if pages else None, http=http,
+                                              downloader=downloader, negative_cache=negative_cache, **kwargs)
+                        outcome = STATE_SCRAPED if temp else STATE_NOT_FOUND
+                    except Exception as e:
+                        print(f"Error with {target}: {str(e)}")
+                        temp = None
+                        outcome = STATE_ERROR
+                    state = journal.get(target) if journal and (explorer or TRACER.enabled) else None
+                    event["outcome"] = state[0] if state else outcome
+                if explorer:
+                    # A page found but not scraped still exists
+                    explorer.report(target, temp is not None or (state is not None and state[0] == STATE_FOUND))
+                if temp and downloader:
+                    with pdf_lock:
+                        downloaded = pdf_outcomes.pop(temp["title"], None)
+                        if downloaded is None:
+                            pdf_results[temp["title"]] = temp
+                    if downloaded is not None:
+                        write_result(temp, *downloaded)
+                elif temp:
+                    write_result(temp)
+                with results_lock:
+                    if temp:
+                        found += 1
+                    progress.update(1)
+
+        threads = [threading.Thread(target=worker, name=f"worker-{i}", daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if downloader:
+        downloader.close()
+    if http:
+        http.close()
+    return found
+
+
+def enumerate_pages(courts: list, years: list, workers=WORKERS, max_rps=MAX_RPS, browser_recycle=POOL_MAX_USES,
+                    lang="de", date_from=None, date_to=None, verbose=False, dates=None) -> tuple:
+    """
+    Lists the pages of several courts and years with `get_bvger_listing`, spread across parallel workers.
+
+    :param courts: Court letters.
+    :param years: Years.
+    :param workers: Number of parallel workers.
+    :param max_rps: Maximum number of requests per second, for all the workers together (None or 0 for no limit).
+    :param browser_recycle: Number of lookups after which a browser is restarted.
+    :param lang: Optional, lang for the research interface.
+    :param date_from: Optional, see `get_bvger_listing`.
+    :param date_to: Optional, see `get_bvger_listing`.
+    :param verbose: Debug.
+    :param dates: Optional, see `get_bvger_listing`.
+    :return: Link to the page, by title, and the (court, year) whose listing failed.
+    """
+    pages = {}
+    failed = []
+    limiter = RateLimiter(max_rps)
+    with BrowserPool(size=workers, max_uses=browser_recycle) as pool, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(get_bvger_listing, court, year, lang=lang, date_from=date_from, date_to=date_to,
+                            verbose=verbose, pool=pool, limiter=limiter, raise_errors=True, dates=dates): (court, year)
+            for court in courts for year in years
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Listing", ncols=80):
+            try:
+                pages.update(future.result())
+            except Exception as e:
+                court, year = futures[future]
+                print(f"Error with the listing of {court} {year}: {e}")
+                failed.append(futures[future])
+    return pages, failed
+
+
+def sync(courts: list, years: list, state, date_from=None, workers=WORKERS, max_rps=MAX_RPS,
+         browser_recycle=POOL_MAX_USES, **kwargs):
+    """
+    Lists the decisions published since a date, and collects the ones that are new or changed since the last sync, as
+    well as the ones a previous sync failed to collect.
+
+    A decision listed again is skipped if neither its page ID nor the dates shown by the dashboard changed (e.g., it was
+    collected by the previous sync, whose window overlaps). The dates are only compared once recorded by a sync.
+
+    :param courts: Court letters.
+    :param years: Years.
+    :param state: `SyncState` of the decisions already known, the collected ones must be recorded in it by the writer.
+    :param date_from: Optional, first publication date listed, as `YYYY-MM-DD` (default all the decisions).
+    :param workers: Number of parallel workers.
+    :param max_rps: Maximum number of requests per second, for all the workers together (None or 0 for no limit).
+    :param browser_recycle: Number of lookups after which a browser is restarted.
+    :param kwargs: Arguments for `collect` (journal, backend, pdf_workers, writer, lang, full_text, download, ...).
+    :return: Number of decisions listed, number of decisions collected, and whether every listing succeeded (if not,
+    the sync must not be recorded, so that the next one lists the same window again).
+    """
+    dates = {}
+    pages, failed = enumerate_pages(
+        courts,
+        years,
+        workers=workers,
+        max_rps=max_rps,
+        browser_recycle=browser_recycle,
+        lang=kwargs.get("lang", "de"),
+        date_from=date_from,
+        verbose=kwargs.get("verbose", False),
+        dates=dates,
+    )
+
+    pending = set(state.pending())
+    targets = []
+    for title, page in sorted(pages.items()):
+        known = state.get(title)
+        if title not in pending and known and known[0] == extract_bvger_cache_id(page) and \
+                (known[2] is None or known[2] == dates.get(title)):
+            continue
+        targets.append(title)
+    # Pending from a previous sync, searched again if they are not listed anymore
+    targets += [title for title in sorted(pending) if title not in pages]
+
+    # Pending until written, so that a failure is retried by the next sync
+    state.mark_pending(targets)
+    state.update_listed(dates)
+    found = 0
+    if targets:
+        found = collect(targets, workers=workers, max_rps=max_rps, browser_recycle=browser_recycle, pages=pages,
+                        **kwargs)
+
+    # Not pending anymore once known to be missing (e.g., withdrawn)
+    journal = kwargs.get("journal")
+    if journal:
+        states = {title: journal.get(title) for title in targets}
+        state.remove([title for title, known in states.items() if known and known[0] == STATE_NOT_FOUND])
+    return len(pages), found, not failed
+
+
+def work(work_queue, owner=None, lease=LEASE, results_folder=RESULTS_FOLDER, **kwargs):
+    """
+    Claims the shards of a shared `WorkQueue` one after the other and collects them, until none is left. Several
+    workers, on one or several hosts, can work on the same queue.
+
+    A shard is released, to be claimed again, if the collection failed or if some of its titles ended in an error or a
+    timeout. The results of each attempt are kept, and deduplicated when merged (see `work_queue.py merge`).
+
+    :param work_queue: `WorkQueue` of the shards.
+    :param owner: Optional, name of the worker (default `<host>-<pid>`).
+    :param lease: Duration of the lease of a shard, in seconds, renewed while it is collected.
+    :param results_folder: Folder of the results of the shards, shared by the workers.
+    :param kwargs: Arguments for `collect` (workers, max_rps, journal, backend, lang, full_text, download, ...).
+    :return: Number of shards done, and number of found titles.
+    """
+    owner = owner or default_owner()
+    journal = kwargs.get("journal")
+    done = found = 0
+    while True:
+        shard = work_queue.claim(owner, lease=lease)
+        if shard is None:
+            if not work_queue.remaining():
+                return done, found
+            # Leased by other workers, which may release them or die
+            time.sleep(CLAIM_POLL)
+            continue
+
+        targets = shard_targets(shard)
+        writer = ResultWriter(results_folder, f"shard_{shard['id']:05d}_{shard['attempts']}_{owner}", fmt="jsonl")
+        try:
+            with work_queue.hold(shard["id"], owner, lease=lease) as lost:
+                # A shard claimed again by the same host skips the titles it already settled
+                found += collect(targets, resume=True, writer=writer, **kwargs)
+        except BaseException as e:
+            writer.close()
+            work_queue.release(shard["id"], owner, error=f"{type(e).__name__}: {str(e)}")
+            if not isinstance(e, Exception):
+                raise
+            print(f"Error with shard {shard['id']}: {str(e)}")
+            continue
+        results_path = writer.close()
+
+        # Titles to be searched again, by another attempt of the shard
+        errors = [target for target in targets
+                  if journal and (journal.get(target) or [None])[0] in (STATE_ERROR, STATE_TIMEOUT)]
+        if errors:
+            work_queue.release(shard["id"], owner, error=f"{len(errors)} errors (`{errors[0]}`, ...)")
+        elif work_queue.complete(shard["id"], owner, results=results_path):
+            done += 1
+        elif lost.is_set():
+            print(f"Lost the lease of shard {shard['id']}, its results are kept (`{results_path}`)")
+
+
+def reparse_snapshot(item) -> Optional[dict]:
+    # Run in the worker processes, one `Corpus` per folder and process
+    folder, target, lang, full_text = item
+    if folder not in SNAPSHOTS:
+        SNAPSHOTS[folder] = Corpus(folder)
+    try:
+        soup = BeautifulSoup(SNAPSHOTS[folder].read(target), 'html.parser', parse_only=PAGE_STRAINER)
+        return build_page_result(
+            target,
+            urljoin(BASE_URL, f"/cache?guiLanguage={lang}&id={target}"),
+            lang,
+            extract_page_content(soup),
+            full_text=full_text,
+        )
+    except Exception as e:
+        print(f"Error with {target}: {str(e)}")
+        return None
+
+
+def reparse(folder: str, lang="de", full_text=False, jobs=REPARSE_JOBS, chunksize=REPARSE_CHUNKSIZE,
+            writer=None) -> int:
+    """
+    Rebuilds the page parameters from the snapshots of the rendered pages, in parallel and without browser.
+
+    :param folder: Folder of the snapshots, e.g., `download/snapshots/de`.
+    :param lang: Lang for the research interface the snapshots were taken in.
+    :param full_text: Save the full text in the resulting dictionary (the PDF are not downloaded again).
+    :param jobs: Number of worker processes.
+    :param chunksize: Number of pages sent at once to a worker process.
+    :param writer: Optional, `ResultWriter` where the page parameters are written.
+    :return: Number of pages parsed.
+    """
+    with Corpus(folder) as snapshots:
+        items = [(folder, target, lang, full_text) for target in snapshots.keys()]
+
+    found = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(reparse_snapshot, items, chunksize=chunksize)
+        for temp in tqdm(results, total=len(items), desc="Reparse", ncols=80):
+            if temp:
+                found += 1
+                if writer:
+                    writer.write(temp)
+    return found
+
+
 def check_and_get_ranges(inpt: str, num_min: int, num_max: int, name: str):
     temp_numbers = inpt.split(";")
     numbers = []
@@ -298,7 +1484,35 @@ if __name__ == "__main__":
     parser.add_argument("-o", "--download-folder",
                         help="Where the result will be saved (default `./download`)",
                         default=BASE_DOWNLOAD_FOLDER)
-    subparsers = parser.add_subparsers(help="`page` for a specific page, `collect` for multiple pages")
+    parser.add_argument("-b", "--backend",
+                        help=f"`selenium` to browse the site, or `http` to call its JSON API first and fall back to Selenium (default `{BACKEND}`)",
+                        choices=sorted(BACKENDS),
+                        default=BACKEND)
+    parser.add_argument("--base-url",
+                        help=f"Base URL of the site, e.g., a local stand-in from `fake_site.py` (default `{BASE_URL}`)",
+                        default=BASE_URL)
+    parser.add_argument("--extraction",
+                        help=f"`js` to expand and read a page in the browser, or `soup` to click each dropdown and parse the page source (default `{EXTRACTION}`)",
+                        choices=sorted(EXTRACTIONS),
+                        default=EXTRACTION)
+    parser.add_argument("--corpus",
+                        help=f"Save the texts in a packed corpus (`<download_folder>/{CORPUS_FOLDER}`) instead of one file per text",
+                        action="store_true")
+    parser.add_argument("--no-snapshots",
+                        help=f"Do not keep the rendered pages (`<download_folder>/{SNAPSHOT_FOLDER}/<lang>`) for `reparse`",
+                        action="store_true")
+    parser.add_argument("--export-lang",
+                        help="Lang of the headers of the side menu fields in the xlsx results, `jsonl` and `parquet` keep stable keys (default the query lang)",
+                        choices=sorted(LANGS),
+                        default=None)
+    parser.add_argument("--trace",
+                        help="Record the duration and outcome of each stage of each target in a file, as JSON lines, or in the Chrome trace format for a `.json` file",
+                        default=None)
+    parser.add_argument("--browser-recycle",
+                        help=f"Number of lookups after which a browser is restarted (default {POOL_MAX_USES})",
+                        type=int,
+                        default=POOL_MAX_USES)
+    subparsers = parser.add_subparsers(help="`page` for a specific page, `collect` for multiple pages, `sync` for the pages published since the last sync, `shard` and `work` to share a collection between workers, `reparse` for the pages already rendered")
 
     # Page subparser
     parser_page = subparsers.add_parser("page",
@@ -316,6 +1530,129 @@ if __name__ == "__main__":
                                 help="Years to be used for collection, either a single year (2007), or multiple years (\"2007;2025\"), or a range (\"2007-2025\")")
     parser_collect.add_argument("numbers",
                                 help="Numbers to be used for collection, either a single number (1), or multiple numbers (\"1;9999\"), or a range (\"1-9999\")")
+    parser_collect.add_argument("-w", "--workers",
+                                help=f"Number of parallel workers, each with its own browser (default {WORKERS})",
+                                type=int,
+                                default=WORKERS)
+    parser_collect.add_argument("--max-rps",
+                                help=f"Maximum number of requests per second, for all the workers together, 0 for no limit (default {MAX_RPS})",
+                                type=float,
+                                default=MAX_RPS)
+    parser_collect.add_argument("--pdf-workers",
+                                help=f"Number of parallel PDF downloads, in the background of the scraping (default {PDF_WORKERS})",
+                                type=int,
+                                default=PDF_WORKERS)
+    parser_collect.add_argument("-e", "--enumerate",
+                                help="List all the pages of each court and year on the dashboard, instead of searching each number",
+                                action="store_true")
+    parser_collect.add_argument("--format",
+                                help=f"Format of the results, `jsonl` and `parquet` are written as they are found, `xlsx` is exported at the end by reading all the results in memory (default `{FORMAT}`)",
+                                choices=sorted(FORMATS),
+                                default=FORMAT)
+    parser_collect.add_argument("--resume",
+                                help="Skip the titles already settled by a previous collection in the same download folder",
+                                action="store_true")
+    parser_collect.add_argument("--recheck-missing",
+                                help=f"Search again the titles known to be missing (`<download_folder>/{NEGATIVE_CACHE_FILE}`), instead of skipping them",
+                                action="store_true")
+    parser_collect.add_argument("--explore",
+                                help="Sample the numbers of each court and year first, and stop searching beyond the highest number found, instead of searching all the numbers",
+                                action="store_true")
+    parser_collect.add_argument("--explore-stride",
+                                help=f"Distance between the numbers sampled first with `--explore` (default {EXPLORE_STRIDE})",
+                                type=int,
+                                default=EXPLORE_STRIDE)
+    parser_collect.add_argument("--explore-misses",
+                                help=f"Numbers in a row missing beyond the highest number found, after which `--explore` stops (default {EXPLORE_MISSES})",
+                                type=int,
+                                default=EXPLORE_MISSES)
+
+    # Sync subparser
+    parser_sync = subparsers.add_parser("sync",
+                                        help="Collect the pages published or changed since the last sync, and merge them into `<download_folder>/all.parquet`")
+    parser_sync.add_argument("courts",
+                             help="Courts to be synced, either a single letter (A), or multiple letters (\"A;F\")")
+    parser_sync.add_argument("-y", "--years",
+                             help=f"Years to be listed, either a single year (2007), or multiple years (\"2007;2025\"), or a range (\"2007-2025\") (default the {RECENT_YEARS} last years)",
+                             default=None)
+    parser_sync.add_argument("--since",
+                             help=f"First publication date to be listed (`YYYY-MM-DD`), instead of {SYNC_OVERLAP} day before the last sync (`<download_folder>/{SYNC_FILE}`), or all for the first sync. The date filter of the dashboard is not checked, it may list all the decisions of the years",
+                             default=None)
+    parser_sync.add_argument("-w", "--workers",
+                             help=f"Number of parallel workers, each with its own browser (default {WORKERS})",
+                             type=int,
+                             default=WORKERS)
+    parser_sync.add_argument("--max-rps",
+                             help=f"Maximum number of requests per second, for all the workers together, 0 for no limit (default {MAX_RPS})",
+                             type=float,
+                             default=MAX_RPS)
+    parser_sync.add_argument("--pdf-workers",
+                             help=f"Number of parallel PDF downloads, in the background of the scraping (default {PDF_WORKERS})",
+                             type=int,
+                             default=PDF_WORKERS)
+    parser_sync.add_argument("--format",
+                             help=f"Format of the results, written in `<download_folder>/all` (default `{SYNC_FORMAT}`)",
+                             choices=sorted(SYNC_FORMATS),
+                             default=SYNC_FORMAT)
+    parser_sync.add_argument("--no-export",
+                             help="Only update `all.parquet`, without the xlsx export",
+                             action="store_true")
+
+    # Shard subparser
+    parser_shard = subparsers.add_parser("shard",
+                                         help="Split a collection in shards, in a queue shared by the workers of `work`")
+    parser_shard.add_argument("queue_folder",
+                              help=f"Folder of the queue (`{QUEUE_FILE}`), e.g., on a folder shared by the hosts of the workers")
+    parser_shard.add_argument("courts",
+                              help="Courts to be used for collection, either a single letter (A), or multiple letters (\"A;F\")")
+    parser_shard.add_argument("years",
+                              help="Years to be used for collection, either a single year (2007), or multiple years (\"2007;2025\"), or a range (\"2007-2025\")")
+    parser_shard.add_argument("numbers",
+                              help="Numbers to be used for collection, either a single number (1), or multiple numbers (\"1;9999\"), or a range (\"1-9999\")")
+    parser_shard.add_argument("--shard-size",
+                              help=f"Number of numbers of a court and year in each shard (default {SHARD_SIZE})",
+                              type=int,
+                              default=SHARD_SIZE)
+
+    # Work subparser
+    parser_work = subparsers.add_parser("work",
+                                        help="Collect the shards of a queue created by `shard`, until none is left")
+    parser_work.add_argument("queue_folder",
+                             help=f"Folder of the queue (`{QUEUE_FILE}`), where the results are written (`<queue_folder>/{RESULTS_FOLDER}`)")
+    parser_work.add_argument("-w", "--workers",
+                             help=f"Number of parallel workers of this process, each with its own browser (default {WORKERS})",
+                             type=int,
+                             default=WORKERS)
+    parser_work.add_argument("--max-rps",
+                             help=f"Maximum number of requests per second, for all the workers of this process together, 0 for no limit (default {MAX_RPS})",
+                             type=float,
+                             default=MAX_RPS)
+    parser_work.add_argument("--pdf-workers",
+                             help=f"Number of parallel PDF downloads, in the background of the scraping (default {PDF_WORKERS})",
+                             type=int,
+                             default=PDF_WORKERS)
+    parser_work.add_argument("--lease",
+                             help=f"Duration of the lease of a shard, in seconds, renewed while it is collected, after which a shard whose worker died is claimed again (default {LEASE})",
+                             type=int,
+                             default=LEASE)
+    parser_work.add_argument("--owner",
+                             help="Name of the worker in the queue (default `<host>-<pid>`)",
+                             default=None)
+    parser_work.add_argument("--recheck-missing",
+                             help=f"Search again the titles known to be missing (`<download_folder>/{NEGATIVE_CACHE_FILE}`), instead of skipping them",
+                             action="store_true")
+
+    # Reparse subparser
+    parser_reparse = subparsers.add_parser("reparse",
+                                           help="Parse again the rendered pages kept by `page` and `collect`, without browser")
+    parser_reparse.add_argument("-j", "--jobs",
+                                help="Number of worker processes (default the number of CPUs)",
+                                type=int,
+                                default=REPARSE_JOBS)
+    parser_reparse.add_argument("--format",
+                                help=f"Format of the results, `xlsx` is exported at the end by reading all the results in memory (default `{FORMAT}`)",
+                                choices=sorted(FORMATS),
+                                default=FORMAT)
 
     args = parser.parse_args()
 
@@ -335,6 +1672,16 @@ if __name__ == "__main__":
     full_text = args.full_text
     download = args.download
     verbose = args.verbose
+    browser_recycle = args.browser_recycle
+    backend = args.backend
+    BASE_URL = args.base_url
+    EXTRACTION = args.extraction
+    export_lang = args.export_lang or query_lang
+    if args.trace:
+        TRACER = Tracer(args.trace)
+    corpus = Corpus(os.path.join(download_folder, CORPUS_FOLDER)) if args.corpus else None
+    snapshots_folder = os.path.join(download_folder, SNAPSHOT_FOLDER, query_lang)
+    snapshots = None if args.no_snapshots else Corpus(snapshots_folder)
 
     if "title" in args:
         title = args.title
@@ -343,30 +1690,59 @@ if __name__ == "__main__":
             sys.stderr.write(f"Incorrect title in input (`{title}`)\n")
             exit(-1)
 
-        page = get_bvger_search(
-            title,
-            lang=query_lang,
+        http = HttpBackend(BASE_URL) if backend == "http" else None
+        downloaded = {}
+        downloader = PdfDownloader(
+            os.path.join(download_folder, "pdf"),
+            on_done=lambda tag, filename, error: downloaded.update({tag: filename if error is None else None}),
+            tracer=TRACER,
             verbose=verbose,
-        )
-        if page:
-            temp = get_bvger_page(
-                page,
-                lang=query_lang,
-                full_text=full_text,
-                download=download,
-                download_folder=download_folder,
-                verbose=verbose,
-            )
+        ) if download else None
+        with TRACER.target(title), BrowserPool(max_uses=browser_recycle) as pool:
+            try:
+                page = search_target(
+                    title,
+                    lang=query_lang,
+                    verbose=verbose,
+                    pool=pool,
+                    http=http,
+                )
+            except Exception as e:
+                print(f"Error with Selenium: {e}")
+                page = None
+            temp = None
+            if page:
+                temp = page_target(
+                    page,
+                    lang=query_lang,
+                    full_text=full_text,
+                    download=download,
+                    download_folder=download_folder,
+                    verbose=verbose,
+                    pool=pool,
+                    http=http,
+                    downloader=downloader,
+                    corpus=corpus,
+                    snapshots=snapshots,
+                )
+        if downloader:
+            downloader.close()
+            if temp:
+                temp["file_pdf"] = downloaded.get(temp["title"])
+        if http:
+            http.close()
 
+        if page:
             if temp:
-                df = pd.DataFrame.from_dict(temp, orient="index")
+                df = pd.DataFrame.from_dict({field_label(key, export_lang): value for key, value in temp.items()},
+                                            orient="index")
                 df.to_excel(os.path.join(download_folder, f"{title.replace('/', '-')}.xlsx"))
                 sys.stdout.write(f"Found: `{title}`\n")
             else:
                 sys.stdout.write(f"Eror with `{title}`\n")
         else:
             sys.stdout.write(f"Not found: `{title}`\n")
-    elif "courts" in args:
+    elif "enumerate" in args:
         # Split the courts input and check that it is valid
         courts = args.courts.split(";")
         for court in courts:
@@ -380,30 +1756,229 @@ if __name__ == "__main__":
         # Split the numbers input and check that it is valid
         numbers = check_and_get_ranges(args.numbers, MAX_NUMBERS[0], MAX_NUMBERS[-1], "year")
 
-        results = {}
-        for court in tqdm(courts, desc="Court", ncols=80):
-            for year in tqdm(years, desc="Year", ncols=80, leave=False):
-                for num in tqdm(numbers, desc="Num", ncols=80, leave=False):
-                    target = f"{court}-{num}/{year}"
-                    page = get_bvger_search(
-                        target,
-                        lang=query_lang,
-                        verbose=verbose,
-                    )
-                    if page:
-                        temp = get_bvger_page(
-                            page,
-                            lang=query_lang,
-                            full_text=full_text,
-                            download=download,
-                            download_folder=download_folder,
-                            verbose=verbose,
-                        )
-                        if temp:
-                            results[temp["id"]] = temp
+        # Check the workers
+        if args.workers < 1:
+            sys.stderr.write(f"Incorrect number of workers in input (`{args.workers}`)\n")
+            exit(-1)
+
+        # Check the exploration
+        if args.explore and args.enumerate:
+            sys.stderr.write("Incorrect options in input (`--explore` and `--enumerate` cannot be combined)\n")
+            exit(-1)
+        if args.explore_stride < 1 or args.explore_misses < 1:
+            sys.stderr.write(f"Incorrect exploration in input (`{args.explore_stride}`, `{args.explore_misses}`)\n")
+            exit(-1)
 
-        df = pd.DataFrame.from_dict(results, orient="index")
-        df.to_excel(os.path.join(download_folder, f"bvger_results_{datetime.datetime.now().strftime('%y-%m-%dT%H-%M-%S')}.xlsx"))
+        targets = [f"{court}-{num}/{year}" for court in courts for year in years for num in numbers]
+        explorer = None
+        if args.explore:
+            explorer = Explorer(courts, years, numbers, stride=args.explore_stride, misses=args.explore_misses)
+        pages = None
+        if args.enumerate:
+            pages, failed = enumerate_pages(
+                courts,
+                years,
+                workers=args.workers,
+                max_rps=args.max_rps,
+                browser_recycle=browser_recycle,
+                lang=query_lang,
+                verbose=verbose,
+            )
+            # The titles of a court and year whose listing failed are searched one by one
+            targets = [target for target in targets if target in pages or
+                       (target.split("-", 1)[0], int(target.rsplit("/", 1)[1])) in failed]
+        name = f"bvger_results_{datetime.datetime.now().strftime('%y-%m-%dT%H-%M-%S')}"
+        writer = ResultWriter(download_folder, name, fmt=args.format, export_lang=export_lang)
+        with Journal.in_folder(download_folder) as journal, \
+                NegativeCache.in_folder(download_folder, recheck=args.recheck_missing) as negative_cache:
+            found = collect(
+                targets,
+                workers=args.workers,
+                max_rps=args.max_rps,
+                browser_recycle=browser_recycle,
+                journal=journal,
+                resume=args.resume,
+                pages=pages,
+                backend=backend,
+                pdf_workers=args.pdf_workers,
+                writer=writer,
+                negative_cache=negative_cache,
+                explorer=explorer,
+                lang=query_lang,
+                full_text=full_text,
+                download=download,
+                download_folder=download_folder,
+                verbose=verbose,
+                corpus=corpus,
+                snapshots=snapshots,
+            )
+
+        results_path = writer.close()
+        if explorer:
+            sys.stdout.write(f"{explorer.summary()}\n")
+        if TRACER.enabled:
+            sys.stdout.write(f"{TRACER.summary()}\n")
+        sys.stdout.write(f"Found: {found} (`{results_path}`)\n")
+    elif "shard_size" in args:
+        # Split the courts input and check that it is valid
+        courts = args.courts.split(";")
+        for court in courts:
+            if court not in MAX_COURTS:
+                sys.stderr.write(f"Incorrect court in input (`{court}`) not in `{', '.join(sorted(MAX_COURTS))}`\n")
+                exit(-1)
+
+        # Split the years and numbers inputs and check that they are valid
+        years = check_and_get_ranges(args.years, MAX_YEARS[0], MAX_YEARS[-1], "year")
+        numbers = check_and_get_ranges(args.numbers, MAX_NUMBERS[0], MAX_NUMBERS[-1], "number")
+
+        if args.shard_size < 1:
+            sys.stderr.write(f"Incorrect shard size in input (`{args.shard_size}`)\n")
+            exit(-1)
+
+        Path(args.queue_folder, RESULTS_FOLDER).mkdir(parents=True, exist_ok=True)
+        with WorkQueue.in_folder(args.queue_folder) as work_queue:
+            count = work_queue.add(split_shards(courts, years, numbers, shard_size=args.shard_size))
+            counts = work_queue.counts()
+        sys.stdout.write(f"Shards: {count} added, {', '.join(f'{state}: {n}' for state, n in counts.items())}\n")
+    elif "owner" in args:
+        if not os.path.exists(os.path.join(args.queue_folder, QUEUE_FILE)):
+            sys.stderr.write(f"Incorrect folder (`{args.queue_folder}`) has no queue\n")
+            exit(-1)
+        if args.workers < 1 or args.lease < 1:
+            sys.stderr.write(f"Incorrect input (`{args.workers}`, `{args.lease}`)\n")
+            exit(-1)
+
+        Path(args.queue_folder, RESULTS_FOLDER).mkdir(parents=True, exist_ok=True)
+
+        # The journal and the missing titles stay local to the host, only the shards are shared
+        with WorkQueue.in_folder(args.queue_folder) as work_queue, \
+                Journal.in_folder(download_folder) as journal, \
+                NegativeCache.in_folder(download_folder, recheck=args.recheck_missing) as negative_cache:
+            done, found = work(
+                work_queue,
+                owner=args.owner,
+                lease=args.lease,
+                results_folder=os.path.join(args.queue_folder, RESULTS_FOLDER),
+                workers=args.workers,
+                max_rps=args.max_rps,
+                browser_recycle=browser_recycle,
+                journal=journal,
+                backend=backend,
+                pdf_workers=args.pdf_workers,
+                negative_cache=negative_cache,
+                lang=query_lang,
+                full_text=full_text,
+                download=download,
+                download_folder=download_folder,
+                verbose=verbose,
+                corpus=corpus,
+                snapshots=snapshots,
+            )
+            counts = work_queue.counts()
+        if TRACER.enabled:
+            sys.stdout.write(f"{TRACER.summary()}\n")
+        sys.stdout.write(f"Shards done: {done}, found: {found}, queue: "
+                         f"{', '.join(f'{state}: {n}' for state, n in counts.items())}\n")
+    elif "since" in args:
+        # Split the courts input and check that it is valid
+        courts = args.courts.split(";")
+        for court in courts:
+            if court not in MAX_COURTS:
+                sys.stderr.write(f"Incorrect court in input (`{court}`) not in `{', '.join(sorted(MAX_COURTS))}`\n")
+                exit(-1)
+
+        # Split the years input and check that it is valid, the recent years by default
+        if args.years:
+            years = check_and_get_ranges(args.years, MAX_YEARS[0], MAX_YEARS[-1], "year")
+        else:
+            years = list(MAX_YEARS[-RECENT_YEARS:])
+
+        # Check the workers
+        if args.workers < 1:
+            sys.stderr.write(f"Incorrect number of workers in input (`{args.workers}`)\n")
+            exit(-1)
+
+        # Check the date
+        if args.since and iso_date(args.since) != args.since:
+            sys.stderr.write(f"Incorrect date in input (`{args.since}`) not `YYYY-MM-DD`\n")
+            exit(-1)
+
+        all_folder = os.path.join(download_folder, "all")
+        Path(all_folder).mkdir(parents=True, exist_ok=True)
+        merged_file = os.path.join(download_folder, merge.MERGED_NAME)
+        started = datetime.date.today().isoformat()
+        with SyncState.in_folder(download_folder) as state:
+            # First sync of a dataset already merged, its decisions are known
+            if not len(state) and os.path.exists(merged_file):
+                df = pd.read_parquet(merged_file).dropna(subset=["id"])
+                dates = df["publication_date"] if "publication_date" in df.columns else [None] * len(df)
+                state.update_many(zip(df["title"], df["id"], dates))
+
+            date_from = args.since
+            last_sync = state.last_sync()
+            if not date_from and last_sync:
+                date_from = (datetime.date.fromisoformat(last_sync) - datetime.timedelta(days=SYNC_OVERLAP)).isoformat()
+
+            name = f"bvger_sync_{datetime.datetime.now().strftime('%y-%m-%dT%H-%M-%S')}"
+            writer = ResultWriter(all_folder, name, fmt=args.format, on_flush=lambda results: state.update_many(
+                (result["title"], result["id"], result.get("publication_date")) for result in results
+            ))
+            with Journal.in_folder(download_folder) as journal:
+                listed, found, complete = sync(
+                    courts,
+                    years,
+                    state,
+                    date_from=date_from,
+                    workers=args.workers,
+                    max_rps=args.max_rps,
+                    browser_recycle=browser_recycle,
+                    journal=journal,
+                    backend=backend,
+                    pdf_workers=args.pdf_workers,
+                    writer=writer,
+                    lang=query_lang,
+                    full_text=full_text,
+                    download=download,
+                    download_folder=download_folder,
+                    verbose=verbose,
+                    corpus=corpus,
+                    snapshots=snapshots,
+                )
+            results_path = writer.close()
+            if complete:
+                state.record_sync(started, date_from=date_from, found=found)
+            else:
+                sys.stderr.write(f"Listing failed for some courts or years, the next sync lists again since "
+                                 f"{date_from or 'the start'}\n")
+            pending = len(state.pending())
+
+        # Upsert into the merged dataset, on ID
+        df = merge.merge(folder=all_folder, verbose=verbose)
+        if not args.no_export:
+            merge.export(df, export_file=os.path.join(download_folder, "all.xlsx"), lang=export_lang)
+        if TRACER.enabled:
+            sys.stdout.write(f"{TRACER.summary()}\n")
+        sys.stdout.write(f"Listed since {date_from or 'the start'}: {listed}, collected: {found} (`{results_path}`), "
+                         f"pending: {pending}, merged: {len(df)} (`{merged_file}`)\n")
+    elif "jobs" in args:
+        if not os.path.exists(os.path.join(snapshots_folder, "index.jsonl")):
+            sys.stderr.write(f"Incorrect folder (`{snapshots_folder}`) has no snapshots\n")
+            exit(-1)
+        if args.jobs < 1:
+            sys.stderr.write(f"Incorrect number of jobs in input (`{args.jobs}`)\n")
+            exit(-1)
+
+        name = f"bvger_reparse_{datetime.datetime.now().strftime('%y-%m-%dT%H-%M-%S')}"
+        writer = ResultWriter(download_folder, name, fmt=args.format, export_lang=export_lang)
+        found = reparse(snapshots_folder, lang=query_lang, full_text=full_text, jobs=args.jobs, writer=writer)
+        results_path = writer.close()
+        sys.stdout.write(f"Found: {found} (`{results_path}`)\n")
     else:
         parser.print_help(sys.stderr)
         exit(-1)
+
+    if corpus is not None:
+        corpus.close()
+    if snapshots is not None:
+        snapshots.close()
+    TRACER.close()
@@ -0,0 +1,278 @@
+import argparse
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from tqdm import tqdm
+
+CORPUS_FOLDER = "corpus"
+INDEX_FILE = "index.jsonl"
+LOCK_FILE = "index.lock"
+SHARD_FILE = "shard-{n:05d}.bin"
+SHARD_SIZE = 256 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+
+
+class Corpus:
+    """
+    Texts of the decisions packed in a few compressed shards, instead of one file per text.
+
+    Each text is compressed on its own and appended to the current shard, so that any text can be read without the
+    others. The index holds one JSON line per text (key, shard, offset, length, SHA-256 of the text), a later line for
+    the same key replacing the previous one. Shards are read through mmap.
+
+    Several processes may write to the same corpus (e.g., several `work` on one host): each write takes a lock on the
+    folder and reads the lines added to the index by the others first. The texts added by the others are only seen by
+    `read` once a text is added, or when the corpus is opened again.
+    """
+
+    def __init__(self, folder: str, shard_size=SHARD_SIZE):
+        """
+        :param folder: Folder of the corpus, created if needed.
+        :param shard_size: Size of a shard, in bytes, after which a new shard is started.
+        """
+        self.folder = folder
+        self.shard_size = shard_size
+        Path(folder).mkdir(parents=True, exist_ok=True)
+        self._index_path = os.path.join(folder, INDEX_FILE)
+        self._lock_path = os.path.join(folder, LOCK_FILE)
+        self._lock = threading.Lock()
+        self._maps = {}
+        self._writer = None
+        self._writer_shard = None
+        self._index_file = None
+
+        self.index = {}
+        self._index_end = 0
+        self._shard = 0
+        self._shard_ends = {}
+        self._load()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def add(self, key: str, text):
+        """
+        Appends a text, replacing the previous text of the same key.
+
+        :param key: Title of the decision, e.g., `E-4930/2019`.
+        :param text: Text, as str or as bytes encoded in UTF-8.
+        """
+        data = text.encode("utf-8") if isinstance(text, str) else text
+        sha256 = hashlib.sha256(data).hexdigest()
+        known = self.index.get(key)
+        if known and known["sha256"] == sha256:
+            return
+        compressed = zlib.compress(data, COMPRESSION_LEVEL)
+
+        with self._lock, self._locked():
+            # Texts added by other processes in the meantime
+            self._load()
+            offset = self._shard_ends.get(self._shard, 0)
+            if offset and offset + len(compressed) > self.shard_size:
+                self._shard += 1
+                offset = 0
+            writer = self._open_writer()
+
+            # Ignore the data written after the last indexed text (e.g., interrupted run)
+            writer.truncate(offset)
+            writer.write(compressed)
+            writer.flush()
+
+            entry = {"key": key, "shard": self._shard, "offset": offset, "length": len(compressed), "sha256": sha256}
+            line = f"{json.dumps(entry)}\n".encode("utf-8")
+            self._index_file.truncate(self._index_end)
+            self._index_file.write(line)
+            self._index_file.flush()
+            self._index_end += len(line)
+            self._add_entry(entry)
+
+    def read(self, key: str) -> str:
+        """
+        Returns the text of a decision.
+
+        :param key: Title of the decision.
+        :return: Text.
+        """
+        return self.read_bytes(key).decode("utf-8")
+
+    def read_bytes(self, key: str) -> bytes:
+        entry = self.index[key]
+        return zlib.decompress(self._read(entry["shard"], entry["offset"], entry["length"]))
+
+    def text_hash(self, key: str) -> str:
+        """
+        Returns the SHA-256 of a text, without reading it (same as the SHA-256 of its `.txt` file).
+
+        :param key: Title of the decision.
+        :return: SHA-256.
+        """
+        return self.index[key]["sha256"]
+
+    def items(self):
+        """
+        Yields all the texts, in the order of the shards.
+
+        :return: (key, text).
+        """
+        for entry in sorted(self.index.values(), key=lambda entry: (entry["shard"], entry["offset"])):
+            yield entry["key"], self.read(entry["key"])
+
+    def close(self):
+        with self._lock:
+            for shard_map, shard_file in self._maps.values():
+                shard_map.close()
+                shard_file.close()
+            self._maps = {}
+            if self._writer:
+                self._writer.close()
+                self._index_file.close()
+                self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _load(self):
+        # Reads the complete lines of the index that were not read yet, an incomplete one is overwritten by `add`
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_end)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._add_entry(json.loads(line))
+                self._index_end += len(line)
+
+    def _add_entry(self, entry: dict):
+        self.index[entry["key"]] = entry
+        self._shard = max(self._shard, entry["shard"])
+        end = entry["offset"] + entry["length"]
+        self._shard_ends[entry["shard"]] = max(self._shard_ends.get(entry["shard"], 0), end)
+
+    @contextmanager
+    def _locked(self):
+        # Lock of the folder, for the processes that write to the same corpus
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _open_writer(self):
+        if self._writer and self._writer_shard == self._shard:
+            return self._writer
+        if self._writer:
+            self._writer.close()
+        else:
+            self._index_file = open(self._index_path, "ab")
+        self._writer_shard = self._shard
+        self._writer = open(os.path.join(self.folder, SHARD_FILE.format(n=self._shard)), "ab")
+        return self._writer
+
+    def _read(self, shard: int, offset: int, length: int) -> bytes:
+        with self._lock:
+            known = self._maps.get(shard)
+            if not known or len(known[0]) < offset + length:
+                # Map the shard again if it grew since it was mapped
+                if known:
+                    known[0].close()
+                    known[1].close()
+                shard_file = open(os.path.join(self.folder, SHARD_FILE.format(n=shard)), "rb")
+                known = (mmap.mmap(shard_file.fileno(), 0, access=mmap.ACCESS_READ), shard_file)
+                self._maps[shard] = known
+            return known[0][offset:offset + length]
+
+
+def title_of(filename: str) -> str:
+    """
+    Returns the title of a decision from the name of its text file.
+
+    :param filename: Name of the file, e.g., `E-4930-2019.txt`.
+    :return: Title, e.g., `E-4930/2019`.
+    """
+    number, year = os.path.splitext(filename)[0].rsplit("-", 1)
+    return f"{number}/{year}"
+
+
+def convert(txt_folder: str, folder: str, remove=False) -> int:
+    """
+    Packs the text files of a folder into a corpus.
+
+    :param txt_folder: Folder of `.txt` files, e.g., `download/2019/txt`.
+    :param folder: Folder of the corpus, e.g., `download/2019/corpus`.
+    :param remove: Remove the text files once packed.
+    :return: Number of texts packed.
+    """
+    files = sorted(file for file in os.listdir(txt_folder) if file.endswith(".txt"))
+    with Corpus(folder) as corpus:
+        for file in tqdm(files, desc="Pack", ncols=80):
+            file_path = os.path.join(txt_folder, file)
+            with open(file_path, "rb") as f:
+                corpus.add(title_of(file), f.read())
+    if remove:
+        for file in files:
+            os.remove(os.path.join(txt_folder, file))
+    return len(files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Corpus",
+        description="Pack the text files of a download folder into a corpus, or read a text from a corpus",
+    )
+    subparsers = parser.add_subparsers(help="`convert` to pack a `txt` folder, `read` to print a text")
+
+    # Convert subparser
+    parser_convert = subparsers.add_parser("convert",
+                                           help="Pack the text files of a download folder")
+    parser_convert.add_argument("download_folder",
+                                help=f"Download folder, whose `txt` folder is packed into `{CORPUS_FOLDER}` (e.g., `download/2019`)")
+    parser_convert.add_argument("--remove",
+                                help="Remove the text files once packed",
+                                action="store_true")
+
+    # Read subparser
+    parser_read = subparsers.add_parser("read",
+                                        help="Print the text of a decision")
+    parser_read.add_argument("corpus_folder",
+                             help="Folder of the corpus (e.g., `download/2019/corpus`)")
+    parser_read.add_argument("title",
+                             help="Title of the decision (\"E-4930/2019\")")
+
+    args = parser.parse_args()
+
+    if "remove" in args:
+        txt_folder = os.path.join(args.download_folder, "txt")
+        if not os.path.isdir(txt_folder):
+            sys.stderr.write(f"Incorrect folder (`{txt_folder}`) not found\n")
+            exit(-1)
+        count = convert(txt_folder, os.path.join(args.download_folder, CORPUS_FOLDER), remove=args.remove)
+        print(f"Packed: {count}")
+
+    elif "title" in args:
+        with Corpus(args.corpus_folder) as corpus:
+            if args.title not in corpus:
+                sys.stderr.write(f"Incorrect title (`{args.title}`) not in `{args.corpus_folder}`\n")
+                exit(-1)
+            print(corpus.read(args.title))
+
+    else:
+        parser.print_help()
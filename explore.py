@@ -0,0 +1,202 @@
+import math
+import threading
+from typing import Optional
+
+EXPLORE_STRIDE = 50
+EXPLORE_MISSES = 100
+
+# Coarse probes in a row beyond the highest hit before the coarse phase stops, from the density of the hits
+COARSE_CONFIDENCE = 0.01
+COARSE_MIN_MISSES = 2
+COARSE_MAX_MISSES = 10
+
+PHASE_COARSE = "coarse"
+PHASE_FINE = "fine"
+PHASE_DONE = "done"
+
+
+class _Lane:
+    """
+    Exploration of the numbers of one court and year.
+    """
+
+    def __init__(self, court: str, year: int, numbers: list, stride: int, misses: int):
+        self.court = court
+        self.year = year
+        self.numbers = numbers
+        self.positions = {number: i for i, number in enumerate(numbers)}
+        self.coarse = numbers[::stride]
+        self.misses = misses
+        self.known = {}
+        self.outstanding = set()
+        self.probes = 0
+        self.phase = PHASE_COARSE
+        self._coarse_next = 0
+        self._fine_next = 0
+
+    def title(self, number: int) -> str:
+        return f"{self.court}-{number}/{self.year}"
+
+    @property
+    def found(self) -> int:
+        return sum(self.known.values())
+
+    @property
+    def highest(self) -> int:
+        # Position of the highest number found, -1 if none
+        return max((self.positions[number] for number, found in self.known.items() if found), default=-1)
+
+    def coarse_misses(self) -> int:
+        # Misses in a row needed to tell the end of the numbers from a gap, from the density of the coarse hits
+        probed = [self.known[number] for number in self.coarse if number in self.known]
+        density = sum(probed) / len(probed) if probed else 0
+        if density <= 0:
+            return COARSE_MAX_MISSES
+        if density >= 1:
+            return COARSE_MIN_MISSES
+        misses = math.ceil(math.log(COARSE_CONFIDENCE) / math.log(1 - density))
+        return min(COARSE_MAX_MISSES, max(COARSE_MIN_MISSES, misses))
+
+    def next(self) -> Optional[int]:
+        """
+        Returns the next number to probe, None if none can be probed until the outstanding probes are reported.
+        """
+        if self.phase == PHASE_COARSE:
+            # Coarse samples, up to a few misses beyond the highest hit
+            highest = self.highest
+            last_hit = max((i for i, number in enumerate(self.coarse)
+                            if self.known.get(number) or self.positions[number] < highest), default=-1)
+            limit = min(len(self.coarse), last_hit + 1 + self.coarse_misses())
+            while self._coarse_next < limit and self.coarse[self._coarse_next] in self.known:
+                self._coarse_next += 1
+            if self._coarse_next < limit:
+                number = self.coarse[self._coarse_next]
+                self._coarse_next += 1
+                return self._probe(number)
+            if self.outstanding:
+                return None
+            self.phase = PHASE_FINE
+
+        if self.phase == PHASE_FINE:
+            # Every number up to `misses` numbers beyond the highest hit
+            limit = min(len(self.numbers), self.highest + 1 + self.misses)
+            while self._fine_next < limit and self.numbers[self._fine_next] in self.known:
+                self._fine_next += 1
+            if self._fine_next < limit:
+                number = self.numbers[self._fine_next]
+                self._fine_next += 1
+                return self._probe(number)
+            if self.outstanding:
+                return None
+            self.phase = PHASE_DONE
+        return None
+
+    def _probe(self, number: int) -> int:
+        self.outstanding.add(number)
+        self.probes += 1
+        return number
+
+
+class Explorer:
+    """
+    Schedules the titles to search, so that a collection stops at the real end of the numbers of each court and year
+    instead of going through all the numbers asked.
+
+    Each court and year is first sampled every `stride` numbers, until a few samples in a row are missing beyond the
+    highest hit (fewer if the hits are dense). All the numbers are then searched in order, up to `misses` numbers in a
+    row missing beyond the highest hit.
+
+    Titles are handed out to the workers on demand, and the results must be reported with `report`.
+    """
+
+    def __init__(self, courts: list, years: list, numbers: list, stride=EXPLORE_STRIDE, misses=EXPLORE_MISSES):
+        """
+        :param courts: Court letters.
+        :param years: Years.
+        :param numbers: Numbers asked, sorted.
+        :param stride: Distance between the coarse samples.
+        :param misses: Numbers in a row missing beyond the highest hit after which a court and year is done.
+        """
+        self.lanes = {(court, int(year)): _Lane(court, int(year), numbers, stride, misses)
+                      for court in courts for year in years}
+        self.total = len(self.lanes) * len(numbers)
+        self.seeded = 0
+        self._order = list(self.lanes.values())
+        self._turn = 0
+        self._condition = threading.Condition()
+
+    def _lane(self, title: str):
+        court, number_year = title.split("-", 1)
+        number, year = number_year.split("/", 1)
+        return self.lanes.get((court, int(year))), int(number)
+
+    def seed(self, title: str, found: bool):
+        """
+        Records the result of a title known from a previous collection, which is then not searched again.
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        :param found: The title exists.
+        """
+        with self._condition:
+            lane, number = self._lane(title)
+            if lane and number in lane.positions and number not in lane.known:
+                lane.known[number] = found
+                self.seeded += 1
+
+    def next(self) -> Optional[str]:
+        """
+        Returns the next title to search, waiting for the outstanding results if needed.
+
+        :return: Title, or None once the exploration is done.
+        """
+        with self._condition:
+            while True:
+                pending = False
+                for i in range(len(self._order)):
+                    lane = self._order[(self._turn + i) % len(self._order)]
+                    if lane.phase == PHASE_DONE:
+                        continue
+                    number = lane.next()
+                    if number is not None:
+                        # Round-robin over the courts and years, to spread the work
+                        self._turn = (self._turn + i + 1) % len(self._order)
+                        return lane.title(number)
+                    pending = pending or lane.phase != PHASE_DONE
+                if not pending:
+                    return None
+                self._condition.wait()
+
+    def report(self, title: str, found: bool):
+        """
+        Records the result of a title handed out by `next`.
+
+        :param title: Title of the BVGer.
+        :param found: The title exists.
+        """
+        with self._condition:
+            lane, number = self._lane(title)
+            lane.outstanding.discard(number)
+            lane.known[number] = found
+            self._condition.notify_all()
+
+    @property
+    def probes(self) -> int:
+        return sum(lane.probes for lane in self.lanes.values())
+
+    def summary(self) -> str:
+        """
+        Returns the number of searches made and saved, for each court and year and in total.
+
+        :return: Text.
+        """
+        lines = []
+        for lane in self.lanes.values():
+            highest = lane.highest
+            lines.append(f"{lane.court} {lane.year}: {lane.found} found, highest "
+                         f"{lane.numbers[highest] if highest >= 0 else '-'}, {lane.probes} searches")
+        # Titles known from a previous collection are not searched either way
+        total = self.total - self.seeded
+        saved = total - self.probes
+        lines.append(f"Searches: {self.probes} instead of {total} ({saved} saved, "
+                     f"{saved / total * 100 if total else 0:.0f}%)")
+        return "\n".join(lines)
@@ -0,0 +1,434 @@
+import argparse
+import datetime
+import hashlib
+import html
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bs4 import BeautifulSoup
+
+from bvger_auto import PAGE_STRAINER, extract_page_content
+from corpus import Corpus
+from fields import field_label
+from http_backend import API_DOCUMENT, API_SEARCH, RECORD_INDEX, record_key
+
+HOST = "127.0.0.1"
+PORT = 8000
+
+# Responses delayed by `latency` seconds, give or take `jitter` (as a fraction of the latency)
+LATENCY = 0.0
+JITTER = 0.5
+
+# Synthetic decisions
+COURTS = ["A", "B", "C", "D", "E", "F"]
+YEARS = [2024]
+COUNT = 100
+MISS_RATE = 0.2
+PARAGRAPHS = 20
+SEED = 0
+LANG = "de"
+
+WORDS = [
+    "asile", "renvoi", "recours", "décision", "requérant", "autorité", "tribunal", "audition", "réfugié", "motifs",
+    "persécution", "exécution", "admission", "provisoire", "délai", "frais", "procédure", "preuve", "vraisemblance",
+    "violence", "famille", "santé", "traitement", "pays", "origine", "retour", "renvoyer", "rejeter", "admettre",
+    "Beschwerde", "Verfügung", "Vorinstanz", "Gericht", "Asyl", "Wegweisung", "Verfahren", "Flüchtling", "Gesuch",
+]
+
+# Smallest PDF shown by a reader, `{title}` as its only text
+PDF_TEMPLATE = """%PDF-1.4
+1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj
+2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj
+3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >> endobj
+4 0 obj << /Length 44 >> stream
+BT /F1 12 Tf 72 770 Td ({title}) Tj ET
+endstream endobj
+5 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> endobj
+trailer << /Root 1 0 R >>
+%%EOF
+"""
+
+
+class Site:
+    """
+    Decisions served by the synthetic stand-in of the site, generated or read from the snapshots of `bvger_auto.py`.
+    """
+
+    def __init__(self, pages: dict, miss_rate=0.0, seed=SEED):
+        """
+        :param pages: Content of each page (as returned by `extract_page_content`, with the page source as `html` if
+            known), by cache ID.
+        :param miss_rate: Fraction of the pages left out, whose titles are then missing.
+        :param seed: Seed of the pages left out.
+        """
+        rng = random.Random(seed)
+        self.pages = {cache_id: content for cache_id, content in sorted(pages.items()) if rng.random() >= miss_rate}
+        self.ids = {content["title"]: cache_id for cache_id, content in self.pages.items()}
+
+    @classmethod
+    def generate(cls, courts=COURTS, years=YEARS, count=COUNT, miss_rate=MISS_RATE, paragraphs=PARAGRAPHS, seed=SEED,
+                 lang=LANG):
+        """
+        Generates the decisions numbered from 1 to `count` of each court and year.
+
+        :param courts: Court letters.
+        :param years: Years.
+        :param count: Highest number of each court and year.
+        :param miss_rate: Fraction of the numbers without decision.
+        :param paragraphs: Number of paragraphs of each decision.
+        :param seed: Seed of the texts and of the missing numbers.
+        :param lang: Lang of the headers of the side menu.
+        :return: Site.
+        """
+        rng = random.Random(seed)
+        pages = {}
+        for court in courts:
+            for year in years:
+                for number in range(1, count + 1):
+                    title = f"{court}-{number}/{year}"
+                    cache_id = str(uuid.uuid5(uuid.NAMESPACE_URL, title))
+                    date = datetime.date(int(year), 1, 1) + datetime.timedelta(days=rng.randrange(365))
+                    pages[cache_id] = {
+                        "title": title,
+                        "paragraphs": [" ".join(rng.choices(WORDS, k=rng.randint(20, 120))) for _ in range(paragraphs)],
+                        "pdf": f"/pdf/{cache_id}.pdf",
+                        "metadata": [
+                            (field_label("division", lang), [f"Abteilung {court}"]),
+                            (field_label("decision_date", lang), [date.strftime("%d.%m.%Y")]),
+                            (field_label("language", lang), [rng.choice(["de", "fr", "it"])]),
+                            (field_label("keywords", lang), rng.sample(WORDS, 3)),
+                        ],
+                    }
+        return cls(pages, miss_rate=miss_rate, seed=seed)
+
+    @classmethod
+    def from_snapshots(cls, folder: str, miss_rate=0.0, seed=SEED):
+        """
+        Reads the rendered pages kept by `bvger_auto.py`, served as they were recorded (with local links to the PDF).
+
+        :param folder: Snapshots folder, e.g., `download/snapshots/de`.
+        :param miss_rate: Fraction of the pages left out.
+        :param seed: Seed of the pages left out.
+        :return: Site.
+        """
+        pages = {}
+        with Corpus(folder) as snapshots:
+            for cache_id, page_source in snapshots.items():
+                content = extract_page_content(BeautifulSoup(page_source, "html.parser", parse_only=PAGE_STRAINER))
+                # The PDF are served by the stand-in as well
+                pdf = f"/pdf/{cache_id}.pdf"
+                content["html"] = page_source.replace(html.escape(content["pdf"]), pdf).replace(content["pdf"], pdf)
+                content["pdf"] = pdf
+                pages[cache_id] = content
+        return cls(pages, miss_rate=miss_rate, seed=seed)
+
+    def search(self, query: str) -> list:
+        """
+        Returns the decisions matching a query of the dashboard, a title or a listing (`E-*/2025`).
+
+        :param query: Query, with or without quotes.
+        :return: (title, cache ID).
+        """
+        query = query.strip().strip("\"")
+        if "*" not in query:
+            cache_id = self.ids.get(query)
+            return [(query, cache_id)] if cache_id else []
+        prefix, year = query.split("*", 1)
+        return [(title, cache_id) for title, cache_id in self.ids.items()
+                if title.startswith(prefix) and title.endswith(year)]
+
+    def page(self, cache_id: str) -> str:
+        """
+        Returns the source of a page, with its dropdowns opened.
+
+        :param cache_id: ID of the page.
+        :return: HTML.
+        """
+        content = self.pages[cache_id]
+        if "html" in content:
+            return content["html"]
+        paragraphs = "".join(f"<p>{html.escape(paragraph)}</p>" for paragraph in content["paragraphs"])
+        rows = "".join(
+            f"<div class=\"generalGridRowCacheView\"><div class=\"title\">{html.escape(key)}</div>"
+            + "".join(f"<span class=\"label-wrapper\">{html.escape(value)}</span>" for value in values)
+            + "</div>"
+            for key, values in content["metadata"]
+        )
+        return (
+            "<html><body>"
+            f"<div id=\"customContentSegment\"><div class=\"ui header\">Urteil {content['title']}</div>"
+            f"<a id=\"idForTutorial\" href=\"{content['pdf']}\">PDF</a>{paragraphs}</div>"
+            "<div id=\"sideMenuCacheViewAccordionComputer\"><div class=\"accordionTitleCacheView active\">"
+            f"<span class=\"accordionLabelSideContentCacheView\">Metadaten</span></div>{rows}</div>"
+            "</body></html>"
+        )
+
+    def document(self, cache_id: str) -> dict:
+        """
+        Returns a page as the JSON API of the site does (see `HttpBackend.document`).
+
+        :param cache_id: ID of the page.
+        :return: Document.
+        """
+        content = self.pages[cache_id]
+        return {
+            "title": f"Urteil {content['title']}",
+            "pdfUrl": content["pdf"],
+            "content": "".join(f"<p>{html.escape(paragraph)}</p>" for paragraph in content["paragraphs"]),
+            "metadata": [{"title": key, "values": values} for key, values in content["metadata"]],
+        }
+
+
+def dashboard(results: list) -> str:
+    """
+    Returns the source of the dashboard, with all its results loaded.
+
+    :param results: (title, cache ID).
+    :return: HTML.
+    """
+    if not results:
+        return "<html><body><div id=\"noResultsMessage\">Keine Resultate</div></body></html>"
+    items = "".join(
+        f"<div id=\"scrollerItem\"><div class=\"header\">Urteil {title}</div>"
+        f"<a href=\"/cache?id={cache_id}\">{title}</a></div>"
+        for title, cache_id in results
+    )
+    return f"<html><body>{items}</body></html>"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Common part of the stand-ins, delaying every response like the site would.
+    """
+    latency = LATENCY
+    jitter = JITTER
+    verbose = False
+
+    def _delay(self):
+        if self.latency > 0:
+            time.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _send(self, status: int, content_type: str, content: bytes, headers=None, body=True):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+class ReplayHandler(StandInHandler):
+    """
+    Replays the responses recorded by `HttpBackend(record_folder=...)`.
+    """
+    fixtures_folder = None
+    index = {}
+
+    def do_GET(self):
+        self._replay("GET")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else None
+        self._replay("POST", body)
+
+    def _replay(self, method: str, body=None):
+        self._delay()
+        key = record_key(method, self.path, body)
+        recorded = self.index.get(key)
+        if recorded is None:
+            self.send_error(404, f"Not recorded: `{key}`")
+            return
+
+        with open(os.path.join(self.fixtures_folder, recorded["file"]), "rb") as f:
+            content = f.read()
+        self._send(recorded["status"], recorded["content_type"], content)
+
+
+class SiteHandler(StandInHandler):
+    """
+    Serves the dashboard, the pages, the JSON API and the PDF of a `Site`.
+    """
+    site = None
+
+    def do_GET(self):
+        self._delay()
+        self._get()
+
+    def do_HEAD(self):
+        self._delay()
+        self._get(body=False)
+
+    def do_POST(self):
+        self._delay()
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if urlparse(self.path).path != API_SEARCH:
+            self.send_error(404)
+            return
+        results = self.site.search(payload.get("userInput", ""))[:payload.get("size", 10)]
+        documents = [{"id": cache_id, "leid": cache_id, "title": f"Urteil {title}"} for title, cache_id in results]
+        self._send(200, "application/json", json.dumps({"documents": documents}).encode())
+
+    def _get(self, body=True):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        document_prefix = API_DOCUMENT.split("{", 1)[0]
+
+        if url.path == "/dashboard":
+            content = dashboard(self.site.search(query.get("q", "")))
+            self._send(200, "text/html; charset=utf-8", content.encode(), body=body)
+        elif url.path == "/cache" and query.get("id") in self.site.pages:
+            self._send(200, "text/html; charset=utf-8", self.site.page(query["id"]).encode(), body=body)
+        elif url.path.startswith(document_prefix) and url.path[len(document_prefix):] in self.site.pages:
+            content = json.dumps(self.site.document(url.path[len(document_prefix):]))
+            self._send(200, "application/json", content.encode(), body=body)
+        elif url.path.startswith(document_prefix):
+            # Missing document, told apart from a wrong endpoint by its JSON body
+            self._send(404, "application/json", b"{}", body=body)
+        elif url.path.startswith("/pdf/") and url.path[len("/pdf/"):-len(".pdf")] in self.site.pages:
+            title = self.site.pages[url.path[len("/pdf/"):-len(".pdf")]]["title"]
+            content = PDF_TEMPLATE.format(title=title).encode()
+            etag = f"\"{hashlib.sha1(content).hexdigest()}\""
+            self._send(200, "application/pdf", content, headers={"ETag": etag}, body=body)
+        else:
+            self.send_error(404)
+
+
+def serve(fixtures_folder: str, host=HOST, port=PORT, latency=LATENCY, jitter=JITTER, verbose=False) -> ThreadingHTTPServer:
+    """
+    Creates a local stand-in of the site, replaying recorded responses.
+
+    :param fixtures_folder: Folder of the recorded responses.
+    :param host: Host to listen on.
+    :param port: Port to listen on (0 for any free port).
+    :param latency: Delay of each response, in seconds.
+    :param jitter: Variation of the delay, as a fraction of the latency.
+    :param verbose: Log every request.
+    :return: Server, to be run with `serve_forever`.
+    """
+    with open(os.path.join(fixtures_folder, RECORD_INDEX), "r") as f:
+        index = json.load(f)
+
+    handler = type("Handler", (ReplayHandler,), {
+        "fixtures_folder": fixtures_folder,
+        "index": index,
+        "latency": latency,
+        "jitter": jitter,
+        "verbose": verbose,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_site(site: Site, host=HOST, port=PORT, latency=LATENCY, jitter=JITTER, verbose=False) -> ThreadingHTTPServer:
+    """
+    Creates a local stand-in of the site, serving the decisions of a `Site`.
+
+    :param site: Decisions.
+    :param host: Host to listen on.
+    :param port: Port to listen on (0 for any free port).
+    :param latency: Delay of each response, in seconds.
+    :param jitter: Variation of the delay, as a fraction of the latency.
+    :param verbose: Log every request.
+    :return: Server, to be run with `serve_forever`.
+    """
+    handler = type("Handler", (SiteHandler,), {
+        "site": site,
+        "latency": latency,
+        "jitter": jitter,
+        "verbose": verbose,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Fake Site",
+        description="Local stand-in of the BVGer site, replaying recorded responses, or serving recorded pages or generated decisions",
+    )
+    parser.add_argument("fixtures_folder",
+                        help="Folder of the recorded responses (with an `index.json`), or snapshots folder of `bvger_auto.py` (e.g., `download/snapshots/de`), or nothing to generate the decisions",
+                        nargs="?")
+    parser.add_argument("--host",
+                        help=f"Host to listen on (default `{HOST}`)",
+                        default=HOST)
+    parser.add_argument("-p", "--port",
+                        help=f"Port to listen on (default {PORT})",
+                        type=int,
+                        default=PORT)
+    parser.add_argument("--latency",
+                        help=f"Delay of each response, in seconds (default {LATENCY})",
+                        type=float,
+                        default=LATENCY)
+    parser.add_argument("--jitter",
+                        help=f"Variation of the delay, as a fraction of the latency (default {JITTER})",
+                        type=float,
+                        default=JITTER)
+    parser.add_argument("--miss-rate",
+                        help=f"Fraction of the decisions missing, for generated decisions or snapshots (default {MISS_RATE} generated, 0 snapshots)",
+                        type=float)
+    parser.add_argument("--courts",
+                        help=f"Courts of the generated decisions (default \"{';'.join(COURTS)}\")",
+                        default=";".join(COURTS))
+    parser.add_argument("--years",
+                        help=f"Years of the generated decisions (default \"{';'.join(str(year) for year in YEARS)}\")",
+                        default=";".join(str(year) for year in YEARS))
+    parser.add_argument("-n", "--count",
+                        help=f"Highest number of the generated decisions of each court and year (default {COUNT})",
+                        type=int,
+                        default=COUNT)
+    parser.add_argument("--seed",
+                        help=f"Seed of the generated decisions and of the missing ones (default {SEED})",
+                        type=int,
+                        default=SEED)
+    parser.add_argument("-v", "--verbose",
+                        help="Debug",
+                        action="store_true")
+    args = parser.parse_args()
+
+    if args.latency < 0 or not 0 <= args.jitter <= 1 or (args.miss_rate is not None and not 0 <= args.miss_rate < 1):
+        sys.stderr.write(f"Incorrect latency in input (`{args.latency}`, `{args.jitter}`, `{args.miss_rate}`)\n")
+        exit(-1)
+
+    if args.fixtures_folder is None:
+        site = Site.generate(
+            courts=args.courts.split(";"),
+            years=[int(year) for year in args.years.split(";")],
+            count=args.count,
+            miss_rate=MISS_RATE if args.miss_rate is None else args.miss_rate,
+            seed=args.seed,
+        )
+        server = serve_site(site, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                            verbose=args.verbose)
+        print(f"Decisions: {len(site.pages)}")
+    elif os.path.exists(os.path.join(args.fixtures_folder, "index.jsonl")):
+        site = Site.from_snapshots(args.fixtures_folder, miss_rate=args.miss_rate or 0.0, seed=args.seed)
+        server = serve_site(site, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                            verbose=args.verbose)
+        print(f"Decisions: {len(site.pages)}")
+    elif os.path.exists(os.path.join(args.fixtures_folder, RECORD_INDEX)):
+        server = serve(args.fixtures_folder, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                       verbose=args.verbose)
+    else:
+        sys.stderr.write(f"No `{RECORD_INDEX}` nor `index.jsonl` in `{args.fixtures_folder}`\n")
+        exit(-1)
+
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
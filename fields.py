@@ -0,0 +1,224 @@
+import json
+import sys
+import unicodedata
+from typing import Optional
+
+# Columns that do not depend on the lang of the research interface
+BASE_COLUMNS = [
+    "id",
+    "link_page",
+    "query_lang",
+    "court",
+    "number",
+    "year",
+    "title",
+    "full_text",
+    "file_text",
+    "link_pdf",
+    "file_pdf",
+]
+
+# Side menu of a page, stable key and header in each lang of the research interface
+# Headers are matched without case nor accents, see `EXTRA_COLUMN` for the headers that are not known
+FIELDS = {
+    "division": {
+        "de": "ABTEILUNG",
+        "fr": "COUR",
+        "it": "CORTE",
+    },
+    "decision_date": {
+        "de": "ENTSCHEIDDATUM",
+        "fr": "DATE DE LA DÉCISION",
+        "it": "DATA DELLA DECISIONE",
+    },
+    "language": {
+        "de": "SPRACHE",
+        "fr": "LANGUE",
+        "it": "LINGUA",
+    },
+    "bvge_other": {
+        "de": "BVGE / ANDERE ENTSCHEIDE",
+        "fr": "ATAF / AUTRES ARRÊTS",
+        "it": "DTAF / ALTRE SENTENZE",
+    },
+    "cited_bvge": {
+        "de": "ZITIERTE BVGE",
+        "fr": "ATAF CITÉS",
+        "it": "DTAF CITATE",
+    },
+    "cited_bvger": {
+        "de": "ZITIERTE WEITERE BVGER-ENTSCHEIDE",
+        "fr": "AUTRES ARRÊTS DU TAF CITÉS",
+        "it": "ALTRE SENTENZE DEL TAF CITATE",
+    },
+    "keywords": {
+        "de": "ERKANNTE SCHLAGWÖRTER",
+        "fr": "MOTS-CLÉS RECONNUS",
+        "it": "PAROLE CHIAVE RICONOSCIUTE",
+    },
+    "reception_year": {
+        "de": "EINGANGSJAHR",
+        "fr": "ANNÉE DE RÉCEPTION",
+        "it": "ANNO DI RICEZIONE",
+    },
+    "publication_date": {
+        "de": "PUBLIKATIONSDATUM",
+        "fr": "DATE DE LA PUBLICATION",
+        "it": "DATA DELLA PUBBLICAZIONE",
+    },
+    "federal_legislation": {
+        "de": "BUNDESRECHT",
+        "fr": "LÉGISLATION FÉDERALE",
+        "it": "LEGISLAZIONE FEDERALE",
+    },
+    "systematic_collection": {
+        "de": "SYSTEMATISCHE RECHTSSAMMLUNG",
+        "fr": "RECUEIL SYSTÉMATIQUE",
+        "it": "RACCOLTA SISTEMATICA",
+    },
+    "official_collection": {
+        "de": "AMTLICHE SAMMLUNG DES BUNDESRECHTS",
+        "fr": "RECUEIL OFFICIEL DU DROIT FÉDÉRAL",
+        "it": "RACCOLTA UFFICIALE DEL DIRITTO FEDERALE",
+    },
+    "cited_bge": {
+        "de": "ZITIERTE BGE",
+        "fr": "ATF CITÉS",
+        "it": "DTF CITATE",
+    },
+    "cited_bger": {
+        "de": "ZITIERTE WEITERE BGER-ENTSCHEIDE",
+        "fr": "AUTRES ARRÊTS DU TF CITÉS",
+        "it": "ALTRE SENTENZE DEL TF CITATE",
+    },
+    "federal_gazette": {
+        "de": "BUNDESBLATT",
+        "fr": "FEUILLE FÉDÉRALE",
+        "it": "FOGLIO FEDERALE",
+    },
+    "cited_bstger": {
+        "de": "ZITIERTE WEITERE BSTGER-ENTSCHEIDE",
+        "fr": "AUTRES ARRÊTS DU TPF CITÉS",
+        "it": "ALTRE SENTENZE DEL TPF CITATE",
+    },
+    "linked_bvge": {
+        "de": "VERKNÜPFTER BVGE-ENTSCHEID",
+        "fr": "DÉCISION ATAF LIÉE",
+        "it": "DECISIONE DTAF COLLEGATA",
+    },
+    "official_bulletin": {
+        "de": "AMTLICHES BULLETIN",
+        "fr": "BULLETIN OFFICIEL",
+        "it": "BOLLETTINO UFFICIALE",
+    },
+    "cited_bstger_official": {
+        "de": "ZITIERTE ENTSCHEIDE DER AMTLICHEN SAMMLUNG BSTGER",
+        "fr": "ARRÊTS DU RECUEIL OFFICIEL TPF CITÉS",
+        "it": "SENTENZE DELLA RACCOLTA UFFICIALE TPF CITATE",
+    },
+}
+
+# Column that keeps the side menu headers that are not known, as a JSON object of header and value, so that a header
+# renamed on the site does not add a column
+EXTRA_COLUMN = "extra"
+
+_warned = set()
+
+
+def _normalize(label: str) -> str:
+    label = unicodedata.normalize("NFKD", label.strip().upper())
+    return "".join(c for c in label if not unicodedata.combining(c))
+
+
+_KEYS_BY_LABEL = {
+    _normalize(label): key
+    for key, labels in FIELDS.items()
+    for label in labels.values()
+}
+
+
+def field_key(label: str) -> Optional[str]:
+    """
+    Returns the stable key of a side menu header, in any lang.
+
+    :param label: Header, e.g., `DATE DE LA DÉCISION`.
+    :return: Key, e.g., `decision_date`, or None if not known.
+    """
+    return _KEYS_BY_LABEL.get(_normalize(label))
+
+
+def side_menu_fields(metadata) -> dict:
+    """
+    Returns the fields of a side menu by stable key, the headers that are not known are kept under `EXTRA_COLUMN` and
+    a warning is printed once for each of them.
+
+    :param metadata: Pairs of header and values, as read from a page.
+    :return: Fields, with `EXTRA_COLUMN` always set.
+    """
+    fields = {}
+    extra = {}
+    for label, values in metadata:
+        key = field_key(label)
+        if key:
+            fields[key] = ";".join(values)
+            continue
+        if label not in _warned:
+            _warned.add(label)
+            sys.stderr.write(f"Unknown side menu header (`{label}`), kept under `{EXTRA_COLUMN}`\n")
+        extra[label] = ";".join(values)
+    fields[EXTRA_COLUMN] = to_extra(extra)
+    return fields
+
+
+def to_extra(extra: dict) -> Optional[str]:
+    """
+    Returns the value of `EXTRA_COLUMN` for headers that are not known.
+
+    :param extra: Values by header.
+    :return: JSON object, or None if empty.
+    """
+    return json.dumps(extra, ensure_ascii=False) if extra else None
+
+
+def field_label(key: str, lang="fr") -> str:
+    """
+    Returns the header of a stable key in a lang.
+
+    :param key: Key, e.g., `decision_date`.
+    :param lang: Lang of the research interface.
+    :return: Header, e.g., `DATE DE LA DÉCISION`, or the key itself if not known.
+    """
+    return FIELDS[key][lang] if key in FIELDS else key
+
+
+def canonical_columns(columns) -> list:
+    """
+    Returns the stable keys of a list of columns, base columns are kept as is.
+
+    :param columns: Columns, with side menu headers in any lang.
+    :return: Columns, the headers that are not known are kept as is (see `extra_columns`).
+    """
+    return [column if column in BASE_COLUMNS else field_key(column) or column for column in columns]
+
+
+def extra_columns(columns) -> list:
+    """
+    Returns the columns that are neither base columns nor stable keys, i.e., side menu headers that are not known.
+
+    :param columns: Columns, with stable keys.
+    :return: Columns.
+    """
+    known = set(BASE_COLUMNS) | set(FIELDS) | {EXTRA_COLUMN}
+    return [column for column in columns if column not in known]
+
+
+def ordered_columns(columns) -> list:
+    """
+    Sorts stable keys in the usual order: base columns, side menu fields, `EXTRA_COLUMN`, then the others.
+
+    :param columns: Columns.
+    :return: Columns.
+    """
+    order = BASE_COLUMNS + list(FIELDS) + [EXTRA_COLUMN]
+    known = [column for column in order if column in columns]
+    return known + [column for column in columns if column not in order]
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+# JSON API used by the site itself (see the XHR of the dashboard and of the cache view). The endpoints and the shape
+# of their responses are not documented by the site and may change: any unexpected response raises, so that the
+# caller falls back to Selenium, and the API is not called anymore after `API_MAX_FAILURES` failures in a row
+API_SEARCH = "/api/.netlify/functions/searchQueryService"
+API_DOCUMENT = "/api/.netlify/functions/singleDocQueryService/{id}"
+API_TIMEOUT = 10
+API_MAX_FAILURES = 5
+API_HEADERS = {"Accept": "application/json"}
+
+RECORD_INDEX = "index.json"
+
+
+class HttpBackend:
+    """
+    Browserless access to the site, through its JSON API and one keep-alive `requests.Session`.
+
+    Every method raises if the response does not have the expected shape, so that the caller can fall back to Selenium.
+    """
+
+    def __init__(self, base_url: str, pool_size=10, timeout=API_TIMEOUT, record_folder=None):
+        """
+        :param base_url: Base URL of the site (or of a local stand-in, see `fake_site.py`).
+        :param pool_size: Number of connections kept alive (at least the number of workers).
+        :param timeout: Timeout of a request, in seconds.
+        :param record_folder: Optional, folder where every response is recorded, to be replayed by `fake_site.py`.
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.record_folder = record_folder
+        self.failures = 0
+        self._record_lock = threading.Lock()
+        self._failures_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def search(self, target: str, lang="de") -> Optional[str]:
+        """
+        Tries to find a specific page.
+
+        :param target: Title of the BVGer, e.g., `A-1337/2002`.
+        :param lang: Optional, lang for the research interface.
+        :return: ID of the page if found, else None.
+        """
+        payload = {
+            "guiLanguage": lang,
+            "userInput": f"\"{target}\"",
+            "aggs": {"fields": []},
+            "size": 1,
+        }
+        data = self._request("POST", API_SEARCH, payload)
+        if not isinstance(data, dict) or not isinstance(data.get("documents"), list):
+            raise ValueError(f"Unexpected search response for `{target}`")
+
+        for document in data["documents"]:
+            title = _first_value(document, "title")
+            if title and target in title:
+                return document.get("leid") or document["id"]
+        return None
+
+    def document(self, cache_id: str, lang="de") -> Optional[dict]:
+        """
+        Returns the content of a page, in the format of `bvger_auto.extract_page_content`.
+
+        :param cache_id: ID of the page.
+        :param lang: Optional, lang for the research interface.
+        :return: Title, paragraphs, link to the PDF and side menu of the page, or None if the page does not exist.
+        """
+        data = self._request("GET", f"{API_DOCUMENT.format(id=cache_id)}?guiLanguage={lang}")
+        if not data:
+            return None
+
+        title = _first_value(data, "title")
+        pdf = _first_value(data, "pdfUrl") or _first_value(data, "pdf")
+        if not title or not pdf:
+            raise ValueError(f"Incomplete document `{cache_id}`")
+        soup = BeautifulSoup(data["content"], "html.parser")
+        paragraphs = [t.text for t in soup.find_all("p")]
+
+        # Side menu, either as a list of {title, values} or as a mapping
+        metadata = data.get("metadata", [])
+        if isinstance(metadata, dict):
+            metadata = [{"title": key, "values": values} for key, values in metadata.items()]
+        fields = []
+        for field in metadata:
+            values = field["values"]
+            if isinstance(values, str):
+                values = [values]
+            fields.append((field["title"].strip(), [str(value).strip() for value in values]))
+
+        return {
+            "title": title.split(" ")[-1].strip(),
+            "paragraphs": paragraphs,
+            "pdf": pdf,
+            "metadata": fields,
+        }
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def available(self) -> bool:
+        return self.failures < API_MAX_FAILURES
+
+    def _request(self, method: str, path: str, payload=None):
+        if not self.available:
+            raise RuntimeError(f"API disabled after {self.failures} failures in a row")
+        try:
+            data = self._api_request(method, path, payload)
+        except (requests.RequestException, ValueError):
+            with self._failures_lock:
+                self.failures += 1
+            raise
+        with self._failures_lock:
+            self.failures = 0
+        return data
+
+    def _api_request(self, method: str, path: str, payload=None):
+        url = urljoin(self.base_url, path)
+        body = json.dumps(payload) if payload is not None else None
+        # Only on the API calls, the session also downloads the PDF
+        headers = dict(API_HEADERS, **({"Content-Type": "application/json"} if body else {}))
+        response = self.session.request(method, url, data=body, headers=headers, timeout=self.timeout)
+        if self.record_folder:
+            self._record(method, url, body, response)
+        # A missing document is a JSON 404, anything else not JSON means that the endpoint is wrong
+        if "json" not in response.headers.get("Content-Type", ""):
+            raise ValueError(f"Non-JSON response from `{path}` ({response.status_code})")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def _record(self, method: str, url: str, body, response):
+        with self._record_lock:
+            index_path = os.path.join(self.record_folder, RECORD_INDEX)
+            os.makedirs(self.record_folder, exist_ok=True)
+            index = {}
+            if os.path.exists(index_path):
+                with open(index_path, "r") as f:
+                    index = json.load(f)
+
+            # Named after the key, so that a response recorded again replaces its own file and no other
+            key = record_key(method, url, body)
+            filename = f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.json"
+            with open(os.path.join(self.record_folder, filename), "wb") as f:
+                f.write(response.content)
+            index[key] = {
+                "status": response.status_code,
+                "content_type": response.headers.get("Content-Type", "application/json"),
+                "file": filename,
+            }
+            with open(index_path, "w") as f:
+                json.dump(index, f, indent=2)
+
+
+def record_key(method: str, url: str, body=None) -> str:
+    """
+    Key of a recorded response, shared with `fake_site.py`.
+
+    :param method: HTTP method.
+    :param url: URL (only the path and query are kept).
+    :param body: Optional, body of the request.
+    :return: Key.
+    """
+    parsed = urlparse(url)
+    key = f"{method} {parsed.path}"
+    if parsed.query:
+        key += f"?{parsed.query}"
+    if body:
+        if isinstance(body, str):
+            body = body.encode()
+        key += f" {hashlib.sha1(body).hexdigest()[:12]}"
+    return key
+
+
+def _first_value(data: dict, key: str):
+    # Fields are either plain values, lists, or nested in a localized mapping
+    value = data.get(key)
+    if value is None:
+        value = data.get("metadataKeywordTextMap", {}).get(key)
+    if isinstance(value, dict):
+        value = next(iter(value.values()), None)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return value
@@ -0,0 +1,364 @@
+import argparse
+import glob
+import heapq
+import mmap
+import os
+import re
+import sys
+import time
+from array import array
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+from nltk import word_tokenize
+from tqdm import tqdm
+
+from pattern_matcher import PATTERNS_FILES, PatternMatcher
+
+INDEX_FOLDER = os.path.join("download", "index")
+TEXT_GLOB = os.path.join("download", "*", "txt", "*.txt")
+DOCUMENTS_FILE = "documents.txt"
+VOCABULARY_FILE = "vocabulary.txt"
+TERMS_FILE = "terms.bin"
+POSTINGS_FILE = "postings.bin"
+SEGMENT_POSITIONS = 20_000_000
+# Stands for `*` while a pattern is tokenized, letters only so that the tokenizer keeps it in its word
+WILDCARD = "qxwildcardqx"
+
+
+def tokenize(raw: str) -> list:
+    """
+    Splits a text in words, the same way as `pattern_counter.py`.
+
+    :param raw: Text.
+    :return: Words, lowercase, in the order of the text.
+    """
+    return [w.lower() for w in word_tokenize(raw)]
+
+
+def build_index(files, folder=INDEX_FOLDER, segment_positions=SEGMENT_POSITIONS):
+    """
+    Builds the positional index of texts, replacing the previous one.
+
+    The postings are gathered in memory until `segment_positions` positions, written as a sorted segment, and the
+    segments are merged term by term at the end, so that memory stays bounded whatever the size of the corpus.
+
+    :param files: Text files.
+    :param folder: Folder of the index, created if needed.
+    :param segment_positions: Number of positions kept in memory before writing a segment.
+    :return: Number of documents indexed.
+    """
+    Path(folder).mkdir(parents=True, exist_ok=True)
+    files = sorted(files)
+    ids = {}
+    segments = []
+    postings = defaultdict(lambda: array("I"))
+    positions = 0
+
+    for doc_id, file_path in enumerate(tqdm(files, desc="Index", ncols=80)):
+        with open(file_path, "r") as f:
+            words = tokenize(f.read())
+        by_term = defaultdict(list)
+        for position, word in enumerate(words):
+            term_id = ids.get(word)
+            if term_id is None:
+                term_id = ids[word] = len(ids)
+            by_term[term_id].append(position)
+        # One posting per term and document: document ID, number of positions, positions
+        for term_id, term_positions in by_term.items():
+            posting = postings[term_id]
+            posting.append(doc_id)
+            posting.append(len(term_positions))
+            posting.extend(term_positions)
+        positions += len(words)
+        if positions >= segment_positions:
+            segments.append(_write_segment(postings, folder, len(segments)))
+            postings.clear()
+            positions = 0
+    if postings or not segments:
+        segments.append(_write_segment(postings, folder, len(segments)))
+
+    # Merge the segments, the documents of a term stay sorted as segments are in the order of the documents
+    offsets = array("Q", [0] * (2 * len(ids)))
+    with open(os.path.join(folder, f"{POSTINGS_FILE}.part"), "wb") as f:
+        offset = 0
+        for term_id, _, data in heapq.merge(*(_read_segment(segment, n) for n, segment in enumerate(segments))):
+            if offsets[2 * term_id] == 0 and offsets[2 * term_id + 1] == 0:
+                offsets[2 * term_id] = offset
+            offsets[2 * term_id + 1] += len(data) // 4
+            f.write(data)
+            offset += len(data) // 4
+    for segment in segments:
+        os.remove(segment)
+
+    with open(os.path.join(folder, f"{TERMS_FILE}.part"), "wb") as f:
+        offsets.tofile(f)
+    with open(os.path.join(folder, f"{VOCABULARY_FILE}.part"), "w", encoding="utf-8") as f:
+        for term in ids:
+            f.write(term)
+            f.write("\n")
+    with open(os.path.join(folder, f"{DOCUMENTS_FILE}.part"), "w", encoding="utf-8") as f:
+        for file_path in files:
+            f.write(file_path)
+            f.write("\n")
+    for file in (POSTINGS_FILE, TERMS_FILE, VOCABULARY_FILE, DOCUMENTS_FILE):
+        os.replace(os.path.join(folder, f"{file}.part"), os.path.join(folder, file))
+
+    return len(files)
+
+
+def _write_segment(postings: dict, folder: str, n: int) -> str:
+    path = os.path.join(folder, f"segment-{n:05d}.bin")
+    with open(path, "wb") as f:
+        for term_id in sorted(postings):
+            posting = postings[term_id]
+            array("I", [term_id, len(posting)]).tofile(f)
+            posting.tofile(f)
+    return path
+
+
+def _read_segment(path: str, n: int):
+    # Yields (term ID, segment number, postings) in the order of the term IDs
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(8)
+            if not header:
+                break
+            term_id, length = array("I", header)
+            yield term_id, n, f.read(4 * length)
+
+
+class InvertedIndex:
+    """
+    Positional index of the texts, read from disk without loading the postings.
+
+    - `documents.txt`: path of each text, its ID is its line number.
+    - `vocabulary.txt`: each term, its ID is its line number.
+    - `terms.bin`: offset and length of the postings of each term, as unsigned long longs.
+    - `postings.bin`: for each term, for each document containing it: document ID, number of positions, positions.
+    """
+
+    def __init__(self, folder=INDEX_FOLDER):
+        """
+        :param folder: Folder of the index, built by `build_index`.
+        """
+        with open(os.path.join(folder, DOCUMENTS_FILE), "r", encoding="utf-8") as f:
+            self.documents = f.read().split("\n")[:-1]
+        with open(os.path.join(folder, VOCABULARY_FILE), "r", encoding="utf-8") as f:
+            self.vocabulary = f.read().split("\n")[:-1]
+        self.ids = {term: i for i, term in enumerate(self.vocabulary)}
+        self.offsets = array("Q")
+        with open(os.path.join(folder, TERMS_FILE), "rb") as f:
+            self.offsets.frombytes(f.read())
+
+        self._file = open(os.path.join(folder, POSTINGS_FILE), "rb")
+        self._postings = None
+        if os.path.getsize(self._file.name):
+            self._postings = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def postings(self, term_id: int) -> dict:
+        """
+        Returns the positions of a term in each document.
+
+        :param term_id: ID of the term.
+        :return: Positions, by document ID.
+        """
+        offset, length = self.offsets[2 * term_id], self.offsets[2 * term_id + 1]
+        data = array("I")
+        data.frombytes(self._postings[4 * offset:4 * (offset + length)])
+        res = {}
+        i = 0
+        while i < len(data):
+            doc_id, n = data[i], data[i + 1]
+            res[doc_id] = data[i + 2:i + 2 + n]
+            i += 2 + n
+        return res
+
+    def counts(self, term_id: int) -> dict:
+        """
+        Returns the number of occurrences of a term in each document.
+
+        :param term_id: ID of the term.
+        :return: Count, by document ID.
+        """
+        return {doc_id: len(positions) for doc_id, positions in self.postings(term_id).items()}
+
+    def resolve(self, tokens) -> dict:
+        """
+        Resolves the tokens of patterns against the vocabulary, in one pass over the vocabulary for all of them.
+
+        :param tokens: Tokens, with `*` wildcards.
+        :return: IDs of the matching terms, by token.
+        """
+        tokens = list(dict.fromkeys(tokens))
+        res = {token: [] for token in tokens}
+        wildcards = []
+        for token in tokens:
+            # Regex, as in `pattern_counter.gen_pattern_for_regex` (e.g., `.` stands for any character)
+            if "*" in token:
+                wildcards.append(token)
+            elif token in self.ids:
+                res[token].append(self.ids[token])
+        if wildcards:
+            matcher = PatternMatcher([re.compile(f"^{token.replace('*', '.*')}$") for token in wildcards])
+            for term_id, term in enumerate(self.vocabulary):
+                for i in matcher.match(term):
+                    res[wildcards[i]].append(term_id)
+        return res
+
+    def query(self, patterns) -> pd.DataFrame:
+        """
+        Counts the occurrences of patterns in each document, phrases being matched on consecutive positions.
+
+        :param patterns: Patterns, as in the `patterns/` files.
+        :return: DataFrame, one row per document containing at least one pattern, one column per pattern.
+        """
+        patterns = list(dict.fromkeys(patterns))
+        phrases = {pattern: parse_pattern(pattern) for pattern in patterns}
+        resolved = self.resolve(token for tokens in phrases.values() for token in tokens)
+
+        res = {}
+        for pattern, tokens in phrases.items():
+            if not tokens:
+                continue
+            if len(tokens) == 1:
+                counts = defaultdict(int)
+                for term_id in resolved[tokens[0]]:
+                    for doc_id, count in self.counts(term_id).items():
+                        counts[doc_id] += count
+            else:
+                counts = self._phrase_counts([resolved[token] for token in tokens])
+            if counts:
+                res[pattern] = counts
+
+        df = pd.DataFrame(res).reindex(columns=patterns, fill_value=0).fillna(0).astype(int).sort_index()
+        df.index = [self.documents[doc_id] for doc_id in df.index]
+        df["total"] = df.sum(axis=1)
+        return df
+
+    def _phrase_counts(self, alternatives) -> dict:
+        # Positions of each token by document, the union of the terms it matches
+        positions = []
+        for token in sorted(range(len(alternatives)), key=lambda i: len(alternatives[i])):
+            by_doc = defaultdict(set)
+            for term_id in alternatives[token]:
+                for doc_id, term_positions in self.postings(term_id).items():
+                    by_doc[doc_id].update(term_positions)
+            positions.append((token, by_doc))
+            if not by_doc:
+                return {}
+
+        # Only the documents containing every token, then the positions following each other
+        documents = set.intersection(*(set(by_doc) for _, by_doc in positions))
+        counts = {}
+        for doc_id in documents:
+            first = positions[0]
+            count = sum(
+                1 for start in first[1][doc_id]
+                if all(start - first[0] + i in by_doc[doc_id] for i, by_doc in positions[1:])
+            )
+            if count:
+                counts[doc_id] = count
+        return counts
+
+    def close(self):
+        if self._postings is not None:
+            self._postings.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def parse_pattern(pattern: str) -> list:
+    """
+    Splits a pattern in tokens, the whole phrase being tokenized at once like the texts, wildcards being kept in their
+    token.
+
+    :param pattern: Pattern, e.g., `"art. 3 abs*"` or `orient*ation`.
+    :return: Tokens, as `build_index` gets them from the same phrase in a text.
+    """
+    pattern = pattern.strip().lower()
+    if pattern.startswith("\"") and pattern.endswith("\"") and len(pattern) > 1:
+        pattern = pattern[1:-1]
+    return [token.replace(WILDCARD, "*") for token in tokenize(pattern.replace("*", WILDCARD))]
+
+
+def read_patterns(lang: str) -> list:
+    """
+    Reads the patterns of a lang, with the patterns common to all langs.
+
+    :param lang: `de`, `fr` or `it`.
+    :return: Patterns, without comments nor duplicates.
+    """
+    patterns = []
+    for file_path in (PATTERNS_FILES[lang], PATTERNS_FILES["*"]):
+        with open(file_path, "r") as f:
+            patterns.extend(line.strip() for line in f if "#" not in line and line.strip())
+    return list(dict.fromkeys(patterns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Inverted Index",
+        description=f"Index the texts of `download/*/txt` and count patterns in them, the index is kept in `{INDEX_FOLDER}`",
+    )
+    subparsers = parser.add_subparsers(help="`build` to index the texts, `query` to count patterns")
+
+    # Build subparser
+    parser_build = subparsers.add_parser("build",
+                                         help="Index the texts, replacing the previous index")
+    parser_build.add_argument("--texts",
+                              help=f"Glob of the texts to index (default `{TEXT_GLOB}`)",
+                              default=TEXT_GLOB)
+
+    # Query subparser
+    parser_query = subparsers.add_parser("query",
+                                         help="Count patterns in each document")
+    parser_query.add_argument("-l", "--lang",
+                              help="Count the patterns of `patterns/` for this lang",
+                              choices=["de", "fr", "it"])
+    parser_query.add_argument("-p", "--pattern",
+                              help="Pattern to count, e.g., `\"art. 3\"` or `homo*` (can be repeated)",
+                              action="append",
+                              default=[])
+    parser_query.add_argument("-o", "--output",
+                              help="Save the counts to a xlsx or csv file, instead of printing them")
+
+    args = parser.parse_args()
+
+    if "texts" in args:
+        start = time.perf_counter()
+        count = build_index(glob.glob(args.texts))
+        print(f"Indexed: {count} ({time.perf_counter() - start:.1f} s)")
+
+    elif "pattern" in args:
+        if not os.path.exists(os.path.join(INDEX_FOLDER, TERMS_FILE)):
+            sys.stderr.write(f"Incorrect index (`{INDEX_FOLDER}`) not found, run `build` first\n")
+            exit(-1)
+        patterns = (read_patterns(args.lang) if args.lang else []) + args.pattern
+        if not patterns:
+            sys.stderr.write("Incorrect query, no pattern given (`-l` or `-p`)\n")
+            exit(-1)
+
+        with InvertedIndex() as index:
+            start = time.perf_counter()
+            df = index.query(patterns)
+            elapsed = time.perf_counter() - start
+
+        if args.output:
+            if args.output.endswith(".csv"):
+                df.to_csv(args.output)
+            else:
+                df.to_excel(args.output)
+        else:
+            pd.set_option("display.max_rows", None)
+            print(df)
+        print(f"Found: {len(df)} ({elapsed * 1000:.0f} ms)")
+
+    else:
+        parser.print_help()
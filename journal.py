@@ -0,0 +1,438 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+JOURNAL_FILE = "journal.sqlite"
+NEGATIVE_CACHE_FILE = "missing.sqlite"
+SYNC_FILE = "sync.sqlite"
+
+# Formats of the dates of the side menu
+DATE_FORMATS = ["%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y"]
+
+# A missing title of a recent year may still be published, it is searched again after a while
+RECENT_YEARS = 2
+NEGATIVE_TTL = 7 * 24 * 3600
+
+# Target states, in order of progress
+STATE_ERROR = "error"
+# A search that showed neither results nor their absence in time, the title may exist and is searched again
+STATE_TIMEOUT = "timeout"
+STATE_NOT_FOUND = "not_found"
+STATE_FOUND = "found"
+STATE_SCRAPED = "scraped"
+STATE_DOWNLOADED = "downloaded"
+
+
+class Journal:
+    """
+    Persistent record of the state of each collected title, committed as soon as it is known, so that an interrupted
+    collection can be resumed.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: SQLite file, created if needed.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS targets ("
+            "title TEXT PRIMARY KEY, "
+            "state TEXT NOT NULL, "
+            "page TEXT, "
+            "result TEXT, "
+            "updated REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    @classmethod
+    def in_folder(cls, download_folder: str):
+        """
+        Opens the journal of a download folder.
+
+        :param download_folder: Download folder.
+        :return: Journal.
+        """
+        return cls(os.path.join(download_folder, JOURNAL_FILE))
+
+    def record(self, title: str, state: str, page=None, result=None):
+        """
+        Records the state of a title. The page and result already known are kept if not given, and a title already
+        downloaded is not set back to scraped (the PDF download may finish before the scraping is recorded).
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        :param state: One of the `STATE_*`.
+        :param page: Optional, link to the page.
+        :param result: Optional, page parameters.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO targets (title, state, page, result, updated) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(title) DO UPDATE SET "
+                "state = CASE WHEN targets.state = ? AND excluded.state = ? THEN targets.state ELSE excluded.state END, "
+                "page = COALESCE(excluded.page, targets.page), "
+                "result = COALESCE(excluded.result, targets.result), "
+                "updated = excluded.updated",
+                (title, state, page, json.dumps(result) if result is not None else None, time.time(),
+                 STATE_DOWNLOADED, STATE_SCRAPED),
+            )
+            self._connection.commit()
+
+    def get(self, title: str):
+        """
+        Returns the state, page and result of a title.
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        :return: (state, page, result), or None if the title was never recorded.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT state, page, result FROM targets WHERE title = ?", (title,)
+            ).fetchone()
+        if row is None:
+            return None
+        state, page, result = row
+        return state, page, json.loads(result) if result is not None else None
+
+    def settled(self, download=False) -> set:
+        """
+        Returns the titles that do not need to be collected again.
+
+        :param download: The PDF is wanted as well, a title is then settled only once downloaded.
+        :return: Titles.
+        """
+        states = [STATE_NOT_FOUND, STATE_DOWNLOADED]
+        if not download:
+            states.append(STATE_SCRAPED)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT title FROM targets WHERE state IN ({', '.join('?' * len(states))})", states
+            ).fetchall()
+        return {title for title, in rows}
+
+    def results(self, titles=None):
+        """
+        Yields the page parameters recorded so far.
+
+        :param titles: Optional, only yield the results of these titles.
+        :return: Page parameters.
+        """
+        last = ""
+        while True:
+            # Fetch in chunks, to keep the memory flat
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT title, result FROM targets WHERE result IS NOT NULL AND title > ? ORDER BY title LIMIT 1000",
+                    (last,),
+                ).fetchall()
+            if not rows:
+                return
+            for title, result in rows:
+                if titles is None or title in titles:
+                    yield json.loads(result)
+            last = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class NegativeCache:
+    """
+    Persistent record of the titles confirmed missing by a search, so that later collections do not search them again.
+
+    A missing title of one of the `recent_years` last years is searched again once its record is older than `ttl`, the
+    others are kept for good.
+    """
+
+    def __init__(self, path: str, ttl=NEGATIVE_TTL, recent_years=RECENT_YEARS, recheck=False):
+        """
+        :param path: SQLite file, created if needed.
+        :param ttl: Lifetime of the record of a missing title of a recent year, in seconds.
+        :param recent_years: Number of years, up to the current one, whose missing titles expire.
+        :param recheck: Consider every title as not known to be missing (the records are still updated).
+        """
+        self.path = path
+        self.ttl = ttl
+        self.recent_years = recent_years
+        self.recheck = recheck
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS missing ("
+            "title TEXT PRIMARY KEY, "
+            "year INTEGER NOT NULL, "
+            "checked REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    @classmethod
+    def in_folder(cls, download_folder: str, **kwargs):
+        """
+        Opens the negative cache of a download folder.
+
+        :param download_folder: Download folder.
+        :param kwargs: See `NegativeCache`.
+        :return: NegativeCache.
+        """
+        return cls(os.path.join(download_folder, NEGATIVE_CACHE_FILE), **kwargs)
+
+    def is_missing(self, title: str) -> bool:
+        """
+        Returns whether a title is known to be missing, and its record did not expire.
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        :return: Known to be missing.
+        """
+        if self.recheck:
+            return False
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT year, checked FROM missing WHERE title = ?", (title,)
+            ).fetchone()
+        if row is None:
+            return False
+        year, checked = row
+        if year > time.localtime().tm_year - self.recent_years:
+            return time.time() - checked < self.ttl
+        return True
+
+    def add(self, title: str):
+        """
+        Records a title confirmed missing.
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO missing (title, year, checked) VALUES (?, ?, ?)",
+                (title, int(title.rsplit("/", 1)[1]), time.time()),
+            )
+            self._connection.commit()
+
+    def remove(self, title: str):
+        """
+        Forgets a title, e.g., found since.
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM missing WHERE title = ?", (title,))
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SyncState:
+    """
+    Persistent record of the decisions known by `sync`, with their page, publication date and the dates shown by the
+    dashboard, and of the past syncs, so that a sync only lists the decisions published since the previous one.
+
+    A decision listed but not collected yet is pending, and is collected again by the next sync. Its page and dates
+    are kept until it is collected.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: SQLite file, created if needed.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            "title TEXT PRIMARY KEY, "
+            "id TEXT, "
+            "publication_date TEXT, "
+            "listed TEXT, "
+            "pending INTEGER NOT NULL DEFAULT 0, "
+            "updated REAL NOT NULL)"
+        )
+        # Written before `listed` and `pending`, when a pending decision had no page
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(decisions)")}
+        if "pending" not in columns:
+            self._connection.execute("ALTER TABLE decisions ADD COLUMN listed TEXT")
+            self._connection.execute("ALTER TABLE decisions ADD COLUMN pending INTEGER NOT NULL DEFAULT 0")
+            self._connection.execute("UPDATE decisions SET pending = 1 WHERE id IS NULL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS syncs ("
+            "started TEXT NOT NULL, "
+            "date_from TEXT, "
+            "found INTEGER NOT NULL)"
+        )
+        self._connection.commit()
+
+    @classmethod
+    def in_folder(cls, download_folder: str):
+        """
+        Opens the sync state of a download folder.
+
+        :param download_folder: Download folder.
+        :return: SyncState.
+        """
+        return cls(os.path.join(download_folder, SYNC_FILE))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    def get(self, title: str):
+        """
+        Returns the page ID, publication date and dates shown by the dashboard of a decision.
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        :return: (ID, publication date as `YYYY-MM-DD`, dates shown by the dashboard), or None if the decision is not
+        known.
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT id, publication_date, listed FROM decisions WHERE title = ?", (title,)
+            ).fetchone()
+
+    def update(self, title: str, cache_id: str, publication_date=None):
+        """
+        Records a collected decision.
+
+        :param title: Title of the BVGer.
+        :param cache_id: ID of its page.
+        :param publication_date: Optional, publication date, in any of the `DATE_FORMATS`.
+        """
+        self.update_many([(title, cache_id, publication_date)])
+
+    def update_many(self, decisions):
+        """
+        Records several collected decisions at once (e.g., from the merged dataset), which are not pending anymore.
+
+        :param decisions: (title, ID, publication date).
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO decisions (title, id, publication_date, pending, updated) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (title) DO UPDATE SET "
+                "id = excluded.id, publication_date = excluded.publication_date, pending = 0, updated = excluded.updated",
+                [(title, cache_id, iso_date(publication_date), now) for title, cache_id, publication_date in decisions],
+            )
+            self._connection.commit()
+
+    def mark_pending(self, titles):
+        """
+        Records decisions about to be collected, which stay pending unless `update` is called. What is known of them is
+        kept, so that a decision that could not be collected is not taken as new.
+
+        :param titles: Titles of the BVGer.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO decisions (title, pending, updated) VALUES (?, 1, ?) "
+                "ON CONFLICT (title) DO UPDATE SET pending = 1, updated = excluded.updated",
+                [(title, now) for title in titles],
+            )
+            self._connection.commit()
+
+    def update_listed(self, listed: dict):
+        """
+        Records the dates shown by the dashboard for known decisions, compared by the next sync.
+
+        :param listed: Dates (as returned by `bvger_auto.extract_scroller_dates`), by title.
+        """
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE decisions SET listed = ? WHERE title = ?", [(dates, title) for title, dates in listed.items()]
+            )
+            self._connection.commit()
+
+    def remove(self, titles):
+        """
+        Forgets decisions, e.g., pending ones that are not found anymore.
+
+        :param titles: Titles of the BVGer.
+        """
+        with self._lock:
+            self._connection.executemany("DELETE FROM decisions WHERE title = ?", [(title,) for title in titles])
+            self._connection.commit()
+
+    def pending(self) -> list:
+        """
+        Returns the decisions listed by a previous sync but not collected.
+
+        :return: Titles.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT title FROM decisions WHERE pending = 1").fetchall()
+        return [title for title, in rows]
+
+    def last_sync(self) -> Optional[str]:
+        """
+        Returns the day the last finished sync started.
+
+        :return: Date as `YYYY-MM-DD`, or None if there was no sync.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT MAX(started) FROM syncs").fetchone()[0]
+
+    def record_sync(self, started: str, date_from=None, found=0):
+        """
+        Records a finished sync.
+
+        :param started: Day the sync started, as `YYYY-MM-DD`.
+        :param date_from: Optional, first publication date listed.
+        :param found: Number of decisions collected.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO syncs (started, date_from, found) VALUES (?, ?, ?)", (started, date_from, found)
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def iso_date(value) -> Optional[str]:
+    """
+    Returns a date of the side menu as `YYYY-MM-DD`, so that dates can be compared as text.
+
+    :param value: Date, in any of the `DATE_FORMATS` (the first one if several are given, separated by `;`).
+    :return: Date, or None if missing or not understood.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.split(";", 1)[0].strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
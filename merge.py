@@ -1,59 +1,195 @@
+import argparse
+import hashlib
+import json
 import os
+import sys
+
 import pandas as pd
 
+from fields import EXTRA_COLUMN, canonical_columns, extra_columns, field_label, ordered_columns, to_extra
+from output import read_results
+
 path = os.path.join("download", "all")
 
-all_excel_files = [os.path.join(path, file) for file in os.listdir(path) if file[-4:] == "xlsx"]
-
-# Concat
-df = pd.concat([pd.read_excel(excel_file) for excel_file in all_excel_files], ignore_index=True)
-
-# Drop Unnamed
-df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-
-# Create sorting column
-df[["court", "number_year"]] = df["title"].str.split("-", n=1, expand=True)
-df[["number", "year"]] = df["number_year"].str.split("/", n=1, expand=True)
-del df["number_year"]
-
-# Set index
-df.set_index("id")
-
-# Reorder columns
-df = df[[
-    "id",
-    "link_page",
-    "query_lang",
-    "court",
-    "number",
-    "year",
-    "title",
-    "full_text",
-    "file_text",
-    "link_pdf",
-    "file_pdf",
-    "COUR",
-    "DATE DE LA DÉCISION",
-    "LANGUE",
-    "ATAF / AUTRES ARRÊTS",
-    "ATAF CITÉS",
-    "AUTRES ARRÊTS DU TAF CITÉS",
-    "MOTS-CLÉS RECONNUS",
-    "ANNÉE DE RÉCEPTION",
-    "DATE DE LA PUBLICATION",
-    "LÉGISLATION FÉDERALE",
-    "RECUEIL SYSTÉMATIQUE",
-    "RECUEIL OFFICIEL DU DROIT FÉDÉRAL",
-    "ATF CITÉS",
-    "AUTRES ARRÊTS DU TF CITÉS",
-    "FEUILLE FÉDÉRALE",
-    "AUTRES ARRÊTS DU TPF CITÉS",
-    "DÉCISION ATAF LIÉE",
-    "BULLETIN OFFICIEL",
-    "ARRÊTS DU RECUEIL OFFICIEL TPF CITÉS",
-]]
-
-# Save
-df.to_excel(os.path.join(path, "..", "all.xlsx"))
-
-print(df.head())
+MANIFEST_NAME = ".manifest.json"
+MERGED_NAME = "all.parquet"
+MANIFEST_FILE = os.path.join(path, MANIFEST_NAME)
+MERGED_FILE = os.path.join(path, "..", MERGED_NAME)
+EXPORT_FILE = os.path.join(path, "..", "all.xlsx")
+EXPORT_LANG = "fr"
+EXTENSIONS = (".xlsx", ".jsonl", ".parquet")
+
+
+def file_signature(file_path: str):
+    """
+    Returns the modification time and size of a results file, or of all the parts of a parquet folder.
+
+    :param file_path: File or folder.
+    :return: (mtime, size).
+    """
+    if not os.path.isdir(file_path):
+        stat = os.stat(file_path)
+        return stat.st_mtime, stat.st_size
+    stats = [os.stat(os.path.join(root, file)) for root, _, files in os.walk(file_path) for file in files]
+    return max((stat.st_mtime for stat in stats), default=0), sum(stat.st_size for stat in stats)
+
+
+def file_hash(file_path: str) -> str:
+    """
+    Returns the hash of the content of a results file, or of all the parts of a parquet folder.
+
+    :param file_path: File or folder.
+    :return: SHA-256.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(file_path):
+        files = sorted(os.path.join(root, file) for root, _, files in os.walk(file_path) for file in files)
+    else:
+        files = [file_path]
+    for file in files:
+        digest.update(os.path.relpath(file, file_path).encode())
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_any(file_path: str) -> pd.DataFrame:
+    """
+    Reads a results file, whatever its format, with stable column keys.
+
+    :param file_path: xlsx, jsonl or parquet file, or parquet folder written by `collect`.
+    :return: DataFrame.
+    """
+    if file_path.endswith(".xlsx"):
+        df = pd.read_excel(file_path, dtype=str)
+    elif file_path.endswith(".parquet") and not os.path.isdir(file_path):
+        df = pd.read_parquet(file_path)
+    else:
+        df = read_results(file_path)
+
+    # Drop Unnamed
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+
+    # Map the headers of every lang to the same keys
+    df.columns = canonical_columns(df.columns)
+
+    # Headers that are not known, e.g., in files written before `extra`, go under it instead of their own columns
+    extra = extra_columns(df.columns)
+    if extra:
+        df[EXTRA_COLUMN] = [
+            to_extra({column: value for column, value in row.items() if pd.notna(value)})
+            for row in df[extra].to_dict("records")
+        ]
+        df = df.drop(columns=extra)
+    return df
+
+
+def merge(full=False, verbose=True, folder=path) -> pd.DataFrame:
+    """
+    Merges the new or modified results files of a folder into the merged dataset, `all.parquet` next to the folder.
+
+    :param full: Ignore the manifest and read all the files again.
+    :param verbose: Print the files read.
+    :param folder: Folder of the results files (default `download/all`).
+    :return: Merged dataset.
+    """
+    manifest_file = os.path.join(folder, MANIFEST_NAME)
+    merged_file = os.path.join(folder, "..", MERGED_NAME)
+    manifest = {}
+    if os.path.exists(manifest_file) and os.path.exists(merged_file) and not full:
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+
+    # Only read the files that are new or were modified since the last merge
+    new_files = []
+    for file in sorted(os.listdir(folder)):
+        file_path = os.path.join(folder, file)
+        if file.startswith(".") or not (file.endswith(EXTENSIONS) or os.path.isdir(file_path)):
+            continue
+        mtime, size = file_signature(file_path)
+        if not size:
+            # Nothing was found by that run
+            continue
+        known = manifest.get(file)
+        if known and known["mtime"] == mtime and known["size"] == size:
+            continue
+        digest = file_hash(file_path)
+        if known and known["hash"] == digest:
+            known["mtime"] = mtime
+            continue
+        manifest[file] = {"mtime": mtime, "size": size, "hash": digest}
+        new_files.append(file_path)
+    new_files.sort(key=lambda file_path: manifest[os.path.basename(file_path)]["mtime"])
+
+    merged = pd.read_parquet(merged_file) if manifest and os.path.exists(merged_file) and not full else None
+    if new_files:
+        if verbose:
+            for file_path in new_files:
+                print(f"> Reading {file_path}")
+
+        # Concat
+        df = pd.concat([read_any(file_path) for file_path in new_files], ignore_index=True)
+
+        # Create sorting column
+        df[["court", "number_year"]] = df["title"].str.split("-", n=1, expand=True)
+        df[["number", "year"]] = df["number_year"].str.split("/", n=1, expand=True)
+        del df["number_year"]
+
+        # Deduplicate on ID, the most recently modified file wins
+        if merged is not None:
+            df = pd.concat([merged, df], ignore_index=True)
+        df = df.drop_duplicates(subset="id", keep="last").reset_index(drop=True)
+
+        # Reorder columns
+        df = df[ordered_columns(list(df.columns))].astype("string")
+
+        # Save
+        temp_file = f"{merged_file}.part"
+        df.to_parquet(temp_file, index=False)
+        os.replace(temp_file, merged_file)
+        merged = df
+
+    with open(manifest_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return merged if merged is not None else pd.DataFrame()
+
+
+def export(df: pd.DataFrame, export_file=EXPORT_FILE, lang=EXPORT_LANG):
+    """
+    Exports the merged dataset to xlsx, with the headers of a lang.
+
+    :param df: Merged dataset.
+    :param export_file: xlsx file.
+    :param lang: Lang of the headers.
+    """
+    df.rename(columns={column: field_label(column, lang) for column in df.columns}).to_excel(export_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Merge",
+        description="Merge the results in `download/all` into `download/all.parquet` and `download/all.xlsx`",
+    )
+    parser.add_argument("-l", "--lang",
+                        help=f"Lang of the headers of the xlsx export (default `{EXPORT_LANG}`)",
+                        choices=["de", "fr", "it"],
+                        default=EXPORT_LANG)
+    parser.add_argument("--full",
+                        help="Read all the files again, instead of only the new or modified ones",
+                        action="store_true")
+    parser.add_argument("--no-export",
+                        help="Only update `all.parquet`, without the xlsx export",
+                        action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.isdir(path):
+        sys.stderr.write(f"Incorrect folder (`{path}`) not found\n")
+        exit(-1)
+
+    df = merge(full=args.full)
+    if not args.no_export:
+        export(df, lang=args.lang)
+
+    print(df.head())
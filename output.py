@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from fields import field_label
+
+FORMATS = {"jsonl", "parquet", "xlsx"}
+FORMAT = "jsonl"
+BATCH_SIZE = 500
+
+
+class ResultWriter:
+    """
+    Appends the page parameters in batches as they are scraped, so that memory stays flat whatever the size of the run.
+
+    - `jsonl`: one JSON object per line, in `<name>.jsonl`.
+    - `parquet`: one file per batch, partitioned by court and year, in `<name>/court=E/year=2025/part-00000.parquet`.
+    - `xlsx`: written as `jsonl`, then exported to `<name>.xlsx` when closed. The export reads all the results in memory
+      (see `export_xlsx`), so it is only asked explicitly, the default is `jsonl`.
+
+    The side menu fields are written by stable key (see `fields.py`), only the xlsx export has the headers of a lang.
+    """
+
+    def __init__(self, folder: str, name: str, fmt=FORMAT, batch_size=BATCH_SIZE, export_lang=None, on_flush=None):
+        """
+        :param folder: Folder where the results are saved.
+        :param name: Name of the results, without extension.
+        :param fmt: One of `FORMATS`.
+        :param batch_size: Number of results kept in memory before being written.
+        :param export_lang: Optional, lang of the headers of the xlsx export (default stable keys).
+        :param on_flush: Optional, called with each batch of results once it is written to disk.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Incorrect format (`{fmt}`) not in `{', '.join(sorted(FORMATS))}`")
+        self.folder = folder
+        self.name = name
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.export_lang = export_lang
+        self.on_flush = on_flush
+        self.count = 0
+        self._batch = []
+        self._parts = 0
+        self._lock = threading.Lock()
+
+        if fmt == "parquet":
+            self.path = os.path.join(folder, name)
+        else:
+            self.path = os.path.join(folder, f"{name}.jsonl")
+
+    def write(self, result: dict):
+        """
+        Adds a result, written to disk once the batch is full.
+
+        :param result: Page parameters.
+        """
+        with self._lock:
+            self._batch.append(result)
+            self.count += 1
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """
+        Writes the last batch, and exports to xlsx if asked.
+
+        :return: Path of the results.
+        """
+        self.flush()
+        if self.fmt == "xlsx":
+            xlsx_path = os.path.join(self.folder, f"{self.name}.xlsx")
+            export_xlsx(self.path, xlsx_path, lang=self.export_lang)
+            return xlsx_path
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _flush(self):
+        if not self._batch:
+            if self.fmt != "parquet" and not os.path.exists(self.path):
+                Path(self.path).touch()
+            return
+
+        if self.fmt == "parquet":
+            df = pd.DataFrame(self._batch)
+            df["court"], df["year"] = zip(*(split_title(title) for title in df["title"]))
+            for (court, year), partition in df.groupby(["court", "year"]):
+                folder = os.path.join(self.path, f"court={court}", f"year={year}")
+                Path(folder).mkdir(parents=True, exist_ok=True)
+                partition.drop(columns=["court", "year"]).astype("string").to_parquet(
+                    os.path.join(folder, f"part-{self._parts:05d}.parquet"), index=False
+                )
+            self._parts += 1
+        else:
+            with open(self.path, "a") as f:
+                for result in self._batch:
+                    f.write(json.dumps(result, ensure_ascii=False))
+                    f.write("\n")
+        if self.on_flush:
+            self.on_flush(self._batch)
+        self._batch = []
+
+
+def split_title(title: str):
+    """
+    Splits a title in court and year.
+
+    :param title: Title of the BVGer, e.g., `A-1337/2002`.
+    :return: (court, year), e.g., `("A", "2002")`.
+    """
+    court, number_year = title.split("-", 1)
+    return court, number_year.split("/", 1)[1]
+
+
+def iter_results(path: str):
+    """
+    Yields the results written by a `ResultWriter`, one batch at a time.
+
+    :param path: `.jsonl` file or parquet folder.
+    :return: DataFrames.
+    """
+    if os.path.isdir(path):
+        for part in sorted(Path(path).rglob("*.parquet")):
+            yield pd.read_parquet(part)
+    else:
+        for chunk in pd.read_json(path, lines=True, chunksize=BATCH_SIZE, dtype=False):
+            yield chunk
+
+
+def read_results(path: str) -> pd.DataFrame:
+    """
+    Reads all the results written by a `ResultWriter`.
+
+    :param path: `.jsonl` file or parquet folder.
+    :return: DataFrame, one row per result.
+    """
+    chunks = list(iter_results(path))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def export_xlsx(path: str, xlsx_path: str, lang=None):
+    """
+    Exports results to xlsx, in the same layout as before (one row per result, indexed by ID).
+
+    The whole results are read into a single DataFrame, so the memory grows with the size of the run: this is a separate
+    export step, the collection itself writes `jsonl` or `parquet`.
+
+    :param path: `.jsonl` file or parquet folder.
+    :param xlsx_path: xlsx file.
+    :param lang: Optional, lang of the headers of the side menu fields (default stable keys).
+    """
+    df = read_results(path)
+    if lang:
+        df = df.rename(columns={column: field_label(column, lang) for column in df.columns})
+    if "id" in df.columns:
+        df.index = df["id"].values
+    df.to_excel(xlsx_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Output",
+        description="Export the results of a collection to xlsx (the results are read in memory)",
+    )
+    parser.add_argument("input",
+                        help="Results of a collection, `.jsonl` file or parquet folder")
+    parser.add_argument("output",
+                        help="xlsx file")
+    parser.add_argument("-l", "--lang",
+                        help="Lang of the headers of the side menu fields (default stable keys)",
+                        choices=["de", "fr", "it"],
+                        default=None)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        sys.stderr.write(f"Incorrect input (`{args.input}`) not found\n")
+        exit(-1)
+
+    export_xlsx(args.input, args.output, lang=args.lang)
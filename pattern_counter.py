@@ -1,22 +1,31 @@
 from tqdm import tqdm
+import argparse
+import hashlib
 import json
 from pprint import pprint
 import os.path
 from collections import Counter, defaultdict
 import re
+import sqlite3
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import pandas as pd
 from nltk import word_tokenize
 
+from corpus import Corpus, CORPUS_FOLDER
+from fields import canonical_columns
+from pattern_matcher import PATTERNS_FILES, PatternMatcher
+from term_store import TermStore, STORE_FOLDER
+
 TEST_FILE_2 = os.path.join("download", "2019", "txt", "E-4930-2019.txt")  # LGBT etc.
 TEST_LANG = "fr"
-PATTERNS_FILES = {
-    "de": os.path.join("patterns", "patterns_de"),
-    "fr": os.path.join("patterns", "patterns_fr"),
-    "it": os.path.join("patterns", "patterns_it"),
-    "*": os.path.join("patterns", "patterns_more"),
-}
 PATTERNS = {}
+CORPORA = {}
+CACHE_FILE = os.path.join("download", "pattern_cache.sqlite")
+CHUNKSIZE = 64
+STORE_SAVE_EVERY = 1000
 
 def gen_pattern_for_regex(lang):
     patterns = set()
@@ -33,38 +42,78 @@ def gen_pattern_for_regex(lang):
 
     return patterns
 
+LANG_NAMES = {
+    "de": "de", "deutsch": "de", "allemand": "de", "tedesco": "de",
+    "fr": "fr", "francais": "fr", "franzosisch": "fr", "francese": "fr",
+    "it": "it", "italiano": "it", "italien": "it", "italienisch": "it",
+}
+
+
+def lang_of(value, default="fr") -> str:
+    """
+    Returns the lang of a decision, from its `language` value.
+
+    :param value: Lang of the decision, e.g., `FR` or `Français`.
+    :param default: Lang used if unknown.
+    :return: `de`, `fr` or `it`.
+    """
+    if not isinstance(value, str):
+        return default
+    value = unicodedata.normalize("NFKD", value.strip().lower())
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return LANG_NAMES.get(value, default)
+
+
 for lang in PATTERNS_FILES:
     PATTERNS[lang] = gen_pattern_for_regex(lang)
+MATCHERS = {lang: PatternMatcher(patterns) for lang, patterns in PATTERNS.items()}
 
-def extract_patterns_and_words(file_path):
-    with open(file_path, "r") as f:
-        raw = f.read()
-
+def count_words(raw):
     tokens = word_tokenize(raw)
     words = [w.lower() for w in tokens]
-    count = Counter(words)
+    return Counter(words)
 
+def match_counts(count, lang="fr", matches=None):
     res_pattern_words = defaultdict(lambda: {"words": dict(), "total": 0})
     res_word_patterns = defaultdict(lambda: {"patterns": list(), "total": 0})
 
-    for regex_pattern in PATTERNS["fr"]:
-        for word in count.keys():
-            if re.search(regex_pattern, word):
-                res_pattern = regex_pattern.pattern
-                res_word = word
-                res_count = count.get(word)
+    matcher = MATCHERS[lang]
+    if matches is None:
+        matches = matcher.classify(count.keys())
+    for i, regex_pattern in enumerate(matcher.patterns):
+        for word in matches.get(i, ()):
+            res_pattern = regex_pattern.pattern
+            res_word = word
+            res_count = count.get(word)
 
-                res_pattern_words[res_pattern]["words"].update({res_word: count.get(res_word)})
-                res_pattern_words[res_pattern]["total"] += count.get(res_word)
+            res_pattern_words[res_pattern]["words"].update({res_word: count.get(res_word)})
+            res_pattern_words[res_pattern]["total"] += count.get(res_word)
 
-                res_word_patterns[res_word]["patterns"].append(res_pattern)
-                res_word_patterns[res_word]["total"] += 1
+            res_word_patterns[res_word]["patterns"].append(res_pattern)
+            res_word_patterns[res_word]["total"] += 1
 
     return {"patterns": res_pattern_words, "words": res_word_patterns}
 
-def format_for_df(file):
-    res = extract_patterns_and_words(file)
+def read_text(source):
+    # A text file, or a (corpus folder, title) pair
+    if isinstance(source, tuple):
+        folder, title = source
+        return open_corpus(folder).read(title)
+    with open(source, "r") as f:
+        return f.read()
 
+def open_corpus(folder):
+    # One `Corpus` per folder and process
+    if folder not in CORPORA:
+        CORPORA[folder] = Corpus(folder)
+    return CORPORA[folder]
+
+def extract_patterns_and_words(file_path, lang="fr"):
+    raw = read_text(file_path)
+
+    return match_counts(count_words(raw), lang=lang)
+
+def format_result(res):
     patterns = ", ".join([f"{key}: {value['total']}" for key, value in res["patterns"].items()])
     patterns_total = sum(value["total"] for value in res["patterns"].values())
 
@@ -73,18 +122,205 @@ def format_for_df(file):
 
     return patterns, len(res["patterns"]), patterns_total, words, len(res["words"]), words_total
 
+def format_for_df(file, lang="fr"):
+    return format_result(extract_patterns_and_words(file, lang=lang))
+
+def file_hash(file_path):
+    if isinstance(file_path, tuple):
+        folder, title = file_path
+        return open_corpus(folder).text_hash(title)
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def patterns_hash(lang):
+    return hashlib.sha256("\n".join(sorted(p.pattern for p in PATTERNS[lang])).encode()).hexdigest()
+
+
+class PatternCache:
+    """
+    On-disk cache of the results of each text, by text hash and pattern set hash, so that a rerun skips the untouched
+    documents.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "text_hash TEXT, patterns_hash TEXT, result TEXT, PRIMARY KEY (text_hash, patterns_hash))"
+        )
+        self.connection.commit()
+
+    def get_result(self, text_hash, pattern_hash):
+        row = self.connection.execute(
+            "SELECT result FROM results WHERE text_hash = ? AND patterns_hash = ?", (text_hash, pattern_hash)
+        ).fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def put(self, text_hash, pattern_hash, result):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (text_hash, pattern_hash, json.dumps(result))
+        )
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+def classify_vocabulary(store, lang):
+    # Patterns matching each term of the store, computed once for the whole corpus
+    matcher = MATCHERS[lang]
+    word_patterns = {}
+    for term_id, term in enumerate(store.vocabulary):
+        matches = matcher.match(term)
+        if matches:
+            word_patterns[term_id] = matches
+    return word_patterns
+
+def match_stored(store, text_hash, lang, word_patterns):
+    # Same as `match_counts`, from the stored counts of a text
+    ids, values = store.get_arrays(text_hash)
+    count = {}
+    matches = defaultdict(list)
+    for term_id, value in zip(ids, values):
+        pattern_ids = word_patterns.get(term_id)
+        if pattern_ids:
+            word = store.vocabulary[term_id]
+            count[word] = value
+            for i in pattern_ids:
+                matches[i].append(word)
+    return match_counts(count, lang=lang, matches=matches)
+
+def tokenize_document(file_path):
+    # Run in the worker processes
+    return dict(count_words(read_text(file_path)))
+
+def process_document(item):
+    # Run in the worker processes, without store
+    file_path, lang = item
+    return format_for_df(file_path, lang=lang)
+
+def process_documents(documents, jobs=1, cache=None, store=None, chunksize=CHUNKSIZE):
+    """
+    Counts the patterns of several documents, in parallel and with a cache.
+
+    With a store, each text is tokenized once, and the patterns are then counted from the stored counts only.
+
+    :param documents: List of (text file or (corpus folder, title), lang).
+    :param jobs: Number of worker processes.
+    :param cache: Optional, `PatternCache`.
+    :param store: Optional, `TermStore`.
+    :param chunksize: Number of documents sent at once to a worker process.
+    :return: Results of `format_result`, in the same order as the documents.
+    """
+    results = [None] * len(documents)
+    todo = list(range(len(documents)))
+    pattern_hashes = {lang: patterns_hash(lang) for lang in MATCHERS}
+    hashes = None
+    if cache or store:
+        hashes = [file_hash(file_path) for file_path, _ in tqdm(documents, desc="Hash", ncols=80)]
+    if cache:
+        todo = []
+        for i, (_, lang) in enumerate(documents):
+            cached = cache.get_result(hashes[i], pattern_hashes[lang])
+            if cached is not None:
+                results[i] = cached
+            else:
+                todo.append(i)
+
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    mapper = partial(executor.map, chunksize=chunksize) if executor else map
+    try:
+        if store is None:
+            outputs = mapper(process_document, [documents[i] for i in todo])
+            for i, result in zip(todo, tqdm(outputs, total=len(todo), desc="Documents", ncols=80)):
+                results[i] = result
+        else:
+            # Tokenize the texts that are not stored yet
+            new_texts = {}
+            for i in todo:
+                if hashes[i] not in store:
+                    new_texts.setdefault(hashes[i], documents[i][0])
+            outputs = mapper(tokenize_document, list(new_texts.values()))
+            for n, (text_hash, counts) in enumerate(zip(new_texts, tqdm(outputs, total=len(new_texts), desc="Tokenize", ncols=80))):
+                store.add(text_hash, counts)
+                if n % STORE_SAVE_EVERY == STORE_SAVE_EVERY - 1:
+                    store.save()
+            store.save()
+
+            # Count the patterns from the stored counts only
+            word_patterns = {}
+            for i in tqdm(todo, desc="Documents", ncols=80):
+                lang = documents[i][1]
+                if lang not in word_patterns:
+                    word_patterns[lang] = classify_vocabulary(store, lang)
+                results[i] = format_result(match_stored(store, hashes[i], lang, word_patterns[lang]))
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if cache:
+        for i in todo:
+            cache.put(hashes[i], pattern_hashes[documents[i][1]], results[i])
+        cache.commit()
+
+    return results
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Pattern Counter",
+        description="Count the patterns of `patterns/` in the texts of `download/all.xlsx`",
+    )
+    parser.add_argument("-j", "--jobs",
+                        help="Number of worker processes (default 1)",
+                        type=int,
+                        default=1)
+    parser.add_argument("--chunksize",
+                        help=f"Number of documents sent at once to a worker process (default {CHUNKSIZE})",
+                        type=int,
+                        default=CHUNKSIZE)
+    parser.add_argument("--corpus",
+                        help=f"Read the texts from the packed corpus of each year (`download/<year>/{CORPUS_FOLDER}`) instead of the text files",
+                        action="store_true")
+    parser.add_argument("--no-cache",
+                        help=f"Do not use nor update the cache (`{CACHE_FILE}`) and the word counts (`{STORE_FOLDER}`)",
+                        action="store_true")
+    args = parser.parse_args()
+
     print("start main")
-    tqdm.pandas()
 
     print("reading file")
     df = pd.read_excel(os.path.join("download", "all.xlsx"))
+    # Lang of each decision, whatever the lang of the headers (see `merge.py --lang`)
+    language = dict(zip(canonical_columns(df.columns), df.columns)).get("language")
 
     print("applying")
-    df[["patterns", "num_patterns", "patterns_total", "words", "num_words", "words_total"]] = df.progress_apply(
-        lambda row: format_for_df(os.path.join("download", str(row["year"]), "txt", row["file_text"])),
-        axis=1,
-        result_type='expand',
+    if args.corpus:
+        documents = [
+            ((os.path.join("download", str(row["year"]), CORPUS_FOLDER), row["title"]), lang_of(row.get(language)))
+            for _, row in df.iterrows()
+        ]
+    else:
+        documents = [
+            (os.path.join("download", str(row["year"]), "txt", row["file_text"]), lang_of(row.get(language)))
+            for _, row in df.iterrows()
+        ]
+    cache = None if args.no_cache else PatternCache()
+    store = None if args.no_cache else TermStore()
+    try:
+        results = process_documents(documents, jobs=args.jobs, cache=cache, store=store, chunksize=args.chunksize)
+    finally:
+        if cache:
+            cache.close()
+        if store:
+            store.close()
+    df[["patterns", "num_patterns", "patterns_total", "words", "num_words", "words_total"]] = pd.DataFrame(
+        results, index=df.index
     )
 
     print("saving")
@@ -0,0 +1,96 @@
+import os
+import re
+from collections import defaultdict
+
+# Patterns of each lang, `*` for the patterns common to all langs
+PATTERNS_FILES = {
+    "de": os.path.join("patterns", "patterns_de"),
+    "fr": os.path.join("patterns", "patterns_fr"),
+    "it": os.path.join("patterns", "patterns_it"),
+    "*": os.path.join("patterns", "patterns_more"),
+}
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+class PatternMatcher:
+    """
+    Classifies words against all the patterns of a lang at once.
+
+    Patterns made of plain text and `*` wildcards are not run as regex: exact words are looked up in a dict, prefixes
+    (`word*`) in a dict by prefix length, and the other wildcards are matched piece by piece. Only the patterns using
+    other regex syntax are run as regex, behind a single combined alternation to discard most words in one pass.
+    """
+
+    def __init__(self, patterns):
+        """
+        :param patterns: Compiled patterns, as returned by `pattern_counter.gen_pattern_for_regex`.
+        """
+        self.patterns = list(patterns)
+        self.exact = defaultdict(list)
+        self.prefixes = defaultdict(list)
+        self.globs = []
+        self.regexes = []
+
+        for i, regex_pattern in enumerate(self.patterns):
+            body = regex_pattern.pattern[1:-1]
+            pieces = body.split(".*")
+            if any(c in REGEX_SPECIAL for piece in pieces for c in piece):
+                self.regexes.append(i)
+            elif len(pieces) == 1:
+                self.exact[body].append(i)
+            elif len(pieces) == 2 and pieces[1] == "":
+                self.prefixes[pieces[0]].append(i)
+            else:
+                self.globs.append((i, pieces))
+
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefixes})
+        self.combined = None
+        if self.regexes:
+            self.combined = re.compile("|".join(f"(?:{self.patterns[i].pattern})" for i in self.regexes))
+
+    def match(self, word: str) -> list:
+        """
+        Returns the patterns matching a word.
+
+        :param word: Word, lowercase.
+        :return: Indices of the patterns in `self.patterns`.
+        """
+        matches = list(self.exact.get(word, ()))
+        for length in self.prefix_lengths:
+            if length > len(word):
+                break
+            matches.extend(self.prefixes.get(word[:length], ()))
+        for i, pieces in self.globs:
+            if _glob_match(word, pieces):
+                matches.append(i)
+        if self.combined is not None and self.combined.search(word):
+            matches.extend(i for i in self.regexes if self.patterns[i].search(word))
+        return matches
+
+    def classify(self, words) -> dict:
+        """
+        Classifies words against all the patterns, in one pass over the words.
+
+        :param words: Words, lowercase.
+        :return: Matching words (in the given order), by index of pattern.
+        """
+        res = defaultdict(list)
+        for word in words:
+            for i in self.match(word):
+                res[i].append(word)
+        return res
+
+
+def _glob_match(word: str, pieces: list) -> bool:
+    # Same as `^piece0.*piece1.*...pieceN$`
+    first, last = pieces[0], pieces[-1]
+    if len(word) < len(first) + len(last) or not word.startswith(first) or not word.endswith(last):
+        return False
+    position = len(first)
+    end = len(word) - len(last)
+    for piece in pieces[1:-1]:
+        position = word.find(piece, position, end)
+        if position < 0:
+            return False
+        position += len(piece)
+    return True
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tracing import Tracer, OUTCOME_ERROR
+
+PDF_WORKERS = 4
+PDF_RETRIES = 3
+PDF_BACKOFF = 2
+PDF_TIMEOUT = 30
+CHUNK_SIZE = 64 * 1024
+
+MANIFEST_FILE = ".manifest.json"
+# The manifest is saved at most every few seconds while downloading, so that a crash only loses the last entries
+MANIFEST_SAVE_INTERVAL = 10
+
+DOWNLOADED = "downloaded"
+SKIPPED = "skipped"
+
+
+class PdfDownloader:
+    """
+    Background queue of PDF downloads, so that scraping never waits on them.
+
+    Files are streamed to a temporary file and atomically renamed. Files already present are skipped if their ETag or
+    size did not change, and failed downloads are retried with an exponential backoff.
+    """
+
+    def __init__(self, folder: str, workers=PDF_WORKERS, retries=PDF_RETRIES, backoff=PDF_BACKOFF, session=None,
+                 on_done=None, tracer=None, verbose=False):
+        """
+        :param folder: Folder where the PDF are saved.
+        :param workers: Number of parallel downloads.
+        :param retries: Number of retries of a failed download.
+        :param backoff: Wait before the first retry, in seconds, doubled at each retry.
+        :param session: Optional, `requests.Session` to download with.
+        :param on_done: Optional, called with `(tag, filename, error)` once a download is finished (error is None on success).
+        :param tracer: Optional, `Tracer` where each download is recorded, as the `pdf_download` stage of its tag.
+        :param verbose: Debug.
+        """
+        self.folder = folder
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or requests.Session()
+        self.on_done = on_done
+        self.tracer = tracer or Tracer()
+        self.verbose = verbose
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf")
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._manifest_path = os.path.join(folder, MANIFEST_FILE)
+        self._manifest = {}
+        self._manifest_saved = time.monotonic()
+        self._manifest_dirty = False
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, "r") as f:
+                self._manifest = json.load(f)
+
+    def submit(self, url: str, filename: str, tag=None):
+        """
+        Queues a download, a file already queued is not downloaded twice.
+
+        :param url: Link to the PDF.
+        :param filename: Name of the file in the folder.
+        :param tag: Optional, given back to `on_done` (e.g., the title).
+        :return: Future, resolving to `DOWNLOADED` or `SKIPPED`.
+        """
+        with self._lock:
+            future = self._pending.get(filename)
+            if future is None:
+                future = self._executor.submit(self._download, url, filename, tag)
+                self._pending[filename] = future
+        return future
+
+    def close(self):
+        """
+        Waits for all the queued downloads.
+        """
+        self._executor.shutdown(wait=True)
+        self._save_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _download(self, url: str, filename: str, tag):
+        path = os.path.join(self.folder, filename)
+        error = None
+        status = None
+        with self.tracer.target(tag), self.tracer.stage("pdf_download") as event:
+            for attempt in range(self.retries + 1):
+                try:
+                    status = self._fetch(url, filename, path)
+                    error = None
+                    break
+                except Exception as e:
+                    error = e
+                    if self.verbose:
+                        print(f"> Download of {url} failed ({attempt + 1}/{self.retries + 1}): {str(e)}")
+                    if attempt < self.retries:
+                        time.sleep(self.backoff * 2 ** attempt)
+            event["outcome"] = status if error is None else f"{OUTCOME_ERROR}:{type(error).__name__}"
+
+        with self._lock:
+            self._pending.pop(filename, None)
+            save = self._manifest_dirty and time.monotonic() - self._manifest_saved >= MANIFEST_SAVE_INTERVAL
+        if save:
+            self._save_manifest()
+        if error is not None:
+            print(f"Error with {url}: {str(error)}")
+        if self.on_done:
+            self.on_done(tag, filename, error)
+        if error is not None:
+            raise error
+        return status
+
+    def _fetch(self, url: str, filename: str, path: str):
+        known = self._manifest.get(filename) or {}
+        if os.path.exists(path):
+            # Skip the file if it did not change on the server
+            head = self.session.head(url, allow_redirects=True, timeout=PDF_TIMEOUT)
+            etag = head.headers.get("ETag")
+            size = head.headers.get("Content-Length")
+            if etag and known.get("etag"):
+                if etag == known["etag"]:
+                    return SKIPPED
+            elif size and int(size) == os.path.getsize(path):
+                return SKIPPED
+
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, prefix=f".{filename}.", suffix=".part")
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as f, self.session.get(url, stream=True, timeout=PDF_TIMEOUT) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                etag = response.headers.get("ETag")
+
+            # Keep the current file if the content is the same
+            sha256 = digest.hexdigest()
+            if os.path.exists(path) and (known.get("sha256") or _file_sha256(path)) == sha256:
+                os.remove(temp_path)
+                status = SKIPPED
+            else:
+                os.replace(temp_path, path)
+                status = DOWNLOADED
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._manifest[filename] = {"etag": etag, "size": os.path.getsize(path), "sha256": sha256}
+            self._manifest_dirty = True
+        return status
+
+    def _save_manifest(self):
+        with self._lock:
+            if not self._manifest_dirty:
+                return
+            temp_path = f"{self._manifest_path}.part"
+            with open(temp_path, "w") as f:
+                json.dump(self._manifest, f)
+            os.replace(temp_path, self._manifest_path)
+            self._manifest_saved = time.monotonic()
+            self._manifest_dirty = False
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+from array import array
+from pathlib import Path
+
+STORE_FOLDER = os.path.join("download", "terms")
+VOCABULARY_FILE = "vocabulary.txt"
+COUNTS_FILE = "counts.bin"
+INDEX_FILE = "index.json"
+
+
+class TermStore:
+    """
+    Word counts of each text, tokenized once and tracked by text hash.
+
+    The vocabulary is shared by all the texts (one term per line, its ID is its line number), and each text is stored
+    as two arrays of unsigned ints appended to one file: the IDs of its terms, then their counts, in the order of first
+    occurrence (the order of the `Counter`).
+    """
+
+    def __init__(self, folder=STORE_FOLDER):
+        """
+        :param folder: Folder of the store, created if needed.
+        """
+        self.folder = folder
+        Path(folder).mkdir(parents=True, exist_ok=True)
+        self._vocabulary_path = os.path.join(folder, VOCABULARY_FILE)
+        self._counts_path = os.path.join(folder, COUNTS_FILE)
+        self._index_path = os.path.join(folder, INDEX_FILE)
+        self._lock = threading.Lock()
+
+        self.vocabulary = []
+        if os.path.exists(self._vocabulary_path):
+            with open(self._vocabulary_path, "r", encoding="utf-8") as f:
+                self.vocabulary = f.read().split("\n")[:-1]
+        self._saved_terms = len(self.vocabulary)
+        self.ids = {term: i for i, term in enumerate(self.vocabulary)}
+
+        self.index = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r") as f:
+                self.index = json.load(f)
+
+        # Ignore the counts written after the last save (e.g., interrupted run)
+        end = max((offset + 8 * length for offset, length in self.index.values()), default=0)
+        with open(self._counts_path, "ab") as f:
+            f.truncate(end)
+        self._counts = open(self._counts_path, "r+b")
+
+    def __contains__(self, text_hash: str) -> bool:
+        return text_hash in self.index
+
+    def add(self, text_hash: str, counts: dict):
+        """
+        Stores the word counts of a text.
+
+        :param text_hash: Hash of the text.
+        :param counts: Count by word, e.g., a `Counter`.
+        """
+        with self._lock:
+            ids = array("I")
+            for term in counts:
+                term_id = self.ids.get(term)
+                if term_id is None:
+                    term_id = len(self.vocabulary)
+                    self.vocabulary.append(term)
+                    self.ids[term] = term_id
+                ids.append(term_id)
+            values = array("I", counts.values())
+
+            self._counts.seek(0, os.SEEK_END)
+            offset = self._counts.tell()
+            self._counts.write(ids.tobytes())
+            self._counts.write(values.tobytes())
+            self.index[text_hash] = (offset, len(ids))
+
+    def get_arrays(self, text_hash: str):
+        """
+        Returns the stored word counts of a text, as arrays.
+
+        :param text_hash: Hash of the text.
+        :return: (term IDs, counts).
+        """
+        offset, length = self.index[text_hash]
+        with self._lock:
+            self._counts.seek(offset)
+            data = self._counts.read(8 * length)
+        ids = array("I")
+        ids.frombytes(data[:4 * length])
+        values = array("I")
+        values.frombytes(data[4 * length:])
+        return ids, values
+
+    def get(self, text_hash: str) -> dict:
+        """
+        Returns the stored word counts of a text.
+
+        :param text_hash: Hash of the text.
+        :return: Count by word, in the order of first occurrence.
+        """
+        ids, values = self.get_arrays(text_hash)
+        return {self.vocabulary[term_id]: value for term_id, value in zip(ids, values)}
+
+    def save(self):
+        """
+        Persists the new terms and the index, the counts are already written.
+        """
+        with self._lock:
+            self._counts.flush()
+            os.fsync(self._counts.fileno())
+            with open(self._vocabulary_path, "a", encoding="utf-8") as f:
+                for term in self.vocabulary[self._saved_terms:]:
+                    f.write(term)
+                    f.write("\n")
+            self._saved_terms = len(self.vocabulary)
+            temp_path = f"{self._index_path}.part"
+            with open(temp_path, "w") as f:
+                json.dump(self.index, f)
+            os.replace(temp_path, self._index_path)
+
+    def close(self):
+        self.save()
+        self._counts.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
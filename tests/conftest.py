@@ -0,0 +1,48 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+# The scripts are run from the root of the repository, and import each other from there
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_site import Site, serve_site  # noqa: E402
+
+
+@contextmanager
+def running(server):
+    """
+    Runs a server of `fake_site.py` in a thread.
+
+    :param server: Server, e.g., from `serve_site`.
+    :return: Base URL of the server.
+    """
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{server.server_address[0]}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def site():
+    return Site.generate(courts=["E"], years=[2024], count=10, miss_rate=0.0, paragraphs=2)
+
+
+@pytest.fixture
+def site_url(site):
+    with running(serve_site(site, port=0)) as url:
+        yield url
+
+
+@pytest.fixture
+def site_backend(site_url, monkeypatch):
+    # `bvger_auto` against the stand-in, instead of the site
+    import bvger_auto
+    monkeypatch.setattr(bvger_auto, "BASE_URL", site_url)
+    return site_url
@@ -0,0 +1,74 @@
+import time
+
+import bvger_auto
+from journal import Journal, STATE_SCRAPED, STATE_TIMEOUT
+
+
+class Results:
+    def __init__(self):
+        self.results = []
+
+    def write(self, result):
+        self.results.append(result)
+
+
+def test_search_timeout_is_retried(site_backend, tmp_path, monkeypatch):
+    search_target = bvger_auto.search_target
+
+    def slow_search(target, **kwargs):
+        if target == "E-2/2024":
+            raise bvger_auto.SearchTimeout("slow")
+        return search_target(target, **kwargs)
+
+    targets = ["E-1/2024", "E-2/2024"]
+    with Journal(str(tmp_path / "journal.sqlite")) as journal:
+        monkeypatch.setattr(bvger_auto, "search_target", slow_search)
+        writer = Results()
+        assert bvger_auto.collect(targets, journal=journal, backend="http", max_rps=0, writer=writer) == 1
+        assert journal.get("E-2/2024")[0] == STATE_TIMEOUT
+        assert journal.settled() == {"E-1/2024"}
+
+        # Not settled, searched again by `--resume`
+        monkeypatch.setattr(bvger_auto, "search_target", search_target)
+        writer = Results()
+        assert bvger_auto.collect(targets, journal=journal, resume=True, backend="http", max_rps=0, writer=writer) == 2
+        assert sorted(result["title"] for result in writer.results) == targets
+        assert journal.get("E-2/2024")[0] == STATE_SCRAPED
+
+
+def test_resume_writes_settled_results(site_backend, tmp_path, monkeypatch):
+    targets = ["E-1/2024", "E-2/2024"]
+    with Journal(str(tmp_path / "journal.sqlite")) as journal:
+        assert bvger_auto.collect(targets[:1], journal=journal, backend="http", max_rps=0) == 1
+
+        # The settled title is written again from the journal, without being searched
+        searched = []
+        search_target = bvger_auto.search_target
+        monkeypatch.setattr(bvger_auto, "search_target",
+                            lambda target, **kwargs: searched.append(target) or search_target(target, **kwargs))
+        writer = Results()
+        assert bvger_auto.collect(targets, journal=journal, resume=True, backend="http", max_rps=0, writer=writer) == 2
+        assert searched == ["E-2/2024"]
+        assert sorted(result["title"] for result in writer.results) == targets
+
+
+def test_pdf_downloaded_twice(site_backend, tmp_path, monkeypatch):
+    page_target = bvger_auto.page_target
+
+    def page_target_twice(page, **kwargs):
+        # Same PDF submitted again once the first download is done, as by a fallback to Selenium
+        temp = page_target(page, **kwargs)
+        filename = f"{temp['title'].replace('/', '-')}.pdf"
+        downloader = kwargs["downloader"]
+        while filename in downloader._pending:
+            time.sleep(0.01)
+        downloader.submit(temp["link_pdf"], filename, tag=temp["title"]).result()
+        return temp
+
+    monkeypatch.setattr(bvger_auto, "page_target", page_target_twice)
+    (tmp_path / "pdf").mkdir()
+    writer = Results()
+    with Journal(str(tmp_path / "journal.sqlite")) as journal:
+        assert bvger_auto.collect(["E-1/2024"], journal=journal, backend="http", max_rps=0, writer=writer,
+                                  download=True, download_folder=str(tmp_path)) == 1
+    assert [result["file_pdf"] for result in writer.results] == ["E-1-2024.pdf"]
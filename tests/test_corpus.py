@@ -0,0 +1,56 @@
+import os
+
+from corpus import INDEX_FILE, SHARD_FILE, Corpus
+
+
+def test_add_and_read(tmp_path):
+    folder = str(tmp_path)
+    with Corpus(folder, shard_size=100) as corpus:
+        for i in range(20):
+            corpus.add(f"E-{i}/2024", f"Text {i} " * 10)
+        corpus.add("E-0/2024", "Replaced")
+        assert corpus.read("E-0/2024") == "Replaced"
+    assert os.path.exists(os.path.join(folder, SHARD_FILE.format(n=1)))
+
+    with Corpus(folder) as corpus:
+        assert len(corpus) == 20
+        assert corpus.read("E-0/2024") == "Replaced"
+        assert corpus.read("E-19/2024") == "Text 19 " * 10
+
+
+def test_interrupted_writes_are_dropped(tmp_path):
+    folder = str(tmp_path)
+    with Corpus(folder) as corpus:
+        corpus.add("E-1/2024", "First")
+    shard = os.path.join(folder, SHARD_FILE.format(n=0))
+    end = os.path.getsize(shard)
+
+    # Data and index line of a text whose write was interrupted
+    with open(shard, "ab") as f:
+        f.write(b"garbage")
+    with open(os.path.join(folder, INDEX_FILE), "a") as f:
+        f.write("{\"key\": \"E-2/20")
+
+    with Corpus(folder) as corpus:
+        assert len(corpus) == 1
+        corpus.add("E-3/2024", "Third")
+        assert corpus.index["E-3/2024"]["offset"] == end
+    with Corpus(folder) as corpus:
+        assert sorted(corpus.keys()) == ["E-1/2024", "E-3/2024"]
+        assert corpus.read("E-3/2024") == "Third"
+
+
+def test_writers_sharing_a_folder(tmp_path):
+    # Two writers of the same folder, as two processes would be
+    folder = str(tmp_path)
+    first, second = Corpus(folder, shard_size=200), Corpus(folder, shard_size=200)
+    try:
+        for i in range(30):
+            (first if i % 2 else second).add(f"E-{i}/2024", f"Text {i} " * 5)
+    finally:
+        first.close()
+        second.close()
+
+    with Corpus(folder) as corpus:
+        assert len(corpus) == 30
+        assert all(corpus.read(f"E-{i}/2024") == f"Text {i} " * 5 for i in range(30))
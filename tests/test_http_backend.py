@@ -0,0 +1,19 @@
+from conftest import running
+from fake_site import serve
+from http_backend import HttpBackend
+
+
+def test_record_again_then_replay(site, site_url, tmp_path):
+    backend = HttpBackend(site_url, record_folder=str(tmp_path))
+    recorded = {title: backend.search(title) for title in ["E-1/2024", "E-2/2024", "E-1/2024", "E-3/2024"]}
+    assert recorded == {title: site.ids[title] for title in ["E-1/2024", "E-2/2024", "E-3/2024"]}
+
+    with running(serve(str(tmp_path), port=0)) as replay_url:
+        replay = HttpBackend(replay_url)
+        assert {title: replay.search(title) for title in recorded} == recorded
+
+
+def test_missing_document(site_url):
+    backend = HttpBackend(site_url)
+    assert backend.document("unknown") is None
+    assert backend.available
@@ -0,0 +1,34 @@
+import sqlite3
+
+from journal import SyncState
+
+
+def test_sync_state_pending(tmp_path):
+    with SyncState(str(tmp_path / "sync.sqlite")) as state:
+        state.update_many([("E-1/2024", "a", "01.02.2024")])
+        state.update_listed({"E-1/2024": "2024-01-15;2024-02-01"})
+
+        # Known until collected again, a failed collection is not taken as new
+        state.mark_pending(["E-1/2024", "E-2/2024"])
+        assert sorted(state.pending()) == ["E-1/2024", "E-2/2024"]
+        assert state.get("E-1/2024") == ("a", "2024-02-01", "2024-01-15;2024-02-01")
+        assert state.get("E-2/2024") == (None, None, None)
+
+        state.update("E-1/2024", "b", "2024-03-01")
+        assert state.pending() == ["E-2/2024"]
+        assert state.get("E-1/2024") == ("b", "2024-03-01", "2024-01-15;2024-02-01")
+
+
+def test_sync_state_without_pending_column(tmp_path):
+    path = str(tmp_path / "sync.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE decisions (title TEXT PRIMARY KEY, id TEXT, publication_date TEXT, "
+                       "updated REAL NOT NULL)")
+    connection.executemany("INSERT INTO decisions VALUES (?, ?, ?, 0)", [("E-1/2024", "a", None),
+                                                                         ("E-2/2024", None, None)])
+    connection.commit()
+    connection.close()
+
+    with SyncState(path) as state:
+        assert state.pending() == ["E-2/2024"]
+        assert state.get("E-1/2024") == ("a", None, None)
@@ -0,0 +1,14 @@
+from bs4 import BeautifulSoup
+
+from bvger_auto import extract_scroller_dates, extract_scroller_page
+
+
+def test_scroller_item():
+    soup = BeautifulSoup(
+        "<div id=\"scrollerItem\"><div class=\"header\">Urteil E-1/2024</div><span>15.01.2024</span>"
+        "<span>Publiziert 1.2.2024</span><a href=\"/cache?id=abc\">E-1/2024</a></div>", "html.parser"
+    )
+    item = soup.find(id="scrollerItem")
+    assert extract_scroller_page(item).endswith("cache?id=abc")
+    assert extract_scroller_dates(item) == "2024-01-15;2024-02-01"
+    assert extract_scroller_dates(BeautifulSoup("<div>E-1/2024</div>", "html.parser")) is None
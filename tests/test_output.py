@@ -0,0 +1,27 @@
+import os
+
+import pandas as pd
+
+from output import ResultWriter, export_xlsx, read_results
+
+
+def test_default_is_written_as_found(tmp_path):
+    writer = ResultWriter(str(tmp_path), "results", batch_size=2)
+    for i in range(5):
+        writer.write({"id": f"E-{i}/2024", "text": f"Text {i}"})
+    assert writer.path.endswith(".jsonl")
+    assert len(read_results(writer.path)) == 4
+    assert writer.close() == writer.path
+    assert sorted(os.listdir(tmp_path)) == ["results.jsonl"]
+    assert len(read_results(writer.path)) == 5
+
+
+def test_export_xlsx(tmp_path):
+    writer = ResultWriter(str(tmp_path), "results", fmt="parquet", batch_size=2)
+    for i in range(3):
+        writer.write({"id": f"E-{i}/2024", "title": f"E-{i}/2024", "text": f"Text {i}"})
+    writer.close()
+    xlsx_path = os.path.join(tmp_path, "results.xlsx")
+    export_xlsx(writer.path, xlsx_path)
+    df = pd.read_excel(xlsx_path, index_col=0)
+    assert sorted(df.index) == ["E-0/2024", "E-1/2024", "E-2/2024"]
@@ -0,0 +1,22 @@
+import re
+import subprocess
+import sys
+
+from conftest import ROOT
+from pattern_matcher import PatternMatcher
+
+
+def test_import_without_patterns(tmp_path):
+    # A fresh checkout has no patterns, `inverted_index.py build` does not need them
+    subprocess.run([sys.executable, "-c", "import inverted_index"], cwd=tmp_path, check=True,
+                   env={"PYTHONPATH": ROOT})
+
+
+def test_match():
+    patterns = [re.compile(f"^{pattern}$") for pattern in ["asile", "renv.*", "ré.*é", ".*tion", "a.s.*"]]
+    matcher = PatternMatcher(patterns)
+    assert matcher.match("asile") == [0]
+    assert matcher.match("renvoi") == [1]
+    assert matcher.match("réfugié") == [2]
+    assert matcher.match("exécution") == [3]
+    assert matcher.match("abs.") == [4]
@@ -0,0 +1,11 @@
+from pdf_downloader import DOWNLOADED, SKIPPED, PdfDownloader
+
+
+def test_unchanged_pdf_is_skipped(site, site_url, tmp_path):
+    url = f"{site_url}{site.pages[site.ids['E-1/2024']]['pdf']}"
+    done = []
+    for expected in (DOWNLOADED, SKIPPED):
+        with PdfDownloader(str(tmp_path), on_done=lambda *args: done.append(args)) as downloader:
+            assert downloader.submit(url, "E-1-2024.pdf", tag="E-1/2024").result() == expected
+    assert done == [("E-1/2024", "E-1-2024.pdf", None)] * 2
+    assert (tmp_path / "E-1-2024.pdf").read_bytes().startswith(b"%PDF")
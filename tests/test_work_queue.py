@@ -0,0 +1,52 @@
+import time
+
+import bvger_auto
+from journal import Journal
+from output import read_results
+from work_queue import SHARD_DONE, SHARD_FAILED, SHARD_LEASED, SHARD_PENDING, WorkQueue, split_shards
+
+
+def test_lease_expiry(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.sqlite")) as queue:
+        assert queue.add(split_shards(["E"], [2024], list(range(1, 11)), shard_size=5)) == 2
+        first = queue.claim("a", lease=0.2)
+        assert queue.claim("b")["id"] != first["id"]
+        assert queue.claim("c") is None
+
+        # Claimed again once the lease expired, the first worker cannot complete it anymore
+        time.sleep(0.3)
+        again = queue.claim("c")
+        assert (again["id"], again["attempts"]) == (first["id"], 2)
+        assert not queue.renew(first["id"], "a")
+        assert not queue.complete(first["id"], "a")
+        assert queue.complete(first["id"], "c", results="results.jsonl")
+        assert queue.counts()[SHARD_DONE] == 1
+
+
+def test_release_and_give_up(tmp_path):
+    with WorkQueue(str(tmp_path / "queue.sqlite"), max_attempts=2) as queue:
+        queue.add(split_shards(["E"], [2024], [1, 2], shard_size=5))
+        shard = queue.claim("a")
+        assert queue.release(shard["id"], "a", error="failed")
+        assert queue.counts()[SHARD_PENDING] == 1
+
+        # Out of attempts once its last lease expires
+        shard = queue.claim("a", lease=0)
+        assert queue.counts()[SHARD_LEASED] == 1
+        time.sleep(0.01)
+        assert queue.claim("b") is None
+        assert queue.counts()[SHARD_FAILED] == 1
+
+
+def test_work(site_backend, tmp_path):
+    results_folder = tmp_path / "all"
+    results_folder.mkdir()
+    with WorkQueue(str(tmp_path / "queue.sqlite")) as queue, Journal(str(tmp_path / "journal.sqlite")) as journal:
+        queue.add(split_shards(["E"], [2024], list(range(1, 11)), shard_size=4))
+        done, found = bvger_auto.work(queue, owner="test", results_folder=str(results_folder), journal=journal,
+                                      backend="http", max_rps=0)
+        assert (done, found) == (3, 10)
+        assert queue.remaining() == 0
+        titles = [result["title"] for shard in queue.shards() for result in read_results(shard["results"])
+                  .to_dict("records")]
+        assert sorted(titles) == sorted(f"E-{number}/2024" for number in range(1, 11))
@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_FORMATS = {"jsonl", "chrome"}
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+
+
+class Tracer:
+    """
+    Records how long each stage of each target takes (browser start, page load, wait, extraction, PDF, ...), in a file
+    written as the stages end: JSON lines, or the Chrome trace format (`chrome://tracing`, Perfetto) for a `.json` file.
+
+    A tracer without file records nothing, so that the stages can always be traced. The target of a stage is the one
+    set by `target` in the same thread.
+    """
+
+    def __init__(self, path=None, fmt=None):
+        """
+        :param path: Optional, file of the trace.
+        :param fmt: `jsonl` or `chrome` (default `chrome` for a `.json` file, else `jsonl`).
+        """
+        self.path = path
+        self.fmt = fmt or ("chrome" if path and path.endswith(".json") else "jsonl")
+        if self.fmt not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format `{self.fmt}`")
+        self.durations = {}
+        self.outcomes = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._file = None
+        self._events = 0
+        self._threads = set()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+            if self.fmt == "chrome":
+                self._file.write("[\n")
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    @contextmanager
+    def target(self, title: str):
+        """
+        Sets the target of the stages traced in this thread.
+
+        :param title: Title of the BVGer, e.g., `A-1337/2002`.
+        """
+        previous = getattr(self._local, "target", None)
+        self._local.target = title
+        try:
+            yield
+        finally:
+            self._local.target = previous
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times a stage, whose outcome is `ok`, the name of the exception raised, or the value set in the yielded dict.
+
+        :param name: Name of the stage, e.g., `get`.
+        :return: Dict of the event, where `outcome` can be set.
+        """
+        if not self.enabled:
+            yield {}
+            return
+        event = {"outcome": OUTCOME_OK}
+        start = time.perf_counter()
+        try:
+            yield event
+        except BaseException as e:
+            event["outcome"] = f"{OUTCOME_ERROR}:{type(e).__name__}"
+            raise
+        finally:
+            self.record(name, start, time.perf_counter() - start, event["outcome"])
+
+    def record(self, name: str, start: float, duration: float, outcome=OUTCOME_OK):
+        """
+        Records a stage timed by the caller.
+
+        :param name: Name of the stage.
+        :param start: Start, from `time.perf_counter`.
+        :param duration: Duration, in seconds.
+        :param outcome: Outcome of the stage.
+        """
+        if not self.enabled:
+            return
+        target = getattr(self._local, "target", None)
+        thread = threading.current_thread()
+        if self.fmt == "chrome":
+            lines = [json.dumps({
+                "name": name,
+                "cat": "stage",
+                "ph": "X",
+                "ts": round((start - self._start) * 1e6),
+                "dur": round(duration * 1e6),
+                "pid": os.getpid(),
+                "tid": thread.ident,
+                "args": {"target": target, "outcome": outcome},
+            })]
+        else:
+            lines = [json.dumps({
+                "target": target,
+                "stage": name,
+                "start": round(start - self._start, 6),
+                "duration": round(duration, 6),
+                "outcome": outcome,
+                "thread": thread.name,
+            })]
+
+        with self._lock:
+            self.durations.setdefault(name, []).append(duration)
+            if outcome != OUTCOME_OK:
+                counts = self.outcomes.setdefault(name, {})
+                counts[outcome] = counts.get(outcome, 0) + 1
+            if self._file:
+                if self.fmt == "chrome" and thread.ident not in self._threads:
+                    # Name of the thread, shown instead of its ID
+                    self._threads.add(thread.ident)
+                    lines.insert(0, json.dumps({"name": "thread_name", "ph": "M", "pid": os.getpid(),
+                                                "tid": thread.ident, "args": {"name": thread.name}}))
+                for line in lines:
+                    if self.fmt == "chrome" and self._events:
+                        self._file.write(",\n")
+                    self._file.write(line)
+                    if self.fmt == "jsonl":
+                        self._file.write("\n")
+                    self._events += 1
+
+    def summary(self) -> str:
+        """
+        Returns the number, total and percentiles of the durations of each stage, and their outcomes other than `ok`.
+
+        :return: Text.
+        """
+        with self._lock:
+            stages = {name: sorted(durations) for name, durations in self.durations.items()}
+            outcomes = {name: dict(counts) for name, counts in self.outcomes.items()}
+        lines = [f"{'Stage':<16}{'Count':>8}{'Total s':>10}{'Mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'Max ms':>10}"]
+        for name, durations in sorted(stages.items(), key=lambda item: -sum(item[1])):
+            total = sum(durations)
+            line = f"{name:<16}{len(durations):>8}{total:>10.1f}{total / len(durations) * 1000:>10.1f}" \
+                   f"{percentile(durations, 0.5) * 1000:>10.1f}{percentile(durations, 0.95) * 1000:>10.1f}" \
+                   f"{durations[-1] * 1000:>10.1f}"
+            if name in outcomes:
+                line += "  " + ", ".join(f"{outcome}: {count}" for outcome, count in sorted(outcomes[name].items()))
+            lines.append(line)
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                if self.fmt == "chrome":
+                    self._file.write("\n]\n")
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def percentile(values: list, q: float) -> float:
+    # Values already sorted
+    return values[min(len(values) - 1, int(q * len(values)))]
@@ -0,0 +1,362 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import merge
+
+QUEUE_FILE = "queue.sqlite"
+RESULTS_FOLDER = "all"
+
+SHARD_SIZE = 200
+LEASE = 600
+MAX_ATTEMPTS = 3
+# A worker waits for the shards leased by others, which may be released or expire
+CLAIM_POLL = 30
+
+# Shard states
+SHARD_PENDING = "pending"
+SHARD_LEASED = "leased"
+SHARD_DONE = "done"
+SHARD_FAILED = "failed"
+SHARD_STATES = [SHARD_PENDING, SHARD_LEASED, SHARD_DONE, SHARD_FAILED]
+
+
+class WorkQueue:
+    """
+    Queue of the shards of a collection (numbers of a court and year), shared by worker processes on one or several
+    hosts through a SQLite file, e.g., on a shared folder.
+
+    A worker claims a shard for a lease, which it renews while it works (see `hold`). A shard released on failure, or
+    whose lease expired (the worker died), can be claimed again, until it failed `max_attempts` times.
+    """
+
+    def __init__(self, path: str, max_attempts=MAX_ATTEMPTS):
+        """
+        :param path: SQLite file, created if needed.
+        :param max_attempts: Number of claims after which a shard that keeps failing is given up.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # No WAL, which needs shared memory and does not work across hosts, and each claim is its own transaction
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS shards ("
+            "id INTEGER PRIMARY KEY, "
+            "court TEXT NOT NULL, "
+            "year INTEGER NOT NULL, "
+            "numbers TEXT NOT NULL, "
+            "state TEXT NOT NULL, "
+            "owner TEXT, "
+            "lease_until REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "results TEXT, "
+            "error TEXT, "
+            "updated REAL NOT NULL)"
+        )
+
+    @classmethod
+    def in_folder(cls, queue_folder: str, **kwargs):
+        """
+        Opens the queue of a folder, where the workers also write their results (`<queue_folder>/all`).
+
+        :param queue_folder: Folder of the queue.
+        :param kwargs: Arguments for `WorkQueue`.
+        :return: WorkQueue.
+        """
+        return cls(os.path.join(queue_folder, QUEUE_FILE), **kwargs)
+
+    def add(self, shards) -> int:
+        """
+        Adds shards to the queue.
+
+        :param shards: (court, year, numbers), see `split_shards`.
+        :return: Number of shards added.
+        """
+        now = time.time()
+        rows = [(court, int(year), json.dumps(list(numbers)), SHARD_PENDING, now) for court, year, numbers in shards]
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.executemany(
+                "INSERT INTO shards (court, year, numbers, state, updated) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._connection.execute("COMMIT")
+        return len(rows)
+
+    def claim(self, owner: str, lease=LEASE) -> Optional[dict]:
+        """
+        Claims a pending shard, or a leased one whose lease expired.
+
+        :param owner: Name of the worker, e.g., `<host>-<pid>`.
+        :param lease: Duration of the lease, in seconds.
+        :return: Shard (`id`, `court`, `year`, `numbers`, `attempts`), or None if no shard can be claimed now.
+        """
+        now = time.time()
+        with self._lock:
+            # Locks the file for writing, so that two workers cannot claim the same shard
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT id, court, year, numbers, attempts FROM shards "
+                    "WHERE (state = ? OR (state = ? AND lease_until < ?)) AND attempts < ? ORDER BY id LIMIT 1",
+                    (SHARD_PENDING, SHARD_LEASED, now, self.max_attempts),
+                ).fetchone()
+                if row is not None:
+                    self._connection.execute(
+                        "UPDATE shards SET state = ?, owner = ?, lease_until = ?, attempts = attempts + 1, "
+                        "updated = ? WHERE id = ?",
+                        (SHARD_LEASED, owner, now + lease, now, row[0]),
+                    )
+                # Expired leases of shards out of attempts are given up
+                self._connection.execute(
+                    "UPDATE shards SET state = ?, owner = NULL, error = COALESCE(error, 'lease expired'), updated = ? "
+                    "WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                    (SHARD_FAILED, now, SHARD_LEASED, now, self.max_attempts),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        shard_id, court, year, numbers, attempts = row
+        return {"id": shard_id, "court": court, "year": year, "numbers": json.loads(numbers), "attempts": attempts + 1}
+
+    def renew(self, shard_id: int, owner: str, lease=LEASE) -> bool:
+        """
+        Extends the lease of a shard.
+
+        :param shard_id: ID of the shard.
+        :param owner: Name of the worker holding the lease.
+        :param lease: Duration of the lease from now, in seconds.
+        :return: The lease is still held (else it expired and the shard may have been claimed by another worker).
+        """
+        now = time.time()
+        return self._update(
+            "UPDATE shards SET lease_until = ?, updated = ? WHERE id = ? AND owner = ? AND state = ?",
+            (now + lease, now, shard_id, owner, SHARD_LEASED),
+        )
+
+    def complete(self, shard_id: int, owner: str, results=None) -> bool:
+        """
+        Marks a shard as done.
+
+        :param shard_id: ID of the shard.
+        :param owner: Name of the worker holding the lease.
+        :param results: Optional, path of the results of the shard.
+        :return: The lease was still held.
+        """
+        return self._update(
+            "UPDATE shards SET state = ?, lease_until = NULL, results = ?, error = NULL, updated = ? "
+            "WHERE id = ? AND owner = ? AND state = ?",
+            (SHARD_DONE, results, time.time(), shard_id, owner, SHARD_LEASED),
+        )
+
+    def release(self, shard_id: int, owner: str, error=None) -> bool:
+        """
+        Gives a shard back after a failure, to be claimed again, or given up once out of attempts.
+
+        :param shard_id: ID of the shard.
+        :param owner: Name of the worker holding the lease.
+        :param error: Optional, description of the failure.
+        :return: The lease was still held.
+        """
+        return self._update(
+            "UPDATE shards SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, owner = NULL, lease_until = NULL, "
+            "error = ?, updated = ? WHERE id = ? AND owner = ? AND state = ?",
+            (self.max_attempts, SHARD_FAILED, SHARD_PENDING, error, time.time(), shard_id, owner, SHARD_LEASED),
+        )
+
+    def _update(self, query: str, parameters: tuple) -> bool:
+        with self._lock:
+            return self._connection.execute(query, parameters).rowcount > 0
+
+    @contextmanager
+    def hold(self, shard_id: int, owner: str, lease=LEASE):
+        """
+        Renews the lease of a shard in the background while it is being worked on.
+
+        :param shard_id: ID of the shard.
+        :param owner: Name of the worker holding the lease.
+        :param lease: Duration of the lease, renewed every third of it.
+        :return: Event set if the lease was lost.
+        """
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(lease / 3):
+                try:
+                    if not self.renew(shard_id, owner, lease=lease):
+                        lost.set()
+                        return
+                except sqlite3.Error as e:
+                    # Busy file, retried at the next beat while the lease lasts
+                    print(f"Error renewing shard {shard_id}: {str(e)}")
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{shard_id}", daemon=True)
+        thread.start()
+        try:
+            yield lost
+        finally:
+            stop.set()
+            thread.join()
+
+    def counts(self) -> dict:
+        """
+        Returns the number of shards in each state.
+
+        :return: Number of shards, by state.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT state, COUNT(*) FROM shards GROUP BY state").fetchall()
+        return dict({state: 0 for state in SHARD_STATES}, **dict(rows))
+
+    def remaining(self) -> int:
+        """
+        Returns the number of shards that can still be claimed, now or once their lease expires.
+
+        :return: Number of shards.
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM shards WHERE state IN (?, ?)", (SHARD_PENDING, SHARD_LEASED)
+            ).fetchone()[0]
+
+    def shards(self, state=None) -> list:
+        """
+        Returns the shards, for the status.
+
+        :param state: Optional, only the shards in this state.
+        :return: Shards (`id`, `court`, `year`, `numbers`, `state`, `owner`, `attempts`, `results`, `error`).
+        """
+        query = "SELECT id, court, year, numbers, state, owner, attempts, results, error FROM shards"
+        parameters = ()
+        if state:
+            query += " WHERE state = ?"
+            parameters = (state,)
+        with self._lock:
+            rows = self._connection.execute(f"{query} ORDER BY id", parameters).fetchall()
+        keys = ["id", "court", "year", "numbers", "state", "owner", "attempts", "results", "error"]
+        return [dict(zip(keys, row), numbers=json.loads(row[3])) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def split_shards(courts: list, years: list, numbers: list, shard_size=SHARD_SIZE) -> list:
+    """
+    Splits the numbers of each court and year in shards of consecutive numbers.
+
+    :param courts: Court letters.
+    :param years: Years.
+    :param numbers: Numbers, sorted.
+    :param shard_size: Number of numbers of a shard.
+    :return: (court, year, numbers).
+    """
+    return [(court, year, numbers[i:i + shard_size])
+            for court in courts for year in years for i in range(0, len(numbers), shard_size)]
+
+
+def shard_targets(shard: dict) -> list:
+    """
+    Returns the titles of a shard.
+
+    :param shard: Shard, as returned by `claim`.
+    :return: Titles of the BVGer, e.g., `["A-1/2002", "A-2/2002"]`.
+    """
+    return [f"{shard['court']}-{number}/{shard['year']}" for number in shard["numbers"]]
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def format_numbers(numbers: list) -> str:
+    # Shortest form of the numbers of a shard, e.g., `1-200`
+    if numbers and numbers == list(range(numbers[0], numbers[-1] + 1)):
+        return f"{numbers[0]}-{numbers[-1]}"
+    return ";".join(str(number) for number in numbers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="BVGer Work Queue",
+        description="Show the shards of a collection shared by several workers (`bvger_auto.py shard` and `work`), or merge their results",
+    )
+    subparsers = parser.add_subparsers(help="`status` for the state of the shards, `merge` for the results of the workers")
+
+    # Status subparser
+    parser_status = subparsers.add_parser("status",
+                                          help="Show the number of shards in each state, and the shards given up")
+    parser_status.add_argument("queue_folder",
+                               help=f"Folder of the queue (`{QUEUE_FILE}`)")
+    parser_status.add_argument("-a", "--all",
+                               help="Show every shard",
+                               action="store_true")
+
+    # Merge subparser
+    parser_merge = subparsers.add_parser("merge",
+                                         help=f"Merge the results of the workers (`<queue_folder>/{RESULTS_FOLDER}`) into `<queue_folder>/all.parquet` and `<queue_folder>/all.xlsx`, without duplicates")
+    parser_merge.add_argument("queue_folder",
+                              help=f"Folder of the queue (`{QUEUE_FILE}`)")
+    parser_merge.add_argument("-l", "--lang",
+                              help=f"Lang of the headers of the xlsx export (default `{merge.EXPORT_LANG}`)",
+                              choices=["de", "fr", "it"],
+                              default=merge.EXPORT_LANG)
+    parser_merge.add_argument("--no-export",
+                              help="Only update `all.parquet`, without the xlsx export",
+                              action="store_true")
+
+    args = parser.parse_args()
+
+    if "queue_folder" in args and not os.path.exists(os.path.join(args.queue_folder, QUEUE_FILE)):
+        sys.stderr.write(f"Incorrect folder (`{args.queue_folder}`) has no queue\n")
+        exit(-1)
+
+    if "all" in args:
+        with WorkQueue.in_folder(args.queue_folder) as work_queue:
+            counts = work_queue.counts()
+            shards = work_queue.shards() if args.all else work_queue.shards(SHARD_FAILED)
+        for shard in shards:
+            line = f"{shard['id']:>6} {shard['court']} {shard['year']} {format_numbers(shard['numbers'])}: " \
+                   f"{shard['state']} ({shard['attempts']} attempts)"
+            if shard["owner"]:
+                line += f" by {shard['owner']}"
+            if shard["error"]:
+                line += f", {shard['error']}"
+            print(line)
+        print(", ".join(f"{state}: {count}" for state, count in counts.items()))
+
+    elif "lang" in args:
+        with WorkQueue.in_folder(args.queue_folder) as work_queue:
+            counts = work_queue.counts()
+        if counts[SHARD_PENDING] or counts[SHARD_LEASED]:
+            print(f"Warning: {counts[SHARD_PENDING] + counts[SHARD_LEASED]} shards are not done yet")
+        results_folder = os.path.join(args.queue_folder, RESULTS_FOLDER)
+        if not os.path.isdir(results_folder):
+            sys.stderr.write(f"Incorrect folder (`{results_folder}`) not found\n")
+            exit(-1)
+
+        # The results of a shard collected more than once are deduplicated on ID
+        df = merge.merge(folder=results_folder)
+        if not args.no_export:
+            merge.export(df, export_file=os.path.join(args.queue_folder, "all.xlsx"), lang=args.lang)
+        print(f"Merged: {len(df)} (`{os.path.join(args.queue_folder, merge.MERGED_NAME)}`)")
+
+    else:
+        parser.print_help()